@@ -0,0 +1,376 @@
+"""Micro-benchmarks for the simulation hot paths.
+
+Run from the backend directory:
+
+    uv run python benchmarks/run.py                      # quick profile
+    uv run python benchmarks/run.py --profile full       # full scaling grid
+    uv run python benchmarks/run.py --only metrics,prompt
+    uv run python benchmarks/run.py --compare benchmarks/results/baseline.json
+
+Each run writes a JSON file with per-case timings and environment metadata to
+``benchmarks/results/``. ``--compare`` reports the ratio against an earlier run
+and exits non-zero if any case regressed by more than ``--threshold``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from trading_sim.db.tables import SimulationRow
+from trading_sim.models.portfolio import Holding, Portfolio
+from trading_sim.models.results import AgentResult, SimulationResult, SimulationStatus
+from trading_sim.models.trades import TradeAction, TradeDecision
+from trading_sim.simulation.executor import execute_trade
+from trading_sim.simulation.frame import MarketFrame
+from trading_sim.simulation.market_data import _build_mock_frame
+from trading_sim.simulation.metrics import RunningMetrics, calculate_metrics, rolling_metrics
+from trading_sim.simulation.runner import MIN_SCAN_DAYS
+from trading_sim.simulation.storage import _row_to_result, _row_values
+from trading_sim.strategies.prompts import PromptFragmentCache, build_market_prompt
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+PROFILES: dict[str, dict[str, list[int]]] = {
+    "quick": {
+        "tickers": [5, 50, 500],
+        "days": [250, 2_500],
+        "agents": [1, 10],
+    },
+    "full": {
+        "tickers": [5, 50, 500, 2_000],
+        "days": [250, 2_500, 25_000, 100_000],
+        "agents": [1, 10, 50, 100],
+    },
+}
+
+# Skip grid points whose (days x tickers) price matrix would exceed this many cells
+MAX_CELLS = 50_000_000
+
+
+@dataclass
+class Case:
+    name: str
+    params: dict[str, int]
+    setup: Callable[[], Callable[[], object]]
+    repeats: int = 5
+
+
+@dataclass
+class CaseResult:
+    name: str
+    params: dict[str, int]
+    repeats: int
+    min_s: float
+    median_s: float
+    samples: list[float] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        args = ",".join(f"{k}={v}" for k, v in sorted(self.params.items()))
+        return f"{self.name}[{args}]"
+
+
+def _tickers(n: int) -> list[str]:
+    return [f"T{i:04d}" for i in range(n)]
+
+
+def _end_date(start: date, trading_days: int) -> date:
+    # Weekdays only: 5 trading days per 7 calendar days
+    return start + timedelta(days=(trading_days * 7) // 5 + 1)
+
+
+def _frame(num_tickers: int, num_days: int) -> MarketFrame:
+    start = date(2000, 1, 3)
+    return _build_mock_frame(_tickers(num_tickers), start, _end_date(start, num_days))
+
+
+def _trade(ticker: str, action: TradeAction, quantity: int, price: float) -> TradeDecision:
+    return TradeDecision(
+        agent_id="bench",
+        timestamp=datetime(2024, 1, 2),
+        ticker=ticker,
+        action=action,
+        quantity=quantity,
+        confidence=0.6,
+        reasoning="benchmark trade",
+        price_at_decision=price,
+    )
+
+
+def _portfolio(tickers: list[str]) -> Portfolio:
+    return Portfolio(
+        cash=100_000.0,
+        holdings={t: Holding(ticker=t, quantity=10, avg_cost=100.0) for t in tickers},
+    )
+
+
+# --- Cases ---
+
+
+def bench_generate(num_tickers: int, num_days: int) -> Callable[[], object]:
+    start = date(2000, 1, 3)
+    end = _end_date(start, num_days)
+    tickers = _tickers(num_tickers)
+    return lambda: _build_mock_frame(tickers, start, end)
+
+
+def bench_execute_trade(num_tickers: int) -> Callable[[], object]:
+    frame = _frame(num_tickers, 10)
+    snapshot = frame[5]
+    ticker = frame.tickers[0]
+    price = snapshot.prices[ticker].close
+    buy = _trade(ticker, TradeAction.BUY, 10, price)
+    sell = _trade(ticker, TradeAction.SELL, 10, price)
+    start = _portfolio(frame.tickers)
+
+    def run() -> object:
+        portfolio = start
+        for _ in range(100):
+            portfolio = execute_trade(portfolio, buy, snapshot)
+            portfolio = execute_trade(portfolio, sell, snapshot)
+        return portfolio
+
+    return run
+
+
+def bench_value_at_prices(num_tickers: int) -> Callable[[], object]:
+    frame = _frame(num_tickers, 10)
+    portfolio = _portfolio(frame.tickers)
+    prices = frame.close_prices(5)
+    return lambda: [portfolio.value_at_prices(prices) for _ in range(100)]
+
+
+def bench_metrics(num_days: int) -> Callable[[], object]:
+    rng = np.random.default_rng(0)
+    history = (100_000 * np.exp(np.cumsum(rng.normal(0, 0.01, num_days)))).round(2).tolist()
+    actions = [TradeAction.BUY, TradeAction.SELL, TradeAction.HOLD]
+    trades = [_trade("AAPL", actions[i % 3], 1, 100.0) for i in range(num_days // 5)]
+    return lambda: calculate_metrics(history, trades, 100_000.0)
+
+
+def bench_running_metrics(num_days: int) -> Callable[[], object]:
+    rng = np.random.default_rng(0)
+    history = 100_000 * np.exp(np.cumsum(rng.normal(0, 0.01, num_days)))
+
+    def run() -> object:
+        # Fed in the runner's smallest scan steps, with a snapshot after each
+        running = RunningMetrics(100_000.0)
+        for start in range(0, num_days, MIN_SCAN_DAYS):
+            running.extend(history[start:start + MIN_SCAN_DAYS])
+            running.snapshot()
+        return running
+
+    return run
+
+
+def bench_rolling_metrics(num_days: int) -> Callable[[], object]:
+    rng = np.random.default_rng(0)
+    history = 100_000 * np.exp(np.cumsum(rng.normal(0, 0.01, num_days)))
+    return lambda: rolling_metrics(history)
+
+
+def bench_prompt(num_tickers: int, num_agents: int) -> Callable[[], object]:
+    frame = _frame(num_tickers, 20)
+    portfolio = _portfolio(frame.tickers[:10])
+
+    def run() -> object:
+        # One decision day for every agent, sharing a per-simulation fragment cache
+        cache = PromptFragmentCache()
+        snapshot = frame[10]
+        history = frame[5:10]
+        prices = frame.close_prices(10)
+        return [
+            build_market_prompt(snapshot, history, portfolio, prices, cache=cache)
+            for _ in range(num_agents)
+        ]
+
+    return run
+
+
+def bench_storage_roundtrip(num_days: int, num_agents: int) -> Callable[[], object]:
+    start = date(2000, 1, 3)
+    labels = [str(start + timedelta(days=i)) for i in range(num_days)]
+    history = (100_000 + np.arange(num_days, dtype=np.float64)).tolist()
+    trades = [_trade("AAPL", TradeAction.BUY, 1, 100.0) for _ in range(num_days // 5)]
+    result = SimulationResult(
+        id="bench",
+        status=SimulationStatus.COMPLETED,
+        start_date=start,
+        end_date=start + timedelta(days=num_days),
+        tickers=["AAPL"],
+        agent_ids=[f"agent-{i}" for i in range(num_agents)],
+        agent_results={
+            f"agent-{i}": AgentResult(
+                agent_id=f"agent-{i}",
+                agent_name=f"Agent {i}",
+                portfolio=_portfolio(["AAPL"]),
+                trades=trades,
+                portfolio_history=history,
+                date_labels=labels,
+            )
+            for i in range(num_agents)
+        },
+    )
+    return lambda: _row_to_result(SimulationRow(**_row_values(result)))
+
+
+def build_cases(profile: dict[str, list[int]]) -> Iterator[Case]:
+    for n_tickers in profile["tickers"]:
+        for n_days in profile["days"]:
+            if n_tickers * n_days <= MAX_CELLS:
+                yield Case(
+                    "generate_mock_data",
+                    {"tickers": n_tickers, "days": n_days},
+                    lambda t=n_tickers, d=n_days: bench_generate(t, d),
+                    repeats=3,
+                )
+    for n_tickers in profile["tickers"]:
+        yield Case("execute_trade_x200", {"tickers": n_tickers}, lambda t=n_tickers: bench_execute_trade(t))
+        yield Case("value_at_prices_x100", {"tickers": n_tickers}, lambda t=n_tickers: bench_value_at_prices(t))
+    for n_days in profile["days"]:
+        yield Case("calculate_metrics", {"days": n_days}, lambda d=n_days: bench_metrics(d))
+        yield Case("running_metrics", {"days": n_days}, lambda d=n_days: bench_running_metrics(d))
+        yield Case("rolling_metrics", {"days": n_days}, lambda d=n_days: bench_rolling_metrics(d))
+    for n_tickers in profile["tickers"]:
+        for n_agents in profile["agents"]:
+            yield Case(
+                "build_market_prompt",
+                {"tickers": n_tickers, "agents": n_agents},
+                lambda t=n_tickers, a=n_agents: bench_prompt(t, a),
+            )
+    for n_days in profile["days"]:
+        for n_agents in profile["agents"]:
+            if n_days * n_agents <= 1_000_000:
+                yield Case(
+                    "storage_roundtrip",
+                    {"days": n_days, "agents": n_agents},
+                    lambda d=n_days, a=n_agents: bench_storage_roundtrip(d, a),
+                    repeats=3,
+                )
+
+
+# --- Runner ---
+
+
+def run_case(case: Case) -> CaseResult:
+    fn = case.setup()
+    fn()  # warm-up
+    samples: list[float] = []
+    for _ in range(case.repeats):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return CaseResult(
+        name=case.name,
+        params=case.params,
+        repeats=case.repeats,
+        min_s=min(samples),
+        median_s=statistics.median(samples),
+        samples=samples,
+    )
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _metadata(profile: str) -> dict[str, Any]:
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "profile": profile,
+        "git_revision": _git_revision(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def compare(current: list[CaseResult], baseline_path: Path, threshold: float) -> bool:
+    """Print ratios against a baseline; return True if nothing regressed."""
+    baseline = json.loads(baseline_path.read_text())
+    previous = {r["key"]: r for r in baseline["results"]}
+    ok = True
+    print(f"\nComparison against {baseline_path} ({baseline['meta'].get('git_revision')}):")
+    for result in current:
+        before = previous.get(result.key)
+        if before is None:
+            continue
+        ratio = result.min_s / before["min_s"] if before["min_s"] > 0 else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            ok = False
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"  {result.key:<60} {ratio:6.2f}x{flag}")
+    return ok
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark simulation hot paths")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--only", default=None, help="Comma-separated substrings of case names to run")
+    parser.add_argument("--output", type=Path, default=None, help="Result file (default: results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    filters = [f.strip() for f in args.only.split(",")] if args.only else None
+    results: list[CaseResult] = []
+    for case in build_cases(PROFILES[args.profile]):
+        if filters and not any(f in case.name for f in filters):
+            continue
+        result = run_case(case)
+        results.append(result)
+        print(f"{result.key:<60} min {result.min_s * 1000:10.3f} ms   median {result.median_s * 1000:10.3f} ms")
+
+    payload = {
+        "meta": _metadata(args.profile),
+        "results": [
+            {
+                "key": r.key,
+                "name": r.name,
+                "params": r.params,
+                "repeats": r.repeats,
+                "min_s": r.min_s,
+                "median_s": r.median_s,
+                "samples": r.samples,
+            }
+            for r in results
+        ],
+    }
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.write_text(json.dumps(payload, indent=2))
+    print(f"\nWrote {len(results)} results to {output}")
+
+    if args.compare is not None and not compare(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
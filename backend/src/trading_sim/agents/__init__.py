@@ -1,5 +1,14 @@
 """Pydantic AI agent definitions for trading personas."""
 
-from trading_sim.agents.trading_agent import create_trading_agent, get_agent_decision
+from trading_sim.agents.local_model import LocalTradingAgent
+from trading_sim.agents.pool import AgentPool, get_agent_pool
+from trading_sim.agents.trading_agent import TradingAgent, create_trading_agent, get_agent_decision
 
-__all__ = ["create_trading_agent", "get_agent_decision"]
+__all__ = [
+    "AgentPool",
+    "LocalTradingAgent",
+    "TradingAgent",
+    "create_trading_agent",
+    "get_agent_decision",
+    "get_agent_pool",
+]
@@ -0,0 +1,168 @@
+"""Record/replay cache for LLM trading decisions.
+
+Entries are keyed by a hash of everything that determines a model's answer
+(provider, model, temperature, system prompt and user prompt) and stored as
+small JSON files on disk. In ``record`` mode misses go to the LLM and the answer
+is saved; in ``replay`` mode a miss is an error, which makes reruns and
+regression tests fully offline and reproducible.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+from trading_sim.settings import (
+    get_decision_cache_dir,
+    get_decision_cache_max_bytes,
+    get_decision_cache_mode,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class DecisionCacheMode(str, Enum):
+    OFF = "off"
+    RECORD = "record"
+    REPLAY = "replay"
+
+
+class DecisionCacheMiss(LookupError):
+    """Raised in replay mode when no recorded decision exists for a prompt."""
+
+
+class DecisionCache:
+    """On-disk decision store with size-based eviction of least recently used entries."""
+
+    def __init__(self, directory: Path, mode: DecisionCacheMode, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes: int | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != DecisionCacheMode.OFF
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model_id: str,
+        temperature: float,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> str:
+        payload = json.dumps(
+            [provider.lower(), model_id, temperature, system_prompt, user_prompt],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        """Return the recorded output JSON for a key, or None on a miss.
+
+        Raises DecisionCacheMiss on a miss in replay mode.
+        """
+        path = self._path(key)
+        try:
+            data = path.read_text()
+        except FileNotFoundError:
+            self.misses += 1
+            if self.mode == DecisionCacheMode.REPLAY:
+                raise DecisionCacheMiss(f"No recorded decision for key {key}") from None
+            return None
+
+        self.hits += 1
+        try:
+            os.utime(path)  # mark as recently used for eviction
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, output_json: str) -> None:
+        if self.mode != DecisionCacheMode.RECORD:
+            return
+        path = self._path(key)
+        # Counted before writing, so the scan on first use does not include the new entry
+        total = self._current_bytes()
+        try:
+            total -= path.stat().st_size  # re-recording replaces the old entry
+        except FileNotFoundError:
+            pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(output_json)
+        os.replace(tmp, path)
+
+        total += path.stat().st_size
+        self._total_bytes = total
+        if total > self.max_bytes:
+            self._evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries: list[tuple[float, int, Path]] = []
+        if not self.directory.is_dir():
+            return entries
+        for path in self.directory.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _current_bytes(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+        return self._total_bytes
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the store is under 90% of its limit."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self._total_bytes = total
+        logger.info("Decision cache evicted %d entries (%d bytes remain)", removed, total)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode.value,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_cache: DecisionCache | None = None
+
+
+def get_decision_cache() -> DecisionCache:
+    global _cache
+    if _cache is None:
+        _cache = DecisionCache(
+            Path(get_decision_cache_dir()),
+            DecisionCacheMode(get_decision_cache_mode()),
+            get_decision_cache_max_bytes(),
+        )
+    return _cache
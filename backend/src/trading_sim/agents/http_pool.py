@@ -0,0 +1,137 @@
+"""Shared keep-alive HTTP clients for LLM providers.
+
+Every agent talking to the same provider goes through one ``httpx.AsyncClient``,
+so TCP/TLS connections are reused across agents and simulations and, with
+HTTP/2, many concurrent requests are multiplexed over a few connections.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+import httpx
+
+from trading_sim.settings import (
+    get_http2_enabled,
+    get_http_keepalive_expiry,
+    get_http_max_connections,
+    get_http_max_keepalive,
+    get_http_timeout,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _ClientMetrics:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.responses = 0
+        self.errors = 0
+        self.total_latency = 0.0
+
+    async def on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+        request.extensions["trading_sim_started"] = time.monotonic()
+
+    async def on_response(self, response: httpx.Response) -> None:
+        self.responses += 1
+        if response.status_code >= 400:
+            self.errors += 1
+        started = response.request.extensions.get("trading_sim_started")
+        if started is not None:
+            self.total_latency += time.monotonic() - started
+
+
+class ProviderHTTPPool:
+    """One configured AsyncClient per provider, created on first use."""
+
+    def __init__(
+        self,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        timeout: float,
+        http2: bool,
+    ) -> None:
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=min(timeout, 10.0))
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but the 'h2' package is missing; using HTTP/1.1")
+                http2 = False
+        self.http2 = http2
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._metrics: dict[str, _ClientMetrics] = {}
+
+    def client(self, provider: str) -> httpx.AsyncClient:
+        provider = provider.lower()
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            metrics = self._metrics.setdefault(provider, _ClientMetrics())
+            client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                timeout=self.timeout,
+                event_hooks={
+                    "request": [metrics.on_request],
+                    "response": [metrics.on_response],
+                },
+            )
+            self._clients[provider] = client
+        return client
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def stats(self) -> dict[str, Any]:
+        out: dict[str, Any] = {}
+        for provider, metrics in self._metrics.items():
+            entry: dict[str, Any] = {
+                "requests": metrics.requests,
+                "responses": metrics.responses,
+                "error_responses": metrics.errors,
+                "avg_latency_s": round(metrics.total_latency / metrics.responses, 4) if metrics.responses else 0.0,
+                "http2": self.http2,
+                "max_connections": self.limits.max_connections,
+            }
+            client = self._clients.get(provider)
+            # httpx does not expose pool state publicly; read it from httpcore when available
+            connections = getattr(getattr(getattr(client, "_transport", None), "_pool", None), "connections", None)
+            if connections is not None:
+                entry["connections"] = len(connections)
+                entry["idle_connections"] = sum(1 for c in connections if c.is_idle())
+            out[provider] = entry
+        return out
+
+
+_pool: ProviderHTTPPool | None = None
+
+
+def get_http_pool() -> ProviderHTTPPool:
+    global _pool
+    if _pool is None:
+        _pool = ProviderHTTPPool(
+            max_connections=get_http_max_connections(),
+            max_keepalive_connections=get_http_max_keepalive(),
+            keepalive_expiry=get_http_keepalive_expiry(),
+            timeout=get_http_timeout(),
+            http2=get_http2_enabled(),
+        )
+    return _pool
+
+
+async def close_http_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.aclose()
+        _pool = None
@@ -0,0 +1,187 @@
+"""Offline rule-based agents for load and throughput testing.
+
+A local agent stands in for a remote LLM: it reads the same prompt that
+``build_market_prompt`` renders, applies a simple deterministic rule, and returns
+an ``AgentTradeOutput``. Latency and failures can be simulated through the
+agent's model parameters, so the runner, storage and API can be benchmarked
+on a machine with no network access.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from trading_sim.config import AgentConfig
+
+if TYPE_CHECKING:
+    from trading_sim.agents.trading_agent import AgentTradeOutput
+
+# Rule names accepted as model_id for the "local" provider
+LOCAL_STRATEGIES = ("hold", "random", "momentum", "buy-and-hold")
+
+_MARKET_LINE = re.compile(r"^  (\S+): Open=\$[\d.]+ High=\$[\d.]+ Low=\$[\d.]+ Close=\$([\d.]+)")
+_HISTORY_HEADER = re.compile(r"^  Date\s+(.*)$")
+_HISTORY_ROW = re.compile(r"^  \d{4}-\d{2}-\d{2}\S*  (.*)$")
+_CASH_LINE = re.compile(r"^  Cash: \$([\d,.]+)")
+_HOLDING_LINE = re.compile(r"^  (\S+): (\d+) shares @")
+
+
+class LocalModelError(RuntimeError):
+    """Simulated provider failure."""
+
+
+@dataclass
+class _MarketView:
+    closes: dict[str, float]
+    first_closes: dict[str, float]
+    cash: float
+    holdings: dict[str, int]
+
+
+def _parse_prompt(prompt: str) -> _MarketView:
+    closes: dict[str, float] = {}
+    first_closes: dict[str, float] = {}
+    holdings: dict[str, int] = {}
+    cash = 0.0
+    history_tickers: list[str] = []
+    section = ""
+
+    for line in prompt.splitlines():
+        if line.startswith("CURRENT MARKET DATA"):
+            section = "market"
+        elif line.startswith("RECENT PRICE HISTORY"):
+            section = "history"
+        elif line.startswith("YOUR PORTFOLIO"):
+            section = "portfolio"
+        elif section == "market" and (m := _MARKET_LINE.match(line)):
+            closes[m.group(1)] = float(m.group(2))
+        elif section == "history":
+            if m := _HISTORY_HEADER.match(line):
+                history_tickers = m.group(1).split()
+            elif (m := _HISTORY_ROW.match(line)) and not first_closes:
+                cells = re.findall(r"\$\s*([\d.]+)|N/A", m.group(1))
+                for ticker, cell in zip(history_tickers, cells):
+                    if cell:
+                        first_closes[ticker] = float(cell)
+        elif section == "portfolio":
+            if m := _CASH_LINE.match(line):
+                cash = float(m.group(1).replace(",", ""))
+            elif m := _HOLDING_LINE.match(line):
+                holdings[m.group(1)] = int(m.group(2))
+
+    return _MarketView(closes=closes, first_closes=first_closes, cash=cash, holdings=holdings)
+
+
+Order = tuple[str, str, int]
+
+
+def _decide(strategy: str, view: _MarketView, rng: random.Random) -> tuple[list[Order], float, str]:
+    """Return (orders, confidence, reasoning) for a strategy; orders are (action, ticker, quantity)."""
+    tickers = sorted(view.closes)
+    if not tickers:
+        return [], 0.5, "No market data"
+
+    if strategy == "random":
+        action = rng.choice(("buy", "sell", "hold"))
+        if action == "sell" and view.holdings:
+            ticker = rng.choice(sorted(view.holdings))
+            return [("sell", ticker, rng.randint(1, view.holdings[ticker]))], 0.5, "Random sell"
+        if action == "buy":
+            ticker = rng.choice(tickers)
+            max_qty = int(view.cash * 0.2 // view.closes[ticker])
+            if max_qty > 0:
+                return [("buy", ticker, rng.randint(1, max_qty))], 0.5, "Random buy"
+        return [], 0.5, "Random hold"
+
+    if strategy == "buy-and-hold":
+        unowned = [t for t in tickers if t not in view.holdings]
+        budget = view.cash / len(unowned) if unowned else 0.0
+        orders: list[Order] = [
+            ("buy", t, int(budget // view.closes[t])) for t in unowned if budget >= view.closes[t]
+        ]
+        if orders:
+            return orders, 0.8, "Building an equal-weight position"
+        return [], 0.8, "Fully invested, holding"
+
+    if strategy == "momentum":
+        returns = {
+            t: view.closes[t] / view.first_closes[t] - 1
+            for t in tickers
+            if view.first_closes.get(t)
+        }
+        if returns:
+            # Exit every falling position and rotate the proceeds into the strongest riser
+            losers = sorted(t for t in view.holdings if returns.get(t, 0.0) < -0.01)
+            orders = [("sell", t, view.holdings[t]) for t in losers]
+            cash = view.cash + sum(view.holdings[t] * view.closes[t] for t in losers)
+            reasons = [f"{t} fell {returns[t]:.1%}" for t in losers]
+
+            ticker = max(returns, key=lambda t: returns[t])
+            if returns[ticker] > 0.01:
+                qty = int(cash * 0.2 // view.closes[ticker])
+                if qty > 0:
+                    orders.append(("buy", ticker, qty))
+                    reasons.append(f"{ticker} rose {returns[ticker]:.1%}")
+            if orders:
+                return orders, 0.7, "; ".join(reasons)
+        return [], 0.6, "No clear trend"
+
+    return [], 1.0, "Holding"
+
+
+@dataclass
+class LocalUsage:
+    total_tokens: int
+
+
+@dataclass
+class LocalRunResult:
+    """Mirrors the parts of a pydantic-ai run result that get_agent_decision uses."""
+
+    data: AgentTradeOutput
+    _usage: LocalUsage
+
+    def usage(self) -> LocalUsage:
+        return self._usage
+
+
+class LocalTradingAgent:
+    """Deterministic rule-based agent with simulated latency and failure rate.
+
+    Decisions, latency and failures depend only on the prompt, so reruns are
+    reproducible.
+    """
+
+    def __init__(self, config: AgentConfig) -> None:
+        strategy = config.model_id.lower()
+        if strategy not in LOCAL_STRATEGIES:
+            raise ValueError(
+                f"Unknown local strategy '{config.model_id}', expected one of {LOCAL_STRATEGIES}"
+            )
+        self.strategy = strategy
+        self.latency_s = config.parameters.simulated_latency_ms / 1000
+        self.failure_rate = config.parameters.simulated_failure_rate
+
+    async def run(self, prompt: str) -> LocalRunResult:
+        from trading_sim.agents.trading_agent import AgentTradeOutput, TradeOrder
+
+        digest = hashlib.sha256(f"{self.strategy}|{prompt}".encode()).digest()
+        rng = random.Random(digest)
+
+        if self.latency_s > 0:
+            await asyncio.sleep(self.latency_s)
+        if rng.random() < self.failure_rate:
+            raise LocalModelError("Simulated local model failure")
+
+        orders, confidence, reasoning = _decide(self.strategy, _parse_prompt(prompt), rng)
+        output = AgentTradeOutput(
+            orders=[TradeOrder(action=a, ticker=t, quantity=q) for a, t, q in orders],
+            confidence=confidence,
+            reasoning=reasoning,
+        )
+        return LocalRunResult(data=output, _usage=LocalUsage(total_tokens=len(prompt) // 4))
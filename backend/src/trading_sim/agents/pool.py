@@ -0,0 +1,102 @@
+"""Process-wide pool of built trading agents.
+
+Building a pydantic-ai Agent also builds its model client and HTTP stack, so
+agents are reused across simulations for as long as the configuration fields
+that shape them stay the same.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from trading_sim.agents.trading_agent import TradingAgent, create_trading_agent
+from trading_sim.config import AgentConfig
+from trading_sim.settings import get_agent_pool_size
+
+
+def agent_fingerprint(config: AgentConfig) -> str:
+    """Hash of the config fields that affect how an agent is built and behaves."""
+    payload = json.dumps(
+        {
+            "name": config.name,
+            "persona_prompt": config.persona_prompt,
+            "model_provider": config.model_provider.lower(),
+            "model_id": config.model_id,
+            "parameters": config.parameters.model_dump(mode="json"),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class AgentPool:
+    """LRU cache of built agents keyed by configuration fingerprint."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._agents: OrderedDict[str, TradingAgent] = OrderedDict()
+        self._fingerprints: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, config: AgentConfig) -> TradingAgent:
+        key = agent_fingerprint(config)
+        with self._lock:
+            agent = self._agents.get(key)
+            if agent is not None:
+                self.hits += 1
+                self._agents.move_to_end(key)
+                return agent
+
+            self.misses += 1
+            agent = create_trading_agent(config)
+            if self.maxsize > 0:
+                self._agents[key] = agent
+                self._fingerprints.setdefault(config.id, set()).add(key)
+                while len(self._agents) > self.maxsize:
+                    evicted, _ = self._agents.popitem(last=False)
+                    self._untrack(evicted)
+            return agent
+
+    def _untrack(self, key: str) -> None:
+        """Forget an evicted fingerprint, so the map stays bounded by the pool size."""
+        for agent_id in [a for a, keys in self._fingerprints.items() if key in keys]:
+            keys = self._fingerprints[agent_id]
+            keys.discard(key)
+            if not keys:
+                del self._fingerprints[agent_id]
+
+    def invalidate(self, agent_id: str) -> None:
+        """Drop every pooled agent built for an agent ID (e.g. after its config changed)."""
+        with self._lock:
+            for key in self._fingerprints.pop(agent_id, set()):
+                self._agents.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._agents.clear()
+            self._fingerprints.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._agents),
+                "maxsize": self.maxsize,
+            }
+
+
+_pool: AgentPool | None = None
+
+
+def get_agent_pool() -> AgentPool:
+    global _pool
+    if _pool is None:
+        _pool = AgentPool(get_agent_pool_size())
+    return _pool
@@ -0,0 +1,166 @@
+"""Deadlines, hedged requests and circuit breakers for LLM calls.
+
+Every decision gets a deadline. Observed call latencies per (provider, model)
+drive hedging: once a call is slower than the configured percentile, a second
+request goes to the same or a fallback model and the first answer wins. A
+circuit breaker per provider makes calls fail fast while it keeps failing.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from typing import Any
+
+from trading_sim.config import CallPolicy, load_config
+
+# Latency samples kept per (provider, model) for hedge percentiles
+LATENCY_WINDOW = 200
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets one trial call through after a cooldown."""
+
+    def __init__(self, failure_threshold: int, cooldown_s: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown_s = cooldown_s
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.trial_in_flight = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown_s:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.trial_in_flight or (self.opened_at is None and self.failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+        self.trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Give up a trial call that was cancelled before it finished."""
+        self.trial_in_flight = False
+
+
+class LatencyTracker:
+    """Sliding window of call latencies."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class ProviderHealth:
+    """Call policies, circuit breakers and latency windows for all providers."""
+
+    def __init__(self, policies: dict[str, CallPolicy] | None = None) -> None:
+        self.policies = policies or {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._latencies: dict[tuple[str, str], LatencyTracker] = {}
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.deadlines_hit = 0
+        self.fallbacks_used = 0
+
+    def policy(self, provider: str, model_id: str) -> CallPolicy:
+        provider = provider.lower()
+        return (
+            self.policies.get(f"{provider}:{model_id}")
+            or self.policies.get(provider)
+            or CallPolicy()
+        )
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        provider = provider.lower()
+        breaker = self._breakers.get(provider)
+        if breaker is None:
+            policy = self.policies.get(provider) or CallPolicy()
+            breaker = CircuitBreaker(policy.failure_threshold, policy.cooldown_s)
+            self._breakers[provider] = breaker
+        return breaker
+
+    def latency(self, provider: str, model_id: str) -> LatencyTracker:
+        key = (provider.lower(), model_id)
+        tracker = self._latencies.get(key)
+        if tracker is None:
+            tracker = LatencyTracker()
+            self._latencies[key] = tracker
+        return tracker
+
+    def hedge_delay(self, provider: str, model_id: str) -> float | None:
+        """Seconds to wait before hedging a call, or None if hedging is off."""
+        policy = self.policy(provider, model_id)
+        if policy.hedge_percentile is None:
+            return None
+        tracker = self.latency(provider, model_id)
+        if len(tracker) < policy.hedge_min_samples:
+            return None
+        return tracker.percentile(policy.hedge_percentile)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "deadlines_hit": self.deadlines_hit,
+            "fallbacks_used": self.fallbacks_used,
+            "breakers": {
+                provider: {
+                    "state": breaker.state,
+                    "consecutive_failures": breaker.failures,
+                    "times_opened": breaker.times_opened,
+                }
+                for provider, breaker in self._breakers.items()
+            },
+            "latency_p50_s": {
+                f"{provider}:{model_id}": round(p50, 4)
+                for (provider, model_id), tracker in self._latencies.items()
+                if (p50 := tracker.percentile(50)) is not None
+            },
+        }
+
+
+_health: ProviderHealth | None = None
+
+
+def get_provider_health() -> ProviderHealth:
+    global _health
+    if _health is None:
+        _health = ProviderHealth(load_config().call_policies)
+    return _health
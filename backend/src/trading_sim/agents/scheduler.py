@@ -0,0 +1,198 @@
+"""Process-wide scheduler for LLM calls.
+
+Every call goes through a lane for its (provider, model) pair. A lane caps the
+number of in-flight calls and meters requests and tokens with token buckets, so
+concurrent simulations queue up behind the provider's limits instead of
+tripping them. Waiting calls are granted round-robin across simulations.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from trading_sim.config import ProviderLimits, load_config
+
+
+class TokenBucket:
+    """Token bucket that lets callers reserve capacity ahead of time.
+
+    ``reserve`` always debits the bucket and returns how long the caller must wait
+    before its reservation is covered, which keeps grants in arrival order.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self._tokens = per_minute
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        self._refill()
+        self._tokens -= amount
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def refund(self, amount: float) -> None:
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+
+class _Lane:
+    """Concurrency and rate limits for a single (provider, model) pair."""
+
+    def __init__(self, limits: ProviderLimits) -> None:
+        self.limits = limits
+        self.in_flight = 0
+        self.requests = TokenBucket(limits.requests_per_minute) if limits.requests_per_minute else None
+        self.tokens = TokenBucket(limits.tokens_per_minute) if limits.tokens_per_minute else None
+        # Waiters grouped per simulation; the OrderedDict order is the round-robin cycle
+        self.waiting: OrderedDict[str, deque[asyncio.Future[None]]] = OrderedDict()
+
+        self.total_calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(q) for q in self.waiting.values())
+
+    def dispatch(self) -> None:
+        """Grant free slots to waiters, taking one per simulation in turn."""
+        while self.in_flight < self.limits.max_concurrency and self.waiting:
+            sim_key, queue = next(iter(self.waiting.items()))
+            fut = queue.popleft()
+            if queue:
+                self.waiting.move_to_end(sim_key)
+            else:
+                del self.waiting[sim_key]
+            if fut.done():
+                continue
+            self.in_flight += 1
+            fut.set_result(None)
+
+    def discard(self, sim_key: str, fut: asyncio.Future[None]) -> None:
+        queue = self.waiting.get(sim_key)
+        if queue is not None and fut in queue:
+            queue.remove(fut)
+            if not queue:
+                del self.waiting[sim_key]
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self.dispatch()
+
+
+class CallTicket:
+    """Handle for a granted call, used to report actual token usage."""
+
+    def __init__(self, lane: _Lane, reserved_tokens: int) -> None:
+        self._lane = lane
+        self._reserved = reserved_tokens
+
+    def record_usage(self, total_tokens: int | None) -> None:
+        """Settle the token reservation against what the call actually used."""
+        if total_tokens is None or self._lane.tokens is None:
+            return
+        diff = self._reserved - total_tokens
+        if diff > 0:
+            self._lane.tokens.refund(diff)
+        elif diff < 0:
+            self._lane.tokens.reserve(-diff)
+        self._reserved = total_tokens
+
+
+class LLMScheduler:
+    """Queues LLM calls per (provider, model) and enforces configured limits."""
+
+    def __init__(self, limits: dict[str, ProviderLimits] | None = None) -> None:
+        self.limits = limits or {}
+        self._lanes: dict[tuple[str, str], _Lane] = {}
+
+    def _lane(self, provider: str, model_id: str) -> _Lane:
+        key = (provider, model_id)
+        lane = self._lanes.get(key)
+        if lane is None:
+            limits = (
+                self.limits.get(f"{provider}:{model_id}")
+                or self.limits.get(provider)
+                or ProviderLimits()
+            )
+            lane = _Lane(limits)
+            self._lanes[key] = lane
+        return lane
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        provider: str,
+        model_id: str,
+        sim_id: str | None = None,
+        tokens: int = 0,
+    ) -> AsyncIterator[CallTicket]:
+        """Wait for a concurrency slot and rate budget, then hold the slot."""
+        lane = self._lane(provider.lower(), model_id)
+        sim_key = sim_id or ""
+        enqueued = time.monotonic()
+
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        lane.waiting.setdefault(sim_key, deque()).append(fut)
+        lane.dispatch()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                lane.release()
+            else:
+                lane.discard(sim_key, fut)
+            raise
+
+        try:
+            delay = 0.0
+            if lane.requests is not None:
+                delay = max(delay, lane.requests.reserve(1))
+            if lane.tokens is not None and tokens:
+                delay = max(delay, lane.tokens.reserve(tokens))
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            waited = time.monotonic() - enqueued
+            lane.total_calls += 1
+            lane.total_wait += waited
+            lane.max_wait = max(lane.max_wait, waited)
+
+            yield CallTicket(lane, tokens)
+        finally:
+            lane.release()
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth, in-flight calls and wait times per lane."""
+        return {
+            f"{provider}:{model_id}": {
+                "queue_depth": lane.queue_depth,
+                "in_flight": lane.in_flight,
+                "max_concurrency": lane.limits.max_concurrency,
+                "total_calls": lane.total_calls,
+                "avg_wait_s": round(lane.total_wait / lane.total_calls, 4) if lane.total_calls else 0.0,
+                "max_wait_s": round(lane.max_wait, 4),
+            }
+            for (provider, model_id), lane in self._lanes.items()
+        }
+
+
+_scheduler: LLMScheduler | None = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LLMScheduler(load_config().provider_limits)
+    return _scheduler
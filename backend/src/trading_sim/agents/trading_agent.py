@@ -2,27 +2,45 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
 from datetime import datetime
+from typing import Any
 
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent
+from pydantic_ai.models import Model
 
+from trading_sim.agents.decision_cache import get_decision_cache
+from trading_sim.agents.http_pool import get_http_pool
+from trading_sim.agents.local_model import LocalTradingAgent
+from trading_sim.agents.resilience import CircuitOpenError, get_provider_health
+from trading_sim.agents.scheduler import get_llm_scheduler
 from trading_sim.config import AgentConfig
 from trading_sim.models.market import MarketSnapshot
 from trading_sim.models.portfolio import Portfolio
 from trading_sim.models.trades import TradeAction, TradeDecision
-from trading_sim.strategies.prompts import build_market_prompt
+from trading_sim.strategies.prompts import PromptFragmentCache, build_market_prompt
 
 logger = logging.getLogger(__name__)
 
 
+class TradeOrder(BaseModel):
+    """A single order within an agent's decision."""
+
+    action: str = Field(description="One of: buy, sell")
+    ticker: str = Field(description="The ticker symbol to trade")
+    quantity: int = Field(ge=0, description="Number of shares")
+
+
 class AgentTradeOutput(BaseModel):
     """Structured output the LLM must produce."""
 
-    action: str = Field(description="One of: buy, sell, hold")
-    ticker: str = Field(description="The ticker symbol to trade, or 'N/A' for hold")
-    quantity: int = Field(ge=0, description="Number of shares (0 for hold)")
+    orders: list[TradeOrder] = Field(
+        default_factory=list,
+        description="Orders to execute in sequence; list sells before buys. Empty to hold.",
+    )
     confidence: float = Field(ge=0.0, le=1.0, description="Confidence level 0.0-1.0")
     reasoning: str = Field(description="Explanation of why this decision was made")
 
@@ -38,25 +56,80 @@ def _build_model_string(config: AgentConfig) -> str:
         return f"anthropic:{model_id}"
     elif provider == "google" or provider == "gemini":
         return f"google-gla:{model_id}"
+    elif provider == "local":
+        return f"local:{model_id}"
     else:
         return f"{provider}:{model_id}"
 
 
-def create_trading_agent(config: AgentConfig) -> Agent[None, AgentTradeOutput]:
-    """Create a Pydantic AI agent for a trading persona."""
-    system_prompt = (
+def _build_system_prompt(config: AgentConfig) -> str:
+    """Build the persona system prompt for an agent."""
+    return (
         f"You are {config.name}, a trading agent.\n\n"
         f"{config.persona_prompt}\n\n"
         "You will receive market data and your current portfolio. "
-        "Make exactly ONE trading decision per turn. "
-        "Respond with a structured decision: action (buy/sell/hold), "
-        "ticker, quantity, confidence (0-1), and your reasoning."
+        "Make one trading decision per turn. It may contain several orders, "
+        "e.g. to rebalance across tickers; they are executed in the order given "
+        "at today's close, so list sells before the buys they fund. "
+        "Respond with a structured decision: a list of orders (action buy/sell, "
+        "ticker, quantity; an empty list to hold), confidence (0-1), and your reasoning."
     )
 
+
+def _estimate_tokens(config: AgentConfig, prompt: str) -> int:
+    """Rough token budget for a call: ~4 characters per input token plus max output."""
+    input_chars = len(_build_system_prompt(config)) + len(prompt)
+    return input_chars // 4 + config.parameters.max_tokens
+
+
+def _build_model(model_str: str) -> Model | str:
+    """Build a model bound to the provider's shared HTTP client.
+
+    Providers without a shared client fall back to the plain model string.
+    """
+    provider, _, model_id = model_str.partition(":")
+    http_pool = get_http_pool()
+
+    if provider == "openai":
+        from pydantic_ai.models.openai import OpenAIModel
+        from pydantic_ai.providers.openai import OpenAIProvider
+
+        return OpenAIModel(
+            model_id, provider=OpenAIProvider(http_client=http_pool.client(provider))
+        )
+    elif provider == "anthropic":
+        from pydantic_ai.models.anthropic import AnthropicModel
+        from pydantic_ai.providers.anthropic import AnthropicProvider
+
+        return AnthropicModel(
+            model_id, provider=AnthropicProvider(http_client=http_pool.client(provider))
+        )
+    elif provider == "google-gla":
+        from pydantic_ai.models.gemini import GeminiModel
+        from pydantic_ai.providers.google_gla import GoogleGLAProvider
+
+        return GeminiModel(
+            model_id, provider=GoogleGLAProvider(http_client=http_pool.client(provider))
+        )
+    return model_str
+
+
+TradingAgent = Agent[None, AgentTradeOutput] | LocalTradingAgent
+
+
+def create_trading_agent(config: AgentConfig) -> TradingAgent:
+    """Create a Pydantic AI agent for a trading persona.
+
+    The ``local`` provider builds an offline rule-based agent instead.
+    """
+    system_prompt = _build_system_prompt(config)
+
     model_str = _build_model_string(config)
+    if model_str.startswith("local:"):
+        return LocalTradingAgent(config)
 
     agent: Agent[None, AgentTradeOutput] = Agent(
-        model=model_str,
+        model=_build_model(model_str),
         result_type=AgentTradeOutput,
         system_prompt=system_prompt,
     )
@@ -64,55 +137,236 @@ def create_trading_agent(config: AgentConfig) -> Agent[None, AgentTradeOutput]:
     return agent
 
 
+async def _call_model(
+    agent: TradingAgent,
+    config: AgentConfig,
+    prompt: str,
+    sim_id: str | None,
+    deadline: float,
+    granted: asyncio.Event | None = None,
+) -> AgentTradeOutput:
+    """One model call through the scheduler, bounded by ``deadline`` (loop time).
+
+    The outcome is recorded against the provider's circuit breaker and latency
+    window; calls that time out while still queued do not count as failures.
+    ``granted`` is set once the call holds its scheduler slot.
+    """
+    health = get_provider_health()
+    breaker = health.breaker(config.model_provider)
+    trial = breaker.state == "half_open"
+    if not breaker.allow():
+        raise CircuitOpenError(f"Circuit open for provider '{config.model_provider}'")
+
+    started: float | None = None
+    try:
+        async with asyncio.timeout_at(deadline):
+            async with get_llm_scheduler().slot(
+                config.model_provider,
+                config.model_id,
+                sim_id=sim_id,
+                tokens=_estimate_tokens(config, prompt),
+            ) as ticket:
+                if granted is not None:
+                    granted.set()
+                started = time.monotonic()
+                result = await agent.run(prompt)
+                ticket.record_usage(result.usage().total_tokens)
+    except asyncio.CancelledError:
+        if trial:
+            breaker.release_trial()
+        raise
+    except TimeoutError:
+        health.deadlines_hit += 1
+        if started is not None:
+            breaker.record_failure()
+        elif trial:
+            breaker.release_trial()
+        raise TimeoutError(f"No answer from '{config.model_provider}' within the decision deadline") from None
+    except Exception:
+        breaker.record_failure()
+        raise
+
+    breaker.record_success()
+    health.latency(config.model_provider, config.model_id).record(time.monotonic() - started)
+    return result.data
+
+
+def _fallback_agent(config: AgentConfig) -> tuple[TradingAgent, AgentConfig] | None:
+    if config.fallback is None:
+        return None
+    from trading_sim.agents.pool import get_agent_pool
+
+    fallback_config = config.model_copy(update={
+        "model_provider": config.fallback.model_provider,
+        "model_id": config.fallback.model_id,
+        "fallback": None,
+    })
+    return get_agent_pool().get(fallback_config), fallback_config
+
+
+async def _resilient_call(
+    agent: TradingAgent, config: AgentConfig, prompt: str, sim_id: str | None
+) -> AgentTradeOutput:
+    """Run a decision call under its provider's deadline, hedging and fallback policy.
+
+    A hedge goes out once the primary call has held its scheduler slot for longer
+    than the configured latency percentile; the first successful answer wins and
+    the other call is cancelled. If the primary fails (or its circuit is open)
+    before any hedge was sent, the fallback model is tried within the same
+    deadline.
+    """
+    health = get_provider_health()
+    policy = health.policy(config.model_provider, config.model_id)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + policy.deadline_s
+    hedge_delay = health.hedge_delay(config.model_provider, config.model_id)
+
+    # The hedge clock starts when the primary gets its scheduler slot, like the
+    # latency samples behind hedge_delay; a hedge sent while the primary is still
+    # queued would only queue behind it under the same rate limit
+    granted = asyncio.Event()
+    slot_granted = asyncio.create_task(granted.wait())
+    hedge_at: float | None = None
+    pending: set[asyncio.Task[Any]] = {
+        asyncio.create_task(_call_model(agent, config, prompt, sim_id, deadline, granted))
+    }
+    second: asyncio.Task[AgentTradeOutput] | None = None
+    hedged = False
+    error: BaseException | None = None
+    try:
+        while pending:
+            waiting = set(pending)
+            timeout: float | None = None
+            if second is None and hedge_delay is not None:
+                if hedge_at is None:
+                    waiting.add(slot_granted)
+                else:
+                    timeout = max(0.0, hedge_at - loop.time())
+            done, _ = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if slot_granted in done:
+                done.discard(slot_granted)
+                assert hedge_delay is not None
+                hedge_at = loop.time() + hedge_delay
+                if not done:
+                    continue
+            pending -= done
+            for task in done:
+                exc = task.exception()
+                if exc is None:
+                    if task is second and hedged:
+                        health.hedges_won += 1
+                    return task.result()
+                error = exc
+            if second is not None:
+                continue
+
+            fallback = _fallback_agent(config)
+            if not done:
+                # Primary is slower than the hedge percentile
+                target = fallback if policy.hedge_to == "fallback" and fallback else (agent, config)
+                health.hedges_sent += 1
+                hedged = True
+            elif fallback is not None:
+                target = fallback
+                health.fallbacks_used += 1
+            else:
+                continue
+            second = asyncio.create_task(_call_model(target[0], target[1], prompt, sim_id, deadline))
+            pending.add(second)
+    finally:
+        slot_granted.cancel()
+        for task in pending:
+            task.cancel()
+
+    assert error is not None
+    raise error
+
+
+def _hold_decision(
+    config: AgentConfig, snapshot: MarketSnapshot, prices: dict[str, float], confidence: float, reasoning: str
+) -> TradeDecision:
+    first_ticker = next(iter(prices))
+    return TradeDecision(
+        agent_id=config.id,
+        timestamp=datetime.utcnow(),
+        ticker=first_ticker,
+        action=TradeAction.HOLD,
+        quantity=0,
+        confidence=confidence,
+        reasoning=reasoning,
+        price_at_decision=prices.get(first_ticker, 1.0),
+        market_date=snapshot.date,
+    )
+
+
 async def get_agent_decision(
-    agent: Agent[None, AgentTradeOutput],
+    agent: TradingAgent,
     config: AgentConfig,
     snapshot: MarketSnapshot,
     history: list[MarketSnapshot],
     portfolio: Portfolio,
-) -> TradeDecision:
-    """Run the agent on current market data and return a structured trade decision.
+    prompt_cache: PromptFragmentCache | None = None,
+    sim_id: str | None = None,
+) -> list[TradeDecision]:
+    """Run the agent on current market data and return its orders for the day.
+
+    One LLM call yields every order of the decision, in execution order; a
+    decision without buy or sell orders is returned as a single HOLD.
 
-    Falls back to a HOLD decision if the LLM call fails.
+    Decisions are served from the decision cache when it is enabled; otherwise
+    the call waits for a slot from the process-wide LLM scheduler, bounded by
+    the provider's deadline and hedging policy. Falls back to a HOLD decision if
+    the LLM call fails, times out or its provider's circuit is open. In replay mode a cache miss raises
+    DecisionCacheMiss instead.
     """
     prices = {t: bar.close for t, bar in snapshot.prices.items()}
-    prompt = build_market_prompt(snapshot, history, portfolio, prices)
+    prompt = build_market_prompt(snapshot, history, portfolio, prices, cache=prompt_cache)
+
+    decision_cache = get_decision_cache()
+    cache_key: str | None = None
+    cached: str | None = None
+    if decision_cache.enabled:
+        cache_key = decision_cache.make_key(
+            config.model_provider,
+            config.model_id,
+            config.parameters.temperature,
+            _build_system_prompt(config),
+            prompt,
+        )
+        cached = decision_cache.get(cache_key)
 
     try:
-        result = await agent.run(prompt)
-        output = result.data
-
-        action_str = output.action.lower().strip()
-        if action_str == "buy":
-            action = TradeAction.BUY
-        elif action_str == "sell":
-            action = TradeAction.SELL
+        if cached is not None:
+            output = AgentTradeOutput.model_validate_json(cached)
         else:
-            action = TradeAction.HOLD
-
-        ticker = output.ticker if action != TradeAction.HOLD else list(snapshot.prices.keys())[0]
-        price = prices.get(ticker, 0.0)
-
-        return TradeDecision(
-            agent_id=config.id,
-            timestamp=datetime.utcnow(),
-            ticker=ticker,
-            action=action,
-            quantity=output.quantity if action != TradeAction.HOLD else 0,
-            confidence=output.confidence,
-            reasoning=output.reasoning,
-            price_at_decision=price if price > 0 else 1.0,
-        )
+            output = await _resilient_call(agent, config, prompt, sim_id)
+            if cache_key is not None:
+                decision_cache.put(cache_key, output.model_dump_json())
+
+        decisions: list[TradeDecision] = []
+        for order in output.orders:
+            action_str = order.action.lower().strip()
+            if action_str == "buy":
+                action = TradeAction.BUY
+            elif action_str == "sell":
+                action = TradeAction.SELL
+            else:
+                continue
+
+            price = prices.get(order.ticker, 0.0)
+            decisions.append(TradeDecision(
+                agent_id=config.id,
+                timestamp=datetime.utcnow(),
+                ticker=order.ticker,
+                action=action,
+                quantity=order.quantity,
+                confidence=output.confidence,
+                reasoning=output.reasoning,
+                price_at_decision=price if price > 0 else 1.0,
+                market_date=snapshot.date,
+            ))
+
+        return decisions or [_hold_decision(config, snapshot, prices, output.confidence, output.reasoning)]
     except Exception as e:
         logger.warning("Agent %s failed, defaulting to HOLD: %s", config.id, e)
-        first_ticker = list(snapshot.prices.keys())[0]
-        return TradeDecision(
-            agent_id=config.id,
-            timestamp=datetime.utcnow(),
-            ticker=first_ticker,
-            action=TradeAction.HOLD,
-            quantity=0,
-            confidence=0.0,
-            reasoning=f"Agent error, defaulting to hold: {e}",
-            price_at_decision=prices.get(first_ticker, 1.0),
-        )
+        return [_hold_decision(config, snapshot, prices, 0.0, f"Agent error, defaulting to hold: {e}")]
@@ -2,20 +2,83 @@
 
 from __future__ import annotations
 
-import asyncio
 import uuid
+from collections.abc import AsyncIterator
 from datetime import date as date_type
 from typing import Any
 
-from litestar import Controller, get, post, put
-from litestar.exceptions import NotFoundException, ValidationException
+from litestar import Controller, MediaType, Response, get, post, put
+from litestar.exceptions import (
+    ClientException,
+    NotFoundException,
+    TooManyRequestsException,
+    ValidationException,
+)
+from litestar.params import Parameter
+from litestar.response import ServerSentEvent, ServerSentEventMessage
+from litestar.status_codes import HTTP_202_ACCEPTED, HTTP_304_NOT_MODIFIED, HTTP_409_CONFLICT
+from pydantic import TypeAdapter
 
-from trading_sim.api.schemas import CreateSimulationRequest, UpdateAgentRequest
-from trading_sim.config import AgentConfig, AppConfig, ModelParameters, load_config
-from trading_sim.models.results import SimulationResult, SimulationStatus, SimulationSummary
-from trading_sim.models.trades import TradeDecision
-from trading_sim.simulation.runner import run_simulation
-from trading_sim.simulation.storage import get_simulation, list_simulations, save_simulation
+from trading_sim.agents.decision_cache import get_decision_cache
+from trading_sim.agents.http_pool import get_http_pool
+from trading_sim.agents.pool import get_agent_pool
+from trading_sim.agents.resilience import get_provider_health
+from trading_sim.agents.scheduler import get_llm_scheduler
+from trading_sim.api.response_cache import (
+    TERMINAL_STATUSES,
+    CachedResponse,
+    etag_matches,
+    get_response_cache,
+    make_response,
+)
+from trading_sim.api.schemas import (
+    CancelResponse,
+    CreateSimulationRequest,
+    CreateSweepRequest,
+    RiskSeries,
+    SimulationPage,
+    SweepResponse,
+    TradePage,
+    UpdateAgentRequest,
+)
+from trading_sim.config import AgentConfig, AppConfig, load_config
+from trading_sim.models.results import HistoryPoint, SimulationResult, SimulationStatus
+from trading_sim.models.trades import TradeAction
+from trading_sim.settings import get_job_queue_max_depth
+from trading_sim.simulation.checkpoints import SimulationParams
+from trading_sim.simulation.event_relay import get_event_relay
+from trading_sim.simulation.events import SimulationEvent, get_event_bus
+from trading_sim.simulation.jobs import QueueFullError, enqueue_simulation, get_job_worker, request_cancel
+from trading_sim.simulation.market_data import get_market_data_cache
+from trading_sim.simulation.metrics import ROLLING_WINDOW, rolling_metrics
+from trading_sim.simulation.storage import (
+    count_simulations,
+    get_simulation,
+    get_simulation_status,
+    list_history,
+    list_simulations,
+    list_trades,
+)
+from trading_sim.simulation.sweep import enqueue_sweep, expand_grid
+from trading_sim.simulation.write_behind import get_write_buffer
+
+# Upper bound on the number of simulations a single sweep request may expand to
+MAX_SWEEP_RUNS = 1000
+
+# Retry-After sent with 429 responses when the job queue is full
+QUEUE_FULL_RETRY_AFTER_S = 10
+
+# Largest rolling window accepted by the risk endpoint, about four trading years
+MAX_RISK_WINDOW = 1008
+
+# Page sizes for paginated listings
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Reconnect delay suggested to streaming clients once a stream ends
+STREAM_RETRY_MS = 3000
+
+_RISK_SERIES_LIST = TypeAdapter(list[RiskSeries])
 
 # Mutable config — loaded once at startup, can be updated via API
 _config: AppConfig | None = None
@@ -42,6 +105,19 @@ def _agent_to_dict(a: AgentConfig) -> dict[str, Any]:
     }
 
 
+def _respond(entry: CachedResponse, if_none_match: str | None) -> Response[bytes]:
+    """Send a serialized body with its ETag, or a 304 if the client already has it."""
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, entry.etag):
+        get_response_cache().not_modified += 1
+        return Response(content=b"", status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type=MediaType.JSON, headers=headers)
+
+
+async def _single_event(event: SimulationEvent) -> AsyncIterator[SimulationEvent]:
+    yield event
+
+
 class AgentController(Controller):
     path = "/agents"
 
@@ -86,13 +162,11 @@ class AgentController(Controller):
                 if data.max_tokens is not None:
                     param_updates["max_tokens"] = data.max_tokens
                 if param_updates:
-                    updates["parameters"] = ModelParameters(
-                        temperature=data.temperature if data.temperature is not None else a.parameters.temperature,
-                        max_tokens=data.max_tokens if data.max_tokens is not None else a.parameters.max_tokens,
-                    )
+                    updates["parameters"] = a.parameters.model_copy(update=param_updates)
 
                 updated = a.model_copy(update=updates)
                 config.agents[i] = updated
+                get_agent_pool().invalidate(agent_id)
                 return _agent_to_dict(updated)
 
         raise NotFoundException(detail=f"Agent '{agent_id}' not found")
@@ -102,13 +176,30 @@ class SimulationController(Controller):
     path = "/simulations"
 
     @get("/")
-    async def list_sims(self) -> list[SimulationSummary]:
-        """List all simulation runs."""
-        return await list_simulations()
+    async def list_sims(
+        self,
+        status: SimulationStatus | None = None,
+        agent_id: str | None = None,
+        cursor: str | None = None,
+        limit: int = Parameter(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    ) -> SimulationPage:
+        """List simulation runs newest first, optionally filtered by status or agent."""
+        try:
+            items, next_cursor = await list_simulations(
+                status=status, agent_id=agent_id, cursor=cursor, limit=limit
+            )
+        except ValueError as e:
+            raise ValidationException(detail=str(e)) from e
+        return SimulationPage(items=items, next_cursor=next_cursor)
+
+    @get("/counts")
+    async def count_sims(self) -> dict[str, int]:
+        """Number of simulation runs per status."""
+        return await count_simulations()
 
     @post("/")
     async def create_simulation(self, data: CreateSimulationRequest) -> SimulationResult:
-        """Start a new simulation run."""
+        """Queue a new simulation run; 429 if the queue is full."""
         config = _get_config()
         agent_map = {a.id: a for a in config.agents}
 
@@ -128,40 +219,214 @@ class SimulationController(Controller):
             tickers=data.tickers or [],
             agent_ids=data.agent_ids,
         )
-        await save_simulation(placeholder)
-
-        async def _run() -> None:
-            await run_simulation(
-                agent_configs=selected,
-                tickers=data.tickers,
-                start_date=data.start_date,
-                end_date=data.end_date,
-                sim_id=sim_id,
+        params = SimulationParams(
+            agent_configs=selected,
+            tickers=data.tickers,
+            start_date=data.start_date,
+            end_date=data.end_date,
+            data_source=data.data_source,
+            interval=data.interval,
+            decision_policies=data.decision_policies,
+        )
+        try:
+            await enqueue_simulation(placeholder, params, data.priority, get_job_queue_max_depth())
+        except QueueFullError as e:
+            raise TooManyRequestsException(
+                detail=str(e), headers={"Retry-After": str(QUEUE_FULL_RETRY_AFTER_S)}
+            ) from e
+        get_job_worker().notify()
+        return placeholder
+
+    @post("/{sim_id:str}/cancel", status_code=HTTP_202_ACCEPTED)
+    async def cancel_sim(self, sim_id: str) -> CancelResponse:
+        """Cancel a queued simulation, or ask the worker running one to stop it."""
+        outcome = await request_cancel(sim_id)
+        if outcome is None:
+            status = await get_simulation_status(sim_id)
+            if status is None:
+                raise NotFoundException(detail=f"Simulation '{sim_id}' not found")
+            raise ClientException(
+                detail=f"Simulation '{sim_id}' is {status[0].value} and cannot be cancelled",
+                status_code=HTTP_409_CONFLICT,
             )
+        return CancelResponse(id=sim_id, status=outcome)
 
-        asyncio.create_task(_run())
-        return placeholder
+    @post("/sweeps")
+    async def create_sweep(self, data: CreateSweepRequest) -> SweepResponse:
+        """Queue a simulation for every point of a parameter grid; 429 if the queue cannot take them all."""
+        config = _get_config()
+        known = {a.id for a in config.agents}
+        for roster in data.agent_rosters:
+            for aid in roster:
+                if aid not in known:
+                    raise ValidationException(detail=f"Unknown agent ID: '{aid}'")
+
+        runs = expand_grid(data)
+        if len(runs) > MAX_SWEEP_RUNS:
+            raise ValidationException(
+                detail=f"Sweep expands to {len(runs)} simulations (max {MAX_SWEEP_RUNS})"
+            )
+
+        try:
+            await enqueue_sweep(runs, config.agents, data.priority, get_job_queue_max_depth())
+        except QueueFullError as e:
+            raise TooManyRequestsException(
+                detail=str(e), headers={"Retry-After": str(QUEUE_FULL_RETRY_AFTER_S)}
+            ) from e
+        get_job_worker().notify()
+        return SweepResponse(simulation_ids=[r.sim_id for r in runs])
 
     @get("/{sim_id:str}")
-    async def get_sim(self, sim_id: str) -> SimulationResult:
-        """Get simulation results by ID."""
-        result = await get_simulation(sim_id)
-        if result is None:
-            raise NotFoundException(detail=f"Simulation '{sim_id}' not found")
-        return result
+    async def get_sim(
+        self,
+        sim_id: str,
+        if_none_match: str | None = Parameter(header="If-None-Match", default=None),
+    ) -> Response[bytes]:
+        """Get simulation results by ID; finished simulations are served from memory."""
+        cache = get_response_cache()
+        key = (sim_id, "result")
+        entry = cache.get(key)
+        if entry is None:
+            result = await get_simulation(sim_id)
+            if result is None:
+                raise NotFoundException(detail=f"Simulation '{sim_id}' not found")
+            entry = make_response(result.model_dump_json().encode())
+            if result.status in TERMINAL_STATUSES:
+                cache.put(key, entry)
+        return _respond(entry, if_none_match)
+
+    @get("/{sim_id:str}/stream")
+    async def stream_sim(
+        self,
+        sim_id: str,
+        last_event_id: int = Parameter(header="Last-Event-ID", default=0),
+    ) -> ServerSentEvent:
+        """Stream valuations, trades and status changes of a simulation as server-sent events.
+
+        Unfinished simulations replay the events after ``Last-Event-ID`` and then
+        follow live, from this process's event bus while it runs them and
+        through the event relay otherwise; finished ones send a single status event.
+        """
+        bus = get_event_bus()
+        events: AsyncIterator[SimulationEvent]
+        if bus.is_active(sim_id):
+            events = bus.subscribe(sim_id, after=last_event_id)
+        else:
+            status = await get_simulation_status(sim_id)
+            if status is None:
+                raise NotFoundException(detail=f"Simulation '{sim_id}' not found")
+            if status[0] in TERMINAL_STATUSES:
+                events = _single_event(SimulationEvent(type="status", sim_id=sim_id, status=status[0], error=status[1]))
+            else:
+                # Queued, or run by another process
+                events = get_event_relay().follow(sim_id, after=last_event_id)
+
+        async def messages() -> AsyncIterator[ServerSentEventMessage]:
+            async for event in events:
+                yield ServerSentEventMessage(
+                    data=event.model_dump_json(exclude_none=True), event=event.type, id=event.id
+                )
+
+        return ServerSentEvent(messages(), retry_duration=STREAM_RETRY_MS)
 
     @get("/{sim_id:str}/trades")
-    async def get_sim_trades(self, sim_id: str, agent_id: str | None = None) -> list[TradeDecision]:
-        """Get trades for a simulation, optionally filtered by agent."""
-        result = await get_simulation(sim_id)
-        if result is None:
+    async def get_sim_trades(
+        self,
+        sim_id: str,
+        agent_id: str | None = None,
+        ticker: str | None = None,
+        action: TradeAction | None = None,
+        start_date: date_type | None = None,
+        end_date: date_type | None = None,
+        cursor: int | None = None,
+        limit: int = Parameter(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        if_none_match: str | None = Parameter(header="If-None-Match", default=None),
+    ) -> Response[bytes]:
+        """Get a page of trades for a simulation in trading-day order, filtered by agent, ticker, action or date."""
+        cache = get_response_cache()
+        key = (sim_id, "trades", agent_id, ticker, action, start_date, end_date, cursor, limit)
+        entry = cache.get(key)
+        if entry is not None:
+            return _respond(entry, if_none_match)
+
+        status = await get_simulation_status(sim_id)
+        if status is None:
+            raise NotFoundException(detail=f"Simulation '{sim_id}' not found")
+        items, next_cursor = await list_trades(
+            sim_id,
+            agent_id=agent_id,
+            ticker=ticker,
+            action=action,
+            start_date=start_date,
+            end_date=end_date,
+            cursor=cursor,
+            limit=limit,
+        )
+        entry = make_response(TradePage(items=items, next_cursor=next_cursor).model_dump_json().encode())
+        if status[0] in TERMINAL_STATUSES:
+            cache.put(key, entry)
+        return _respond(entry, if_none_match)
+
+    @get("/{sim_id:str}/history")
+    async def get_sim_history(
+        self,
+        sim_id: str,
+        agent_id: str | None = None,
+        start_date: date_type | None = None,
+        end_date: date_type | None = None,
+    ) -> list[HistoryPoint]:
+        """Get per-step portfolio values for a simulation, optionally filtered by agent and date."""
+        if await get_simulation_status(sim_id) is None:
             raise NotFoundException(detail=f"Simulation '{sim_id}' not found")
+        return await list_history(sim_id, agent_id=agent_id, start_date=start_date, end_date=end_date)
+
+    @get("/{sim_id:str}/risk")
+    async def get_sim_risk(
+        self,
+        sim_id: str,
+        agent_id: str | None = None,
+        window: int = Parameter(default=ROLLING_WINDOW, ge=2, le=MAX_RISK_WINDOW),
+        if_none_match: str | None = Parameter(header="If-None-Match", default=None),
+    ) -> Response[bytes]:
+        """Get rolling volatility, Sharpe, Sortino, Calmar and underwater series per agent."""
+        cache = get_response_cache()
+        key = (sim_id, "risk", agent_id, window)
+        entry = cache.get(key)
+        if entry is None:
+            result = await get_simulation(sim_id, with_trades=False)
+            if result is None:
+                raise NotFoundException(detail=f"Simulation '{sim_id}' not found")
+            series = [
+                RiskSeries(
+                    agent_id=ar.agent_id,
+                    date_labels=ar.date_labels,
+                    **rolling_metrics(ar.portfolio_history, window).to_json(),
+                )
+                for ar in result.agent_results.values()
+                if agent_id is None or ar.agent_id == agent_id
+            ]
+            entry = make_response(_RISK_SERIES_LIST.dump_json(series))
+            if result.status in TERMINAL_STATUSES:
+                cache.put(key, entry)
+        return _respond(entry, if_none_match)
 
-        trades: list[TradeDecision] = []
-        for aid, agent_result in result.agent_results.items():
-            if agent_id is not None and aid != agent_id:
-                continue
-            trades.extend(agent_result.trades)
 
-        trades.sort(key=lambda t: t.timestamp)
-        return trades
+class MetricsController(Controller):
+    path = "/metrics"
+
+    @get("/")
+    async def get_metrics(self) -> dict[str, Any]:
+        """Process-level cache and resource counters."""
+        return {
+            "market_data_cache": get_market_data_cache().info(),
+            "llm_scheduler": get_llm_scheduler().stats(),
+            "decision_cache": get_decision_cache().stats(),
+            "agent_pool": get_agent_pool().stats(),
+            "llm_http": get_http_pool().stats(),
+            "provider_health": get_provider_health().stats(),
+            "event_bus": get_event_bus().stats(),
+            "event_relay": get_event_relay().stats(),
+            "write_behind": get_write_buffer().stats(),
+            "response_cache": get_response_cache().stats(),
+            "job_worker": get_job_worker().stats(),
+        }
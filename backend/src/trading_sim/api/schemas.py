@@ -1,15 +1,29 @@
 """Request/response schemas for the API layer."""
 
 from datetime import date
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
+from trading_sim.models.results import SimulationSummary
+from trading_sim.models.trades import TradeDecision
+from trading_sim.simulation.sweep import SweepGrid
+from trading_sim.simulation.triggers import DecisionPolicy
+
 
 class CreateSimulationRequest(BaseModel):
     agent_ids: list[str] = Field(min_length=1, description="IDs of agents to include")
     tickers: list[str] | None = Field(default=None, description="Tickers to simulate (default: AAPL, GOOGL, MSFT, AMZN, TSLA)")
     start_date: date | None = Field(default=None, description="Simulation start date (default: 2024-01-02)")
     end_date: date | None = Field(default=None, description="Simulation end date (default: 2024-12-31)")
+    data_source: Literal["mock", "store"] = Field(default="mock", description="Generated mock data or the historical bar store")
+    interval: Literal["1d", "1m"] = Field(default="1d", description="Bar interval (the mock source only supports 1d)")
+    decision_policies: list[DecisionPolicy] | None = Field(
+        default=None,
+        min_length=1,
+        description="When agents make decisions; any firing policy triggers one (default: every 5 trading days)",
+    )
+    priority: int = Field(default=0, description="Queued simulations with a higher priority run first")
 
 
 class UpdateAgentRequest(BaseModel):
@@ -21,3 +35,46 @@ class UpdateAgentRequest(BaseModel):
     temperature: float | None = Field(default=None, ge=0.0, le=2.0)
     max_tokens: int | None = Field(default=None, gt=0)
     initial_capital: float | None = Field(default=None, gt=0)
+
+
+class CreateSweepRequest(SweepGrid):
+    """Parameter grid for a batch of simulations queued as jobs."""
+
+    priority: int = Field(default=0, description="Queued simulations with a higher priority run first")
+
+
+class SweepResponse(BaseModel):
+    simulation_ids: list[str]
+
+
+class TradePage(BaseModel):
+    items: list[TradeDecision]
+    next_cursor: int | None = Field(default=None, description="Pass as `cursor` to get the next page")
+
+
+class SimulationPage(BaseModel):
+    items: list[SimulationSummary]
+    next_cursor: str | None = Field(default=None, description="Pass as `cursor` to get the next page")
+
+
+class CancelResponse(BaseModel):
+    id: str
+    status: Literal["cancelled", "cancelling"] = Field(
+        description="`cancelled` if it had not started; `cancelling` while its worker stops it"
+    )
+
+
+class RiskSeries(BaseModel):
+    """Rolling risk metrics of one agent, aligned with its portfolio history.
+
+    Values are null where undefined, e.g. before the first full window.
+    """
+
+    agent_id: str
+    window: int
+    date_labels: list[str]
+    volatility_pct: list[float | None] = Field(description="Annualized volatility of daily returns")
+    sharpe: list[float | None]
+    sortino: list[float | None]
+    calmar: list[float | None] = Field(description="Annualized return over the window / its max drawdown")
+    underwater_pct: list[float | None] = Field(description="Distance below the running peak (<= 0)")
@@ -1,7 +1,7 @@
 """Configuration loading for agent and model settings."""
 
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 import yaml
 from pydantic import BaseModel, Field
@@ -10,6 +10,16 @@ from pydantic import BaseModel, Field
 class ModelParameters(BaseModel):
     temperature: float = 0.5
     max_tokens: int = 1024
+    # Only used by the offline "local" provider
+    simulated_latency_ms: float = Field(default=0.0, ge=0.0)
+    simulated_failure_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+
+
+class FallbackModel(BaseModel):
+    """Model to use when the agent's own provider is slow or unhealthy."""
+
+    model_provider: str
+    model_id: str
 
 
 class AgentConfig(BaseModel):
@@ -21,10 +31,40 @@ class AgentConfig(BaseModel):
     model_id: str = "gpt-4o"
     parameters: ModelParameters = Field(default_factory=ModelParameters)
     initial_capital: float = 100_000.0
+    fallback: FallbackModel | None = None
+
+
+class ProviderLimits(BaseModel):
+    """Limits applied to LLM calls for one provider or provider:model pair."""
+
+    max_concurrency: int = Field(default=8, gt=0)
+    requests_per_minute: float | None = Field(default=None, gt=0)
+    tokens_per_minute: float | None = Field(default=None, gt=0)
+
+
+class CallPolicy(BaseModel):
+    """Deadline, hedging and circuit-breaker settings for one provider's calls."""
+
+    deadline_s: float = Field(default=60.0, gt=0, description="Upper bound on one decision, queueing included")
+    hedge_percentile: float | None = Field(
+        default=None, gt=0, lt=100, description="Send a hedge request once a call is slower than this latency percentile"
+    )
+    hedge_min_samples: int = Field(default=20, gt=0, description="Latency samples needed before hedging starts")
+    hedge_to: Literal["same", "fallback"] = "same"
+    failure_threshold: int = Field(default=5, gt=0, description="Consecutive failures that open the circuit")
+    cooldown_s: float = Field(default=30.0, gt=0, description="Time an open circuit waits before a trial call")
 
 
 class AppConfig(BaseModel):
     agents: list[AgentConfig]
+    provider_limits: dict[str, ProviderLimits] = Field(
+        default_factory=dict,
+        description="Keyed by provider (e.g. 'openai') or 'provider:model_id'",
+    )
+    call_policies: dict[str, CallPolicy] = Field(
+        default_factory=dict,
+        description="Keyed by provider (e.g. 'openai') or 'provider:model_id'",
+    )
 
 
 def load_config(config_path: Path | None = None) -> AppConfig:
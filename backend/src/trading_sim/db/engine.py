@@ -2,10 +2,56 @@
 
 from __future__ import annotations
 
+from sqlalchemy import insert, select, text, update
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from trading_sim.settings import get_database_url
 
+# create_all only creates missing tables, so changes to existing ones are
+# applied here, each step once per database: schema_version records how many
+# steps have run. Databases from before schema_version start at step 0, so
+# schema steps must still be idempotent. Append new steps; never edit old ones.
+_MIGRATIONS: tuple[tuple[str, ...], ...] = (
+    ("ALTER TABLE simulations ADD COLUMN IF NOT EXISTS params JSON",),
+    # Results stored before simulation_trades keep their trades in the
+    # agent_results JSON: copy them over in trading-day order, then strip them
+    (
+        """
+        INSERT INTO simulation_trades (simulation_id, agent_id, market_date, timestamp, ticker, action,
+                                       quantity, confidence, reasoning, price_at_decision)
+        SELECT s.id, t->>'agent_id', (t->>'market_date')::date, (t->>'timestamp')::timestamp, t->>'ticker',
+               t->>'action', (t->>'quantity')::int, (t->>'confidence')::float, t->>'reasoning',
+               (t->>'price_at_decision')::float
+        FROM simulations s
+        CROSS JOIN LATERAL jsonb_each(s.agent_results::jsonb) AS a(agent_id, result)
+        CROSS JOIN LATERAL jsonb_path_query(a.result, '$.trades[*]') AS t
+        ORDER BY s.id, (t->>'market_date')::date NULLS FIRST, (t->>'timestamp')::timestamp
+        """,
+        """
+        UPDATE simulations
+        SET agent_results = (
+            SELECT jsonb_object_agg(a.agent_id, a.result - 'trades')
+            FROM jsonb_each(agent_results::jsonb) AS a(agent_id, result)
+        )::json
+        WHERE EXISTS (
+            SELECT 1 FROM jsonb_each(agent_results::jsonb) AS a(agent_id, result)
+            WHERE jsonb_path_exists(a.result, '$.trades')
+        )
+        """,
+    ),
+    # Keyset pagination and the agent filter of the simulation listing
+    (
+        "CREATE INDEX IF NOT EXISTS ix_simulations_created_at_id ON simulations (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_simulations_status_created_at_id ON simulations (status, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_simulations_agent_ids ON simulations USING gin ((agent_ids::jsonb))",
+    ),
+    # Progress of running simulations, written by the batched progress updates
+    ("ALTER TABLE simulations ADD COLUMN IF NOT EXISTS progress FLOAT NOT NULL DEFAULT 0",),
+)
+
+# Serializes init_db across processes starting at once, so each step runs once
+_MIGRATION_LOCK_ID = 0x7472_6164_696E_67
+
 _engine: AsyncEngine | None = None
 _session_factory: async_sessionmaker[AsyncSession] | None = None
 
@@ -33,12 +79,21 @@ def get_session_factory() -> async_sessionmaker[AsyncSession]:
 
 
 async def init_db() -> None:
-    """Create all tables (used at startup)."""
-    from trading_sim.db.tables import Base
+    """Create missing tables and apply pending migration steps (used at startup)."""
+    from trading_sim.db.tables import Base, SchemaVersionRow
 
     engine = get_engine()
     async with engine.begin() as conn:
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": _MIGRATION_LOCK_ID})
         await conn.run_sync(Base.metadata.create_all)
+        version = (await conn.execute(select(SchemaVersionRow.version))).scalar_one_or_none()
+        for step in _MIGRATIONS[version or 0:]:
+            for statement in step:
+                await conn.execute(text(statement))
+        if version is None:
+            await conn.execute(insert(SchemaVersionRow).values(version=len(_MIGRATIONS)))
+        elif version < len(_MIGRATIONS):
+            await conn.execute(update(SchemaVersionRow).values(version=len(_MIGRATIONS)))
 
 
 async def close_db() -> None:
@@ -4,13 +4,19 @@ from datetime import date, datetime
 
 from sqlalchemy import (
     JSON,
+    BigInteger,
+    Boolean,
+    Date,
     DateTime,
     Enum,
     Float,
+    ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     func,
+    text,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
@@ -21,6 +27,17 @@ class Base(DeclarativeBase):
 
 class SimulationRow(Base):
     __tablename__ = "simulations"
+    __table_args__ = (
+        # Keyset pagination of the listing, newest first, optionally by status
+        Index("ix_simulations_created_at_id", "created_at", "id"),
+        Index("ix_simulations_status_created_at_id", "status", "created_at", "id"),
+        # Agent filter: JSONB containment on agent_ids
+        Index(
+            "ix_simulations_agent_ids",
+            text("(agent_ids::jsonb)"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[str] = mapped_column(String(32), primary_key=True)
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
@@ -33,3 +50,105 @@ class SimulationRow(Base):
     agent_ids: Mapped[dict] = mapped_column(JSON, nullable=False, default=list)
     agent_results: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Fraction of agent-days simulated so far, 0..1
+    progress: Mapped[float] = mapped_column(Float, nullable=False, default=0.0, server_default="0")
+    # Everything needed to rerun or resume the simulation (see SimulationParams)
+    params: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+
+
+class CheckpointRow(Base):
+    """Latest saved progress of one agent in a running simulation."""
+
+    __tablename__ = "simulation_checkpoints"
+
+    simulation_id: Mapped[str] = mapped_column(
+        String(32), ForeignKey("simulations.id", ondelete="CASCADE"), primary_key=True
+    )
+    agent_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    next_day: Mapped[int] = mapped_column(Integer, nullable=False)
+    state: Mapped[dict] = mapped_column(JSON, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class TradeRow(Base):
+    """One executed decision; ids follow trading-day order within a simulation."""
+
+    __tablename__ = "simulation_trades"
+    __table_args__ = (
+        Index("ix_simulation_trades_sim", "simulation_id", "id"),
+        Index("ix_simulation_trades_sim_agent", "simulation_id", "agent_id", "id"),
+        Index("ix_simulation_trades_sim_ticker", "simulation_id", "ticker", "id"),
+        Index("ix_simulation_trades_sim_date", "simulation_id", "market_date"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    simulation_id: Mapped[str] = mapped_column(
+        String(32), ForeignKey("simulations.id", ondelete="CASCADE"), nullable=False
+    )
+    agent_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    market_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    ticker: Mapped[str] = mapped_column(String(16), nullable=False)
+    action: Mapped[str] = mapped_column(String(8), nullable=False)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    confidence: Mapped[float] = mapped_column(Float, nullable=False)
+    reasoning: Mapped[str] = mapped_column(Text, nullable=False)
+    price_at_decision: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class JobRow(Base):
+    """A simulation waiting for or claimed by a worker (see simulation.jobs)."""
+
+    __tablename__ = "simulation_jobs"
+    __table_args__ = (
+        # Claim order and queue depth, over queued jobs only
+        Index(
+            "ix_simulation_jobs_queued",
+            text("priority DESC"),
+            "id",
+            postgresql_where=text("status = 'queued'"),
+        ),
+        # Stale running jobs whose worker stopped heartbeating
+        Index("ix_simulation_jobs_status_heartbeat", "status", "heartbeat_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    simulation_id: Mapped[str] = mapped_column(
+        String(32), ForeignKey("simulations.id", ondelete="CASCADE"), nullable=False, unique=True
+    )
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    worker_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class EventRow(Base):
+    """A relayed progress event of a simulation (see simulation.event_relay)."""
+
+    __tablename__ = "simulation_events"
+    __table_args__ = (Index("ix_simulation_events_sim", "simulation_id", "id"),)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    simulation_id: Mapped[str] = mapped_column(
+        String(32), ForeignKey("simulations.id", ondelete="CASCADE"), nullable=False
+    )
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class SchemaVersionRow(Base):
+    """Number of db.engine migrations applied to this database (a single row)."""
+
+    __tablename__ = "schema_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
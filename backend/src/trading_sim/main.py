@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
@@ -9,9 +11,15 @@ from contextlib import asynccontextmanager
 from litestar import Litestar
 from litestar.config.cors import CORSConfig
 
-from trading_sim.api.routes import AgentController, SimulationController
+from trading_sim.agents.http_pool import close_http_pool
+from trading_sim.agents.pool import get_agent_pool
+from trading_sim.api.routes import AgentController, MetricsController, SimulationController
 from trading_sim.db.engine import close_db, init_db
-from trading_sim.settings import get_cors_origins
+from trading_sim.settings import get_cors_origins, get_embedded_worker, get_resume_on_startup
+from trading_sim.simulation.event_relay import get_event_relay
+from trading_sim.simulation.jobs import get_job_worker
+from trading_sim.simulation.runner import resume_interrupted_simulations
+from trading_sim.simulation.write_behind import get_write_buffer
 from trading_sim.telemetry import setup_telemetry
 
 logging.basicConfig(
@@ -24,12 +32,29 @@ logging.basicConfig(
 async def lifespan(app: Litestar) -> AsyncGenerator[None, None]:
     setup_telemetry()
     await init_db()
+    get_write_buffer().start()
+    get_event_relay().start()
+    # Simulations interrupted by a crash or restart carry on from their checkpoints
+    resume_task = asyncio.create_task(resume_interrupted_simulations()) if get_resume_on_startup() else None
+    # Queued simulations also run here unless dedicated workers (trading-sim-worker) handle them
+    if get_embedded_worker():
+        get_job_worker().start()
     yield
+    if resume_task is not None:
+        resume_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await resume_task
+    await get_job_worker().stop()
+    # Pooled agents hold references to the shared clients, so drop them together
+    get_agent_pool().clear()
+    await close_http_pool()
+    await get_write_buffer().stop()
+    await get_event_relay().stop()
     await close_db()
 
 
 app = Litestar(
-    route_handlers=[AgentController, SimulationController],
+    route_handlers=[AgentController, SimulationController, MetricsController],
     path="/api",
     cors_config=CORSConfig(
         allow_origins=get_cors_origins(),
@@ -14,6 +14,7 @@ class SimulationStatus(str, Enum):
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
 
 
 class PerformanceMetrics(BaseModel):
@@ -22,6 +23,7 @@ class PerformanceMetrics(BaseModel):
     max_drawdown_pct: float = 0.0
     win_rate: float = 0.0
     total_trades: int = 0
+    realized_pnl: float = Field(default=0.0, description="Gains less losses of sells at average cost")
 
 
 class AgentResult(BaseModel):
@@ -54,6 +56,7 @@ class SimulationResult(BaseModel):
     agent_ids: list[str]
     agent_results: dict[str, AgentResult] = Field(default_factory=dict)
     error: str | None = None
+    progress: float = Field(default=0.0, description="Fraction of agent-days simulated so far")
 
 
 class SimulationSummary(BaseModel):
@@ -66,3 +69,13 @@ class SimulationSummary(BaseModel):
     end_date: date
     tickers: list[str]
     agent_ids: list[str]
+    progress: float = 0.0
+
+
+class HistoryPoint(BaseModel):
+    """Portfolio value of one agent at one simulation step."""
+
+    agent_id: str
+    day: int
+    at: datetime
+    value: float
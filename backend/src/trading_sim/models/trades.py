@@ -1,6 +1,6 @@
 """Trade decision schemas."""
 
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
 from pydantic import BaseModel, Field
@@ -23,3 +23,4 @@ class TradeDecision(BaseModel):
     confidence: float = Field(ge=0.0, le=1.0, description="Confidence in decision 0-1")
     reasoning: str = Field(description="LLM's reasoning for this trade")
     price_at_decision: float = Field(gt=0)
+    market_date: date | None = Field(default=None, description="Trading day the decision was made on")
@@ -23,3 +23,104 @@ def get_otel_enabled() -> bool:
 def get_cors_origins() -> list[str]:
     raw = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:3000")
     return [o.strip() for o in raw.split(",") if o.strip()]
+
+
+def get_market_data_cache_size() -> int:
+    return int(os.getenv("MARKET_DATA_CACHE_SIZE", "16"))
+
+
+def get_bar_store_path() -> str:
+    return os.getenv("BAR_STORE_PATH", "data/bars")
+
+
+def get_decision_cache_mode() -> str:
+    """One of ``off``, ``record`` (read-through) or ``replay`` (fail on miss)."""
+    return os.getenv("DECISION_CACHE_MODE", "off").lower()
+
+
+def get_decision_cache_dir() -> str:
+    return os.getenv("DECISION_CACHE_DIR", "data/decision_cache")
+
+
+def get_decision_cache_max_bytes() -> int:
+    return int(os.getenv("DECISION_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def get_agent_pool_size() -> int:
+    return int(os.getenv("AGENT_POOL_SIZE", "64"))
+
+
+def get_http_max_connections() -> int:
+    return int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+
+
+def get_http_max_keepalive() -> int:
+    return int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+
+
+def get_http_keepalive_expiry() -> float:
+    return float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+
+
+def get_http_timeout() -> float:
+    return float(os.getenv("LLM_HTTP_TIMEOUT", "600"))
+
+
+def get_http2_enabled() -> bool:
+    return os.getenv("LLM_HTTP2", "true").lower() in ("true", "1", "yes")
+
+
+def get_checkpoint_interval() -> float:
+    """Minimum seconds between checkpoints of one agent's progress."""
+    return float(os.getenv("CHECKPOINT_INTERVAL_S", "5"))
+
+
+def get_resume_on_startup() -> bool:
+    return os.getenv("RESUME_ON_STARTUP", "true").lower() in ("true", "1", "yes")
+
+
+def get_write_behind_interval() -> float:
+    """Seconds between batched writes of simulation progress; 0 disables them."""
+    return float(os.getenv("WRITE_BEHIND_INTERVAL_S", "1"))
+
+
+def get_event_relay_interval() -> float:
+    """Seconds between batched relays of simulation events to other processes; 0 disables them."""
+    return float(os.getenv("EVENT_RELAY_INTERVAL_S", "0.2"))
+
+
+def get_history_dtype() -> str:
+    """Float width of stored portfolio histories: ``float64`` (lossless) or ``float32``."""
+    return os.getenv("HISTORY_DTYPE", "float64").lower()
+
+
+def get_response_cache_max_bytes() -> int:
+    return int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def get_job_queue_max_depth() -> int:
+    """Queued simulations beyond which new ones are rejected with 429."""
+    return int(os.getenv("JOB_QUEUE_MAX_DEPTH", "1000"))
+
+
+def get_worker_concurrency() -> int:
+    """Simulations one worker process runs at once."""
+    return int(os.getenv("WORKER_CONCURRENCY", "4"))
+
+
+def get_embedded_worker() -> bool:
+    """Whether the API process also runs queued simulations."""
+    return os.getenv("EMBEDDED_WORKER", "true").lower() in ("true", "1", "yes")
+
+
+def get_job_poll_interval() -> float:
+    return float(os.getenv("JOB_POLL_INTERVAL_S", "1"))
+
+
+def get_job_heartbeat_interval() -> float:
+    return float(os.getenv("JOB_HEARTBEAT_INTERVAL_S", "5"))
+
+
+def get_job_stale_after() -> float:
+    """Seconds without a heartbeat after which a running job is handed to another worker."""
+    return float(os.getenv("JOB_STALE_AFTER_S", "60"))
@@ -1,6 +1,7 @@
 """Simulation runner and market data handling."""
 
+from trading_sim.simulation.frame import MarketFrame
 from trading_sim.simulation.market_data import generate_mock_data
 from trading_sim.simulation.runner import run_simulation
 
-__all__ = ["generate_mock_data", "run_simulation"]
+__all__ = ["MarketFrame", "generate_mock_data", "run_simulation"]
@@ -0,0 +1,282 @@
+"""On-disk historical bar store backed by memory-mapped column files.
+
+Layout::
+
+    <root>/<interval>/<TICKER>/ts.npy
+                              /open.npy, high.npy, low.npy, close.npy, volume.npy
+
+Each column is a plain ``.npy`` array sorted by timestamp. Readers open the
+files with ``mmap_mode="r"``, so slicing a date range never copies data and
+every process reading the same ticker shares the pages through the OS page cache.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import logging
+import os
+import re
+from collections.abc import Iterable
+from datetime import date, timedelta
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+from trading_sim.settings import get_bar_store_path
+from trading_sim.simulation.frame import MarketFrame
+
+logger = logging.getLogger(__name__)
+
+# Timestamp resolution stored for each supported bar interval
+INTERVAL_UNITS: dict[str, str] = {
+    "1d": "D",
+    "1m": "m",
+}
+
+PRICE_COLUMNS = ("open", "high", "low", "close")
+
+# Stored symbols: upper-case letters and digits, plus "." or "-" for share
+# classes (BRK.B); anything else could escape the store root as a path
+_SYMBOL = re.compile(r"[A-Z0-9][A-Z0-9.\-]{0,15}")
+
+
+class BarSeries(NamedTuple):
+    """Read-only views over one ticker's bars within a time range."""
+
+    ts: npt.NDArray[np.datetime64]
+    open: npt.NDArray[np.float64]
+    high: npt.NDArray[np.float64]
+    low: npt.NDArray[np.float64]
+    close: npt.NDArray[np.float64]
+    volume: npt.NDArray[np.int64]
+
+
+def _unit(interval: str) -> str:
+    try:
+        return INTERVAL_UNITS[interval]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported interval '{interval}', expected one of {sorted(INTERVAL_UNITS)}"
+        ) from None
+
+
+def _symbol(ticker: str) -> str:
+    """Normalize a ticker to the upper-case symbol it is stored under."""
+    symbol = ticker.strip().upper()
+    if not _SYMBOL.fullmatch(symbol):
+        raise ValueError(f"Invalid ticker {ticker!r}")
+    return symbol
+
+
+def _write_column(path: Path, values: npt.NDArray[np.generic]) -> None:
+    """Write a column file atomically so concurrent readers never see a partial file."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, values)
+    os.replace(tmp, path)
+
+
+class BarStore:
+    """Reader and writer for per-ticker binary bar columns."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def _ticker_dir(self, ticker: str, interval: str) -> Path:
+        return self.root / interval / _symbol(ticker)
+
+    def tickers(self, interval: str = "1d") -> list[str]:
+        base = self.root / interval
+        if not base.is_dir():
+            return []
+        return sorted(p.name for p in base.iterdir() if (p / "ts.npy").exists())
+
+    def read(
+        self,
+        ticker: str,
+        start: date | None = None,
+        end: date | None = None,
+        interval: str = "1d",
+    ) -> BarSeries:
+        """Return memory-mapped views of a ticker's bars between start and end (inclusive)."""
+        unit = _unit(interval)
+        directory = self._ticker_dir(ticker, interval)
+        if not (directory / "ts.npy").exists():
+            raise KeyError(f"No {interval} bars stored for '{ticker}'")
+
+        ts = np.load(directory / "ts.npy", mmap_mode="r")
+        lo = 0 if start is None else int(np.searchsorted(ts, np.datetime64(start, unit)))
+        hi = len(ts)
+        if end is not None:
+            # End date is inclusive, so cut at the first bar of the following day
+            hi = int(np.searchsorted(ts, np.datetime64(end + timedelta(days=1), unit)))
+
+        columns = {
+            name: np.load(directory / f"{name}.npy", mmap_mode="r")[lo:hi]
+            for name in (*PRICE_COLUMNS, "volume")
+        }
+        return BarSeries(ts=ts[lo:hi], **columns)
+
+    def load_frame(
+        self,
+        tickers: list[str],
+        start: date | None = None,
+        end: date | None = None,
+        interval: str = "1d",
+    ) -> MarketFrame:
+        """Assemble a MarketFrame over the timestamps shared by every ticker.
+
+        A single-ticker frame is a zero-copy view of the mapped files; wider
+        frames copy only the requested window into the (days, tickers) layout.
+        """
+        if not tickers:
+            return MarketFrame.empty([])
+
+        tickers = [_symbol(t) for t in tickers]
+        series = [self.read(t, start, end, interval) for t in tickers]
+        common = series[0].ts
+        for s in series[1:]:
+            if not np.array_equal(s.ts, common):
+                common = np.intersect1d(common, s.ts, assume_unique=True)
+
+        def stack(name: str) -> npt.NDArray[np.generic]:
+            cols = []
+            for s in series:
+                col = getattr(s, name)
+                if len(s.ts) != len(common):
+                    col = col[np.isin(s.ts, common, assume_unique=True)]
+                cols.append(col)
+            if len(cols) == 1:
+                return cols[0][:, np.newaxis]
+            return np.stack(cols, axis=1)
+
+        return MarketFrame(
+            dates=np.asarray(common),
+            tickers=list(tickers),
+            open=stack("open"),
+            high=stack("high"),
+            low=stack("low"),
+            close=stack("close"),
+            volume=stack("volume"),
+        )
+
+    def write(
+        self,
+        ticker: str,
+        ts: npt.NDArray[np.datetime64],
+        open: npt.NDArray[np.float64],
+        high: npt.NDArray[np.float64],
+        low: npt.NDArray[np.float64],
+        close: npt.NDArray[np.float64],
+        volume: npt.NDArray[np.int64],
+        interval: str = "1d",
+    ) -> int:
+        """Merge bars into a ticker's columns. New bars win on duplicate timestamps.
+
+        Returns the number of bars stored for the ticker afterwards.
+        """
+        unit = _unit(interval)
+        new = {
+            "ts": ts.astype(f"datetime64[{unit}]"),
+            "open": open.astype(np.float64),
+            "high": high.astype(np.float64),
+            "low": low.astype(np.float64),
+            "close": close.astype(np.float64),
+            "volume": volume.astype(np.int64),
+        }
+
+        directory = self._ticker_dir(ticker, interval)
+        directory.mkdir(parents=True, exist_ok=True)
+        if (directory / "ts.npy").exists():
+            existing = {name: np.load(directory / f"{name}.npy") for name in new}
+            merged = {name: np.concatenate([new[name], existing[name]]) for name in new}
+        else:
+            merged = new
+
+        # np.unique keeps the first occurrence, which is the newly ingested bar
+        _, keep = np.unique(merged["ts"], return_index=True)
+        for name, values in merged.items():
+            _write_column(directory / f"{name}.npy", values[keep])
+        return len(keep)
+
+
+def ingest_csv(
+    store: BarStore,
+    paths: Iterable[Path],
+    interval: str = "1d",
+) -> dict[str, int]:
+    """Bulk import CSV files into the store.
+
+    Files need a header with ``date`` or ``timestamp``, ``open``, ``high``, ``low``,
+    ``close`` and ``volume`` columns. A ``ticker`` column is optional; without it
+    the file name (e.g. ``AAPL.csv``) names the ticker. Returns bars stored per ticker.
+    """
+    unit = _unit(interval)
+    rows: dict[str, dict[str, list[str]]] = {}
+
+    for path in paths:
+        path = Path(path)
+        with open(path, newline="") as f:
+            reader = csv.DictReader(f)
+            fields = {name.lower(): name for name in reader.fieldnames or []}
+            ts_field = fields.get("timestamp") or fields.get("date")
+            if ts_field is None:
+                raise ValueError(f"{path}: missing 'date' or 'timestamp' column")
+            missing = [c for c in (*PRICE_COLUMNS, "volume") if c not in fields]
+            if missing:
+                raise ValueError(f"{path}: missing columns {missing}")
+            ticker_field = fields.get("ticker")
+
+            for record in reader:
+                ticker = record[ticker_field] if ticker_field else path.stem
+                cols = rows.setdefault(_symbol(ticker), {c: [] for c in ("ts", *PRICE_COLUMNS, "volume")})
+                cols["ts"].append(record[ts_field])
+                for c in (*PRICE_COLUMNS, "volume"):
+                    cols[c].append(record[fields[c]])
+
+    counts: dict[str, int] = {}
+    for ticker, cols in rows.items():
+        counts[ticker] = store.write(
+            ticker,
+            ts=np.array(cols["ts"], dtype=f"datetime64[{unit}]"),
+            open=np.array(cols["open"], dtype=np.float64),
+            high=np.array(cols["high"], dtype=np.float64),
+            low=np.array(cols["low"], dtype=np.float64),
+            close=np.array(cols["close"], dtype=np.float64),
+            volume=np.array(cols["volume"], dtype=np.float64).astype(np.int64),
+            interval=interval,
+        )
+        logger.info("Ingested %d %s bars for %s", len(cols["ts"]), interval, ticker)
+    return counts
+
+
+_store: BarStore | None = None
+
+
+def get_bar_store() -> BarStore:
+    global _store
+    if _store is None:
+        _store = BarStore(Path(get_bar_store_path()))
+    return _store
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command-line entry point for bulk CSV ingest."""
+    parser = argparse.ArgumentParser(description="Import CSV bars into the on-disk bar store")
+    parser.add_argument("paths", nargs="+", type=Path, help="CSV files to import")
+    parser.add_argument("--root", type=Path, default=None, help="Store directory (default: BAR_STORE_PATH)")
+    parser.add_argument("--interval", default="1d", choices=sorted(INTERVAL_UNITS))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    store = BarStore(args.root) if args.root is not None else get_bar_store()
+    counts = ingest_csv(store, args.paths, interval=args.interval)
+    for ticker, n in sorted(counts.items()):
+        print(f"{ticker}: {n} bars")
+
+
+if __name__ == "__main__":
+    main()
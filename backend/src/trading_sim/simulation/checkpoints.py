@@ -0,0 +1,127 @@
+"""Checkpoints of per-agent progress, so interrupted simulations can resume."""
+
+from __future__ import annotations
+
+import logging
+import time
+from datetime import date
+
+from pydantic import BaseModel, Field
+from sqlalchemy import delete, exists, select
+
+from trading_sim.config import AgentConfig
+from trading_sim.db.engine import get_session_factory
+from trading_sim.db.tables import CheckpointRow, JobRow, SimulationRow
+from trading_sim.models.portfolio import Portfolio
+from trading_sim.models.trades import TradeDecision
+from trading_sim.simulation.market_data import DataSource
+from trading_sim.simulation.triggers import DECISION_INTERVAL, DecisionPolicy
+
+logger = logging.getLogger(__name__)
+
+
+class SimulationParams(BaseModel):
+    """Arguments of a run_simulation call, stored so the run can be resumed."""
+
+    agent_configs: list[AgentConfig]
+    tickers: list[str] | None = None
+    start_date: date | None = None
+    end_date: date | None = None
+    data_source: DataSource = "mock"
+    interval: str = "1d"
+    decision_interval: int = DECISION_INTERVAL
+    decision_policies: list[DecisionPolicy] | None = None
+
+
+class AgentCheckpoint(BaseModel):
+    """An agent's progress up to (not including) day ``next_day``."""
+
+    agent_id: str
+    next_day: int = Field(ge=0)
+    last_decision: int = Field(ge=0)
+    peak_value: float
+    realized_pnl: float = 0.0
+    portfolio: Portfolio
+    trades: list[TradeDecision] = Field(default_factory=list)
+    portfolio_history: list[float] = Field(default_factory=list)
+
+
+class Checkpointer:
+    """Saves each agent's checkpoint at most once per ``interval_s`` seconds."""
+
+    def __init__(self, sim_id: str, interval_s: float) -> None:
+        self.sim_id = sim_id
+        self.interval_s = interval_s
+        self._last_saved: dict[str, float] = {}
+
+    def due(self, agent_id: str) -> bool:
+        last = self._last_saved.get(agent_id)
+        return last is None or time.monotonic() - last >= self.interval_s
+
+    async def save(self, checkpoint: AgentCheckpoint) -> None:
+        """Write a checkpoint; failures are logged and never stop the simulation."""
+        self._last_saved[checkpoint.agent_id] = time.monotonic()
+        try:
+            await save_checkpoint(self.sim_id, checkpoint)
+        except Exception as e:
+            logger.warning("Checkpoint of %s/%s failed: %s", self.sim_id, checkpoint.agent_id, e)
+
+
+async def save_checkpoint(sim_id: str, checkpoint: AgentCheckpoint) -> None:
+    """Upsert an agent's checkpoint."""
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        row = await session.get(CheckpointRow, (sim_id, checkpoint.agent_id))
+        state = checkpoint.model_dump(mode="json")
+        if row is None:
+            row = CheckpointRow(
+                simulation_id=sim_id,
+                agent_id=checkpoint.agent_id,
+                next_day=checkpoint.next_day,
+                state=state,
+            )
+        else:
+            row.next_day = checkpoint.next_day
+            row.state = state
+        session.add(row)
+        await session.commit()
+
+
+async def load_checkpoints(sim_id: str) -> dict[str, AgentCheckpoint]:
+    """Latest checkpoint of every agent in a simulation, keyed by agent ID."""
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        stmt = select(CheckpointRow).where(CheckpointRow.simulation_id == sim_id)
+        rows = (await session.execute(stmt)).scalars().all()
+        return {row.agent_id: AgentCheckpoint.model_validate(row.state) for row in rows}
+
+
+async def delete_checkpoints(sim_id: str) -> None:
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        await session.execute(delete(CheckpointRow).where(CheckpointRow.simulation_id == sim_id))
+        await session.commit()
+
+
+async def load_params(sim_id: str) -> SimulationParams | None:
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        row = await session.get(SimulationRow, sim_id)
+        if row is None or row.params is None:
+            return None
+        return SimulationParams.model_validate(row.params)
+
+
+async def list_running_ids() -> list[str]:
+    """IDs of simulations left in RUNNING outside the job queue, oldest first."""
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        stmt = (
+            select(SimulationRow.id)
+            .where(
+                SimulationRow.status == "running",
+                ~exists().where(JobRow.simulation_id == SimulationRow.id),
+            )
+            .order_by(SimulationRow.created_at)
+        )
+        return list((await session.execute(stmt)).scalars())
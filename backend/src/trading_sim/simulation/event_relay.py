@@ -0,0 +1,250 @@
+"""Relay of simulation events between processes through PostgreSQL.
+
+The event bus only reaches streams served by the process that runs a
+simulation. The relay also appends every published event to the
+``simulation_events`` table, in one batch every ``interval_s`` seconds, and
+sends a NOTIFY per simulation. A stream in any other API process follows the
+simulation from that table: it replays the events after the client's last
+event ID, then waits for the next notification (or polls, in case one was
+missed). Events of a run are dropped when it starts again and shortly after it
+finishes. Relayed events are best-effort: a batch that fails to write is lost,
+and its followers only see the final status.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, insert, select, text
+
+from trading_sim.db.engine import get_engine, get_session_factory
+from trading_sim.db.tables import EventRow, SimulationRow
+from trading_sim.models.results import SimulationStatus
+from trading_sim.settings import get_event_relay_interval
+from trading_sim.simulation.events import SimulationEvent, get_event_bus
+from trading_sim.simulation.storage import get_simulation_status
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY channel; the payload is the simulation ID
+CHANNEL = "simulation_events"
+
+# Followers check the table and the simulation's status this often without notifications
+FOLLOW_POLL_INTERVAL_S = 5.0
+
+# Events of finished simulations are kept this long for followers still catching up
+FINISHED_RETENTION_S = 60.0
+
+# Seconds between deletions of the events of finished simulations
+_PRUNE_INTERVAL_S = 30.0
+
+# Delay before listening again after the listening connection failed
+_LISTEN_RETRY_S = 1.0
+
+_FINISHED_STATUSES = frozenset({SimulationStatus.COMPLETED, SimulationStatus.FAILED, SimulationStatus.CANCELLED})
+
+_NOTIFY = text("SELECT pg_notify(:channel, sim_id) FROM unnest(CAST(:sim_ids AS text[])) AS sim_id")
+
+
+class EventRelay:
+    """Writes this process's simulation events to the database and follows anyone's."""
+
+    def __init__(self, interval_s: float) -> None:
+        self.interval_s = interval_s
+        self._pending: list[SimulationEvent] = []
+        self._task: asyncio.Task[None] | None = None
+        self._listener: asyncio.Task[None] | None = None
+        self._waiters: dict[str, set[asyncio.Event]] = {}
+        self.relayed = 0
+        self.flushes = 0
+        self.errors = 0
+        self.notifications = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def append(self, event: SimulationEvent) -> None:
+        """Queue an event for the next batch; a no-op while the relay is not running."""
+        if self._task is None:
+            return
+        self._pending.append(event)
+
+    async def flush(self) -> None:
+        """Write all pending events in one transaction and notify their followers."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        rows = [
+            {"simulation_id": e.sim_id, "payload": e.model_dump(mode="json", exclude={"id"}, exclude_none=True)}
+            for e in pending
+        ]
+        restarted = {e.sim_id for e in pending if e.type == "started"}
+        session_factory = get_session_factory()
+        try:
+            async with session_factory() as session:
+                if restarted:
+                    # A new attempt of the run: events of earlier ones are stale
+                    await session.execute(delete(EventRow).where(EventRow.simulation_id.in_(restarted)))
+                await session.execute(insert(EventRow), rows)
+                await session.execute(_NOTIFY, {"channel": CHANNEL, "sim_ids": sorted({e.sim_id for e in pending})})
+                await session.commit()
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Relay of %d simulation events failed: %s", len(pending), e)
+            return
+        self.flushes += 1
+        self.relayed += len(pending)
+
+    async def prune(self) -> None:
+        """Delete events of finished simulations older than ``FINISHED_RETENTION_S``."""
+        cutoff = datetime.now(UTC) - timedelta(seconds=FINISHED_RETENTION_S)
+        finished = select(SimulationRow.id).where(SimulationRow.status.in_([s.value for s in _FINISHED_STATUSES]))
+        session_factory = get_session_factory()
+        try:
+            async with session_factory() as session:
+                await session.execute(
+                    delete(EventRow).where(EventRow.created_at < cutoff, EventRow.simulation_id.in_(finished))
+                )
+                await session.commit()
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Pruning relayed simulation events failed: %s", e)
+
+    async def follow(self, sim_id: str, after: int = 0) -> AsyncIterator[SimulationEvent]:
+        """Yield the relayed events of a simulation after ID ``after`` until it finishes.
+
+        Also ends, with a final status event, when the simulation is found
+        finished without a relayed one, and right away if it does not exist.
+        """
+        self._ensure_listening()
+        wakeup = asyncio.Event()
+        self._waiters.setdefault(sim_id, set()).add(wakeup)
+        finished: tuple[SimulationStatus, str | None] | None = None
+        try:
+            while True:
+                wakeup.clear()
+                for event in await self._read(sim_id, after):
+                    yield event
+                    after = event.id
+                    if event.type == "status" and event.status in _FINISHED_STATUSES:
+                        return
+                if finished is not None:
+                    # Its final events were not relayed, e.g. the relay is disabled where it ran
+                    yield SimulationEvent(type="status", sim_id=sim_id, id=after, status=finished[0], error=finished[1])
+                    return
+                try:
+                    await asyncio.wait_for(wakeup.wait(), FOLLOW_POLL_INTERVAL_S)
+                except TimeoutError:
+                    status = await get_simulation_status(sim_id)
+                    if status is None:
+                        return
+                    if status[0] in _FINISHED_STATUSES:
+                        finished = status
+        finally:
+            waiters = self._waiters.get(sim_id)
+            if waiters is not None:
+                waiters.discard(wakeup)
+                if not waiters:
+                    del self._waiters[sim_id]
+
+    async def _read(self, sim_id: str, after: int) -> list[SimulationEvent]:
+        stmt = (
+            select(EventRow.id, EventRow.payload)
+            .where(EventRow.simulation_id == sim_id, EventRow.id > after)
+            .order_by(EventRow.id)
+        )
+        session_factory = get_session_factory()
+        async with session_factory() as session:
+            rows = (await session.execute(stmt)).all()
+        return [SimulationEvent.model_validate({**row.payload, "id": row.id}) for row in rows]
+
+    def _notified(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        self.notifications += 1
+        for waiter in self._waiters.get(payload, ()):
+            waiter.set()
+
+    def _ensure_listening(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """LISTEN on one dedicated connection, reconnecting whenever it is lost."""
+        while True:
+            try:
+                async with get_engine().connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    driver = raw.driver_connection
+                    lost = asyncio.Event()
+                    driver.add_termination_listener(lambda _: lost.set())
+                    await driver.add_listener(CHANNEL, self._notified)
+                    try:
+                        # Notifications sent while not listening are gone: have everyone re-read
+                        for waiters in self._waiters.values():
+                            for waiter in waiters:
+                                waiter.set()
+                        await lost.wait()
+                    finally:
+                        if not driver.is_closed():
+                            await driver.remove_listener(CHANNEL, self._notified)
+            except Exception as e:
+                logger.warning("Listening for simulation events failed: %s", e)
+            await asyncio.sleep(_LISTEN_RETRY_S)
+
+    async def _run(self) -> None:
+        last_prune = time.monotonic()
+        while True:
+            await asyncio.sleep(self.interval_s)
+            await self.flush()
+            if time.monotonic() - last_prune >= _PRUNE_INTERVAL_S:
+                last_prune = time.monotonic()
+                await self.prune()
+
+    def start(self) -> None:
+        """Relay this process's events from now on; does nothing if the interval is 0."""
+        if self._task is None and self.interval_s > 0:
+            get_event_bus().add_sink(self.append)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop listening and relaying, and write what is still pending."""
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        await self.flush()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_s": self.interval_s,
+            "pending": len(self._pending),
+            "relayed": self.relayed,
+            "flushes": self.flushes,
+            "errors": self.errors,
+            "followers": sum(len(w) for w in self._waiters.values()),
+            "notifications": self.notifications,
+        }
+
+
+_relay: EventRelay | None = None
+
+
+def get_event_relay() -> EventRelay:
+    global _relay
+    if _relay is None:
+        _relay = EventRelay(get_event_relay_interval())
+    return _relay
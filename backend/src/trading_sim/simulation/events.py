@@ -0,0 +1,147 @@
+"""In-process pub/sub of simulation progress events.
+
+The runner publishes valuations, trades and status changes for each simulation
+it runs in this process; streaming API clients subscribe to them, and sinks
+such as the event relay pass them on to other processes. Every event
+of an active simulation is kept until it finishes, so a client that connects
+late (or reconnects with the last event ID it saw) first receives what it
+missed and then follows live.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Callable
+from typing import Literal
+
+from pydantic import BaseModel
+
+from trading_sim.models.portfolio import Portfolio
+from trading_sim.models.results import PerformanceMetrics, SimulationStatus
+from trading_sim.models.trades import TradeDecision
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per subscriber before it is treated as too slow and dropped
+SUBSCRIBER_QUEUE_SIZE = 1024
+
+EventType = Literal["started", "valuations", "trades", "agent_completed", "status"]
+
+
+class SimulationEvent(BaseModel):
+    """A progress event; which optional fields are set depends on ``type``."""
+
+    type: EventType
+    sim_id: str
+    id: int = 0
+    status: SimulationStatus | None = None
+    error: str | None = None
+    agent_id: str | None = None
+    # First day of ``values`` for valuations; the decision day for trades
+    day: int | None = None
+    values: list[float] | None = None
+    trades: list[TradeDecision] | None = None
+    portfolio: Portfolio | None = None
+    metrics: PerformanceMetrics | None = None
+    # Set on "started"
+    tickers: list[str] | None = None
+    date_labels: list[str] | None = None
+    agent_names: dict[str, str] | None = None
+
+
+class _Channel:
+    def __init__(self) -> None:
+        self.events: list[SimulationEvent] = []
+        self.subscribers: set[asyncio.Queue[SimulationEvent | None]] = set()
+
+
+class EventBus:
+    """Fan-out of simulation events to any number of subscribers."""
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE) -> None:
+        self.queue_size = queue_size
+        self._channels: dict[str, _Channel] = {}
+        self._sinks: list[Callable[[SimulationEvent], None]] = []
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def add_sink(self, sink: Callable[[SimulationEvent], None]) -> None:
+        """Also hand every published event to ``sink`` (idempotent), e.g. to relay it."""
+        if sink not in self._sinks:
+            self._sinks.append(sink)
+
+    def open(self, sim_id: str) -> None:
+        """Start recording events for a simulation (idempotent)."""
+        self._channels.setdefault(sim_id, _Channel())
+
+    def is_active(self, sim_id: str) -> bool:
+        return sim_id in self._channels
+
+    def publish(self, event: SimulationEvent) -> None:
+        """Record an event and hand it to every subscriber; a no-op for closed channels."""
+        channel = self._channels.get(event.sim_id)
+        if channel is None:
+            return
+        event.id = len(channel.events) + 1
+        channel.events.append(event)
+        self.published += 1
+        for sink in self._sinks:
+            sink(event)
+        for queue in list(channel.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too slow: end its stream so it reconnects and catches up from the backlog
+                channel.subscribers.discard(queue)
+                self.dropped_subscribers += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def close(self, sim_id: str) -> None:
+        """End all streams of a simulation and drop its backlog."""
+        channel = self._channels.pop(sim_id, None)
+        if channel is None:
+            return
+        for queue in channel.subscribers:
+            try:
+                queue.put_nowait(None)
+            except asyncio.QueueFull:
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def subscribe(self, sim_id: str, after: int = 0) -> AsyncIterator[SimulationEvent]:
+        """Yield the events after ID ``after``, then live ones until the simulation ends."""
+        channel = self._channels.get(sim_id)
+        if channel is None:
+            return
+        queue: asyncio.Queue[SimulationEvent | None] = asyncio.Queue(self.queue_size)
+        backlog = channel.events[after:]
+        channel.subscribers.add(queue)
+        try:
+            for event in backlog:
+                yield event
+            while (event := await queue.get()) is not None:
+                yield event
+        finally:
+            channel.subscribers.discard(queue)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "active_simulations": len(self._channels),
+            "subscribers": sum(len(c.subscribers) for c in self._channels.values()),
+            "buffered_events": sum(len(c.events) for c in self._channels.values()),
+            "published": self.published,
+            "dropped_subscribers": self.dropped_subscribers,
+        }
+
+
+_bus: EventBus | None = None
+
+
+def get_event_bus() -> EventBus:
+    global _bus
+    if _bus is None:
+        _bus = EventBus()
+    return _bus
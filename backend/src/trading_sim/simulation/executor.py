@@ -1,5 +1,7 @@
 """Trade execution — applies trade decisions to portfolios."""
 
+from collections.abc import Iterable
+
 from trading_sim.models.market import MarketSnapshot
 from trading_sim.models.portfolio import Holding, Portfolio
 from trading_sim.models.trades import TradeAction, TradeDecision
@@ -64,3 +66,18 @@ def execute_trade(
 
     # HOLD — no changes
     return portfolio
+
+
+def execute_trades(
+    portfolio: Portfolio,
+    decisions: Iterable[TradeDecision],
+    snapshot: MarketSnapshot,
+) -> Portfolio:
+    """Apply several trade decisions in order, as one step on the same snapshot.
+
+    Each order sees the cash and holdings left by the ones before it, so sells
+    listed first fund later buys. Infeasible orders are skipped individually.
+    """
+    for decision in decisions:
+        portfolio = execute_trade(portfolio, decision, snapshot)
+    return portfolio
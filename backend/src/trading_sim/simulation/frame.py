@@ -0,0 +1,175 @@
+"""Columnar market data container backed by NumPy arrays."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+from datetime import date
+from typing import overload
+
+import numpy as np
+import numpy.typing as npt
+
+from trading_sim.models.market import MarketSnapshot, PriceBar
+
+# Number of per-day snapshot views kept alive for reuse across agents
+SNAPSHOT_CACHE_SIZE = 32
+
+
+class _DayPrices(Mapping[str, PriceBar]):
+    """Read-only ``ticker -> PriceBar`` view over one row of a MarketFrame.
+
+    Bars are built on first access and memoized for the lifetime of the view.
+    """
+
+    __slots__ = ("_frame", "_row", "_bars")
+
+    def __init__(self, frame: MarketFrame, row: int) -> None:
+        self._frame = frame
+        self._row = row
+        self._bars: dict[str, PriceBar] = {}
+
+    def __getitem__(self, ticker: str) -> PriceBar:
+        bar = self._bars.get(ticker)
+        if bar is None:
+            frame, row = self._frame, self._row
+            col = frame.ticker_index(ticker)
+            bar = PriceBar.model_construct(
+                ticker=ticker,
+                date=frame.day(row),
+                open=float(frame.open[row, col]),
+                high=float(frame.high[row, col]),
+                low=float(frame.low[row, col]),
+                close=float(frame.close[row, col]),
+                volume=int(frame.volume[row, col]),
+            )
+            self._bars[ticker] = bar
+        return bar
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._frame.tickers)
+
+    def __len__(self) -> int:
+        return len(self._frame.tickers)
+
+    def __contains__(self, ticker: object) -> bool:
+        return ticker in self._frame._ticker_index
+
+
+class MarketFrame:
+    """OHLCV data for a fixed ticker universe over a sequence of trading days.
+
+    Prices are stored as contiguous ``(num_days, num_tickers)`` arrays. Indexing a
+    frame returns a MarketSnapshot whose ``prices`` mapping builds PriceBars lazily,
+    so code written against ``list[MarketSnapshot]`` keeps working.
+    """
+
+    __slots__ = (
+        "dates", "tickers", "open", "high", "low", "close", "volume",
+        "_ticker_index", "_snapshots",
+    )
+
+    def __init__(
+        self,
+        dates: npt.NDArray[np.datetime64],
+        tickers: list[str],
+        open: npt.NDArray[np.float64],
+        high: npt.NDArray[np.float64],
+        low: npt.NDArray[np.float64],
+        close: npt.NDArray[np.float64],
+        volume: npt.NDArray[np.int64],
+    ) -> None:
+        shape = (len(dates), len(tickers))
+        for name, arr in (("open", open), ("high", high), ("low", low), ("close", close), ("volume", volume)):
+            if arr.shape != shape:
+                raise ValueError(f"{name} has shape {arr.shape}, expected {shape}")
+            arr.flags.writeable = False
+        dates.flags.writeable = False
+
+        self.dates = dates
+        self.tickers = list(tickers)
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self._ticker_index = {t: i for i, t in enumerate(self.tickers)}
+        self._snapshots: OrderedDict[int, MarketSnapshot] = OrderedDict()
+
+    @classmethod
+    def empty(cls, tickers: list[str]) -> MarketFrame:
+        n = len(tickers)
+        return cls(
+            dates=np.empty(0, dtype="datetime64[D]"),
+            tickers=tickers,
+            open=np.empty((0, n)),
+            high=np.empty((0, n)),
+            low=np.empty((0, n)),
+            close=np.empty((0, n)),
+            volume=np.empty((0, n), dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @overload
+    def __getitem__(self, index: int) -> MarketSnapshot: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[MarketSnapshot]: ...
+
+    def __getitem__(self, index: int | slice) -> MarketSnapshot | list[MarketSnapshot]:
+        if isinstance(index, slice):
+            return [self.snapshot(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("MarketFrame index out of range")
+        return self.snapshot(index)
+
+    def __iter__(self) -> Iterator[MarketSnapshot]:
+        for i in range(len(self)):
+            yield self.snapshot(i)
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the underlying arrays in bytes."""
+        return sum(
+            arr.nbytes
+            for arr in (self.dates, self.open, self.high, self.low, self.close, self.volume)
+        )
+
+    def ticker_index(self, ticker: str) -> int:
+        return self._ticker_index[ticker]
+
+    def day(self, row: int) -> date:
+        """The calendar date of a row as a Python ``date``."""
+        day: date = self.dates[row].astype("datetime64[D]").item()
+        return day
+
+    def date_labels(self) -> list[str]:
+        """ISO date labels for every row."""
+        labels: list[str] = np.datetime_as_string(self.dates).tolist()
+        return labels
+
+    def close_prices(self, row: int) -> dict[str, float]:
+        """Close price per ticker for a single row."""
+        return dict(zip(self.tickers, self.close[row].tolist()))
+
+    def snapshot(self, row: int) -> MarketSnapshot:
+        """Per-day snapshot view, shared between callers while it stays cached."""
+        cached = self._snapshots.get(row)
+        if cached is not None:
+            self._snapshots.move_to_end(row)
+            return cached
+
+        snapshot = MarketSnapshot.model_construct(
+            date=self.day(row),
+            prices=_DayPrices(self, row),
+            day_index=row,
+            total_days=len(self),
+        )
+        self._snapshots[row] = snapshot
+        if len(self._snapshots) > SNAPSHOT_CACHE_SIZE:
+            self._snapshots.popitem(last=False)
+        return snapshot
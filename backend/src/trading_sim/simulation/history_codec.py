@@ -0,0 +1,130 @@
+"""Compact storage encoding of agent portfolio histories and their date labels.
+
+Histories are stored as zlib-compressed little-endian float arrays and date
+labels as a start date plus a calendar: weekdays minus a list of holidays for
+daily data, or packed timestamp deltas otherwise. Both are base64 text so they
+fit in the agent_results JSON. Decoding is a bulk NumPy operation instead of
+parsing one JSON number and string per step. Rows written before this format
+(plain lists) decode unchanged.
+"""
+
+from __future__ import annotations
+
+import base64
+import warnings
+import zlib
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from trading_sim.models.results import AgentResult
+
+_DTYPES: dict[str, str] = {"float64": "<f8", "float32": "<f4"}
+
+# Daily labels use the weekday calendar unless more than this share are holidays
+MAX_HOLIDAY_SHARE = 0.25
+
+# Distinct decoded label sequences kept; all agents of a simulation share one
+LABEL_CACHE_SIZE = 64
+
+
+def _pack(array: npt.NDArray[Any]) -> str:
+    return base64.b64encode(zlib.compress(array.tobytes())).decode()
+
+
+def _unpack(data: str, dtype: str) -> npt.NDArray[Any]:
+    return np.frombuffer(zlib.decompress(base64.b64decode(data)), dtype=dtype)
+
+
+def encode_values(values: list[float], dtype: str = "float64") -> dict[str, Any]:
+    """Packed portfolio values; float32 halves the size at ~7 significant digits."""
+    code = _DTYPES.get(dtype)
+    if code is None:
+        raise ValueError(f"Unsupported history dtype {dtype!r}; use one of {sorted(_DTYPES)}")
+    return {"dtype": code, "data": _pack(np.asarray(values, dtype=code))}
+
+
+def decode_values(data: dict[str, Any] | list[float]) -> list[float]:
+    if isinstance(data, list):
+        return data
+    values: list[float] = _unpack(data["data"], data["dtype"]).astype(np.float64).tolist()
+    return values
+
+
+def encode_labels(labels: list[str]) -> dict[str, Any] | list[str]:
+    """Start date plus calendar for ISO labels; labels that would not round-trip
+    exactly stay a plain list."""
+    if not labels:
+        return labels
+    try:
+        with warnings.catch_warnings():
+            # Timezone offsets only warn; such labels are kept as strings
+            warnings.simplefilter("error")
+            stamps = np.array(labels, dtype="datetime64")
+    except (ValueError, UserWarning):
+        return labels
+    if np.datetime_as_string(stamps).tolist() != labels:
+        return labels
+
+    unit = np.datetime_data(stamps.dtype)[0]
+    start = str(stamps[0])
+    if unit == "D" and np.is_busday(stamps).all() and (np.diff(stamps).astype(np.int64) > 0).all():
+        weekdays = np.arange(stamps[0], stamps[-1] + 1, dtype="datetime64[D]")
+        weekdays = weekdays[np.is_busday(weekdays)]
+        holidays = np.setdiff1d(weekdays, stamps)
+        if len(holidays) <= MAX_HOLIDAY_SHARE * len(stamps):
+            return {
+                "calendar": "weekdays",
+                "start": start,
+                "count": len(stamps),
+                "holidays": np.datetime_as_string(holidays).tolist(),
+            }
+
+    steps = np.diff(stamps).astype("<i8")
+    return {"calendar": "deltas", "start": start, "unit": unit, "data": _pack(steps)}
+
+
+def decode_labels(data: dict[str, Any] | list[str]) -> list[str]:
+    if isinstance(data, list):
+        return data
+    if data["calendar"] == "weekdays":
+        return list(_weekday_labels(data["start"], data["count"], tuple(data["holidays"])))
+    return list(_delta_labels(data["start"], data["unit"], data["data"]))
+
+
+# Formatting timestamps dominates decoding, so decoded sequences are memoized
+
+
+@lru_cache(maxsize=LABEL_CACHE_SIZE)
+def _weekday_labels(start: str, count: int, holidays: tuple[str, ...]) -> tuple[str, ...]:
+    stamps = np.busday_offset(
+        np.datetime64(start), np.arange(count), roll="forward", holidays=np.array(holidays, dtype="datetime64[D]")
+    )
+    return tuple(np.datetime_as_string(stamps).tolist())
+
+
+@lru_cache(maxsize=LABEL_CACHE_SIZE)
+def _delta_labels(start: str, unit: str, data: str) -> tuple[str, ...]:
+    steps = _unpack(data, "<i8")
+    offsets = np.concatenate(([0], np.cumsum(steps))).astype(f"timedelta64[{unit}]")
+    return tuple(np.datetime_as_string(np.datetime64(start) + offsets).tolist())
+
+
+def encode_agent_result(result: AgentResult, dtype: str = "float64") -> dict[str, Any]:
+    """JSON-ready agent result without trades, with history and labels packed."""
+    data = result.model_dump(mode="json", exclude={"trades", "portfolio_history", "date_labels"})
+    data["portfolio_history"] = encode_values(result.portfolio_history, dtype)
+    data["date_labels"] = encode_labels(result.date_labels)
+    return data
+
+
+def decode_agent_result(data: dict[str, Any]) -> AgentResult:
+    """Inverse of encode_agent_result; the decoded arrays skip model validation."""
+    history = decode_values(data.get("portfolio_history", []))
+    labels = decode_labels(data.get("date_labels", []))
+    result = AgentResult.model_validate({**data, "portfolio_history": [], "date_labels": []})
+    result.portfolio_history = history
+    result.date_labels = labels
+    return result
@@ -0,0 +1,503 @@
+"""Database-backed job queue for simulations and the workers that run them.
+
+The API enqueues a job per simulation; any number of worker processes claim
+queued jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` (highest priority
+first), so each job runs exactly once and throughput scales with workers.
+Running jobs heartbeat; a job whose worker stops heartbeating is requeued and
+resumes from its checkpoints elsewhere. Cancellation is cooperative: the API
+flags the job and its worker cancels the run at its next heartbeat.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import signal
+import socket
+import uuid
+from collections.abc import Coroutine
+from datetime import UTC, datetime, timedelta
+from enum import Enum
+from typing import Any, Literal, NamedTuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from trading_sim.db.engine import get_session_factory
+from trading_sim.db.tables import JobRow, SimulationRow
+from trading_sim.models.results import SimulationResult, SimulationStatus
+from trading_sim.settings import (
+    get_job_heartbeat_interval,
+    get_job_poll_interval,
+    get_job_stale_after,
+    get_worker_concurrency,
+)
+from trading_sim.simulation.checkpoints import SimulationParams, delete_checkpoints
+from trading_sim.simulation.runner import run_stored_simulation
+from trading_sim.simulation.storage import stage_simulations
+
+logger = logging.getLogger(__name__)
+
+# A job whose worker died this many times is failed instead of requeued
+MAX_ATTEMPTS = 3
+
+_ACTIVE_STATUSES = (SimulationStatus.PENDING.value, SimulationStatus.RUNNING.value)
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class QueueFullError(RuntimeError):
+    """Raised when enqueueing onto a queue that is at its maximum depth."""
+
+
+# Job status for a queued job whose simulation already finished
+_SETTLED_JOB_STATUS = {
+    SimulationStatus.COMPLETED.value: JobStatus.DONE,
+    SimulationStatus.FAILED.value: JobStatus.FAILED,
+    SimulationStatus.CANCELLED.value: JobStatus.CANCELLED,
+}
+
+
+class ClaimedJob(NamedTuple):
+    id: int
+    simulation_id: str
+
+
+def _now() -> datetime:
+    return datetime.now(UTC)
+
+
+async def enqueue_simulation(
+    result: SimulationResult,
+    params: SimulationParams,
+    priority: int = 0,
+    max_depth: int | None = None,
+) -> None:
+    """Store a pending simulation with its run parameters and queue it, in one transaction.
+
+    Raises QueueFullError if ``max_depth`` jobs are already queued. The depth is
+    counted before inserting without locking the queue, so concurrent requests
+    can overshoot it slightly: it is a soft limit against runaway backlogs.
+    """
+    await enqueue_simulations([(result, params)], priority, max_depth)
+
+
+async def enqueue_simulations(
+    items: list[tuple[SimulationResult, SimulationParams]],
+    priority: int = 0,
+    max_depth: int | None = None,
+) -> None:
+    """Store and queue several pending simulations in one transaction, so
+    either all of them are queued or none.
+
+    Raises QueueFullError if they would take the queue past ``max_depth``
+    (the same soft limit as enqueue_simulation).
+    """
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        if max_depth is not None:
+            depth = await session.scalar(
+                select(func.count()).select_from(JobRow).where(JobRow.status == JobStatus.QUEUED.value)
+            )
+            if depth is not None and depth + len(items) > max_depth:
+                if len(items) == 1:
+                    raise QueueFullError(f"{depth} simulations are already queued (max {max_depth})")
+                raise QueueFullError(
+                    f"{len(items)} more simulations would exceed the queue limit ({depth} queued, max {max_depth})"
+                )
+        await stage_simulations(session, items)
+        session.add_all([JobRow(simulation_id=result.id, priority=priority) for result, _ in items])
+        await session.commit()
+
+
+async def claim_jobs(worker_id: str, limit: int) -> list[ClaimedJob]:
+    """Claim up to ``limit`` queued jobs, highest priority first, skipping rows
+    other workers are claiming concurrently.
+
+    Jobs whose simulation already finished, or whose cancellation was requested
+    before they were requeued, are closed instead of claimed.
+    """
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        stmt = (
+            select(JobRow, SimulationRow.status)
+            .join(SimulationRow, SimulationRow.id == JobRow.simulation_id)
+            .where(JobRow.status == JobStatus.QUEUED.value)
+            .order_by(JobRow.priority.desc(), JobRow.id)
+            .limit(limit)
+            .with_for_update(of=JobRow, skip_locked=True)
+        )
+        now = _now()
+        claimed: list[ClaimedJob] = []
+        for row, sim_status in (await session.execute(stmt)).tuples():
+            settled = _SETTLED_JOB_STATUS.get(sim_status)
+            if settled is not None:
+                # The run ended but recording that on its job failed
+                row.status = settled.value
+            elif row.cancel_requested:
+                row.status = JobStatus.CANCELLED.value
+                await _set_cancelled(session, row.simulation_id)
+            else:
+                row.status = JobStatus.RUNNING.value
+                row.worker_id = worker_id
+                row.heartbeat_at = now
+                row.attempts += 1
+                claimed.append(ClaimedJob(row.id, row.simulation_id))
+        await session.commit()
+        return claimed
+
+
+async def heartbeat(worker_id: str, job_ids: list[int]) -> dict[int, bool]:
+    """Refresh the heartbeat of this worker's running jobs.
+
+    Returns whether cancellation was requested, for the jobs still owned by
+    this worker; jobs missing from the result were handed to another worker.
+    """
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        stmt = (
+            update(JobRow)
+            .where(
+                JobRow.id.in_(job_ids),
+                JobRow.worker_id == worker_id,
+                JobRow.status == JobStatus.RUNNING.value,
+            )
+            .values(heartbeat_at=_now())
+            .returning(JobRow.id, JobRow.cancel_requested)
+        )
+        owned = {row.id: row.cancel_requested for row in await session.execute(stmt)}
+        await session.commit()
+        return owned
+
+
+async def finish_job(job_id: int, status: JobStatus) -> None:
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        await session.execute(update(JobRow).where(JobRow.id == job_id).values(status=status.value))
+        await session.commit()
+
+
+async def fail_job(job: ClaimedJob, error: str) -> None:
+    """Record a failed run on the job and its simulation in one transaction."""
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        await session.execute(
+            update(JobRow).where(JobRow.id == job.id).values(status=JobStatus.FAILED.value)
+        )
+        await _set_failed(session, [job.simulation_id], error)
+        await session.commit()
+
+
+async def requeue_jobs(job_ids: list[int]) -> None:
+    """Put running jobs back in the queue, e.g. when their worker shuts down."""
+    if not job_ids:
+        return
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        await session.execute(
+            update(JobRow)
+            .where(JobRow.id.in_(job_ids), JobRow.status == JobStatus.RUNNING.value)
+            .values(status=JobStatus.QUEUED.value, worker_id=None)
+        )
+        await session.commit()
+
+
+async def requeue_stale_jobs(stale_after_s: float) -> int:
+    """Requeue running jobs without a recent heartbeat; fail those out of attempts.
+
+    Returns the number of jobs requeued.
+    """
+    cutoff = _now() - timedelta(seconds=stale_after_s)
+    stale = (JobRow.status == JobStatus.RUNNING.value, JobRow.heartbeat_at < cutoff)
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        exhausted = (
+            await session.execute(
+                update(JobRow)
+                .where(*stale, JobRow.attempts >= MAX_ATTEMPTS)
+                .values(status=JobStatus.FAILED.value)
+                .returning(JobRow.simulation_id)
+            )
+        ).scalars().all()
+        if exhausted:
+            await _set_failed(session, list(exhausted), f"Worker lost {MAX_ATTEMPTS} times while running")
+        requeued = (
+            await session.execute(
+                update(JobRow)
+                .where(*stale)
+                .values(status=JobStatus.QUEUED.value, worker_id=None)
+                .returning(JobRow.id)
+            )
+        ).scalars().all()
+        await session.commit()
+    if requeued:
+        logger.warning("Requeued %d jobs whose workers stopped heartbeating", len(requeued))
+    return len(requeued)
+
+
+async def request_cancel(sim_id: str) -> Literal["cancelled", "cancelling"] | None:
+    """Cancel a queued simulation at once, or ask the worker running it to stop.
+
+    Returns None if the simulation has no queued or running job.
+    """
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        queued = await session.scalar(
+            update(JobRow)
+            .where(JobRow.simulation_id == sim_id, JobRow.status == JobStatus.QUEUED.value)
+            .values(status=JobStatus.CANCELLED.value)
+            .returning(JobRow.id)
+        )
+        if queued is not None:
+            await _set_cancelled(session, sim_id)
+            await session.commit()
+            return "cancelled"
+        running = await session.scalar(
+            update(JobRow)
+            .where(JobRow.simulation_id == sim_id, JobRow.status == JobStatus.RUNNING.value)
+            .values(cancel_requested=True)
+            .returning(JobRow.id)
+        )
+        await session.commit()
+        return "cancelling" if running is not None else None
+
+
+async def _set_failed(session: AsyncSession, sim_ids: list[str], error: str) -> None:
+    await session.execute(
+        update(SimulationRow)
+        .where(SimulationRow.id.in_(sim_ids), SimulationRow.status.in_(_ACTIVE_STATUSES))
+        .values(status=SimulationStatus.FAILED.value, error=error)
+    )
+
+
+async def _set_cancelled(session: AsyncSession, sim_id: str) -> None:
+    await session.execute(
+        update(SimulationRow)
+        .where(SimulationRow.id == sim_id, SimulationRow.status.in_(_ACTIVE_STATUSES))
+        .values(status=SimulationStatus.CANCELLED.value, error="Cancelled on request")
+    )
+
+
+async def mark_cancelled(job: ClaimedJob) -> None:
+    """Record a cancelled run and drop its checkpoints."""
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        await session.execute(
+            update(JobRow).where(JobRow.id == job.id).values(status=JobStatus.CANCELLED.value)
+        )
+        await _set_cancelled(session, job.simulation_id)
+        await session.commit()
+    await delete_checkpoints(job.simulation_id)
+
+
+class JobWorker:
+    """Claims queued simulations and runs up to ``concurrency`` of them at once."""
+
+    def __init__(
+        self,
+        concurrency: int,
+        poll_interval_s: float,
+        heartbeat_interval_s: float,
+        stale_after_s: float,
+        worker_id: str | None = None,
+    ) -> None:
+        self.concurrency = concurrency
+        self.poll_interval_s = poll_interval_s
+        self.heartbeat_interval_s = heartbeat_interval_s
+        self.stale_after_s = stale_after_s
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._runs: dict[int, asyncio.Task[SimulationResult | None]] = {}
+        self._executors: set[asyncio.Task[None]] = set()
+        self._cancelling: set[int] = set()
+        self._loops: list[asyncio.Task[None]] = []
+        self._wakeup = asyncio.Event()
+        self.claimed = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.requeued = 0
+
+    def start(self) -> None:
+        if not self._loops and self.concurrency > 0:
+            self._loops = [
+                asyncio.create_task(self._claim_loop()),
+                asyncio.create_task(self._heartbeat_loop()),
+            ]
+
+    def notify(self) -> None:
+        """Claim now instead of at the next poll, e.g. right after enqueueing."""
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Stop claiming, interrupt running simulations and requeue their jobs."""
+        for task in self._loops:
+            task.cancel()
+        interrupted = [job_id for job_id in self._runs if job_id not in self._cancelling]
+        for run in self._runs.values():
+            run.cancel()
+        await asyncio.gather(*self._loops, *self._executors, return_exceptions=True)
+        self._loops = []
+        try:
+            await requeue_jobs(interrupted)
+        except Exception as e:
+            logger.warning("Requeueing %d interrupted jobs failed: %s", len(interrupted), e)
+
+    async def _claim_loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+            free = self.concurrency - len(self._runs)
+            if free > 0:
+                try:
+                    jobs = await claim_jobs(self.worker_id, free)
+                except Exception as e:
+                    logger.warning("Claiming jobs failed: %s", e)
+                    jobs = []
+                for job in jobs:
+                    self.claimed += 1
+                    self._runs[job.id] = asyncio.create_task(run_stored_simulation(job.simulation_id))
+                    executor = asyncio.create_task(self._execute(job))
+                    self._executors.add(executor)
+                    executor.add_done_callback(self._executors.discard)
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval_s)
+
+    async def _execute(self, job: ClaimedJob) -> None:
+        try:
+            result = await self._runs[job.id]
+        except asyncio.CancelledError:
+            if job.id not in self._cancelling:
+                # Shutdown or lost ownership; the job is requeued and resumed
+                raise
+            self.cancelled += 1
+            await self._settle(job, mark_cancelled(job))
+            logger.info("Cancelled simulation %s", job.simulation_id)
+        except Exception as e:
+            logger.exception("Simulation job %d (%s) failed", job.id, job.simulation_id)
+            self.failed += 1
+            await self._settle(job, fail_job(job, str(e)))
+        else:
+            if result is None:
+                self.failed += 1
+                await self._settle(job, fail_job(job, "Stored without run parameters"))
+            elif result.status == SimulationStatus.COMPLETED:
+                self.completed += 1
+                await self._settle(job, finish_job(job.id, JobStatus.DONE))
+            else:
+                # The runner already stored the simulation as failed
+                self.failed += 1
+                await self._settle(job, finish_job(job.id, JobStatus.FAILED))
+        finally:
+            self._runs.pop(job.id, None)
+            self._cancelling.discard(job.id)
+            self._wakeup.set()
+
+    @staticmethod
+    async def _settle(job: ClaimedJob, update_job: Coroutine[Any, Any, None]) -> None:
+        """Record the end of a run. If that fails, the job goes stale and is
+        requeued: claim_jobs closes it if the simulation's outcome was stored or
+        its cancellation requested, and otherwise it is retried like a lost run."""
+        try:
+            await update_job
+        except Exception as e:
+            logger.warning("Recording the end of job %d (%s) failed: %s", job.id, job.simulation_id, e)
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval_s)
+            try:
+                if self._runs:
+                    owned = await heartbeat(self.worker_id, list(self._runs))
+                    for job_id, run in list(self._runs.items()):
+                        if job_id not in owned:
+                            logger.warning("Job %d was handed to another worker; stopping it here", job_id)
+                            run.cancel()
+                        elif owned[job_id] and job_id not in self._cancelling:
+                            self._cancelling.add(job_id)
+                            run.cancel()
+                self.requeued += await requeue_stale_jobs(self.stale_after_s)
+            except Exception as e:
+                logger.warning("Job heartbeat failed: %s", e)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "running": bool(self._loops),
+            "concurrency": self.concurrency,
+            "active_jobs": len(self._runs),
+            "claimed": self.claimed,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "requeued_stale": self.requeued,
+        }
+
+
+_worker: JobWorker | None = None
+
+
+def get_job_worker() -> JobWorker:
+    global _worker
+    if _worker is None:
+        _worker = JobWorker(
+            concurrency=get_worker_concurrency(),
+            poll_interval_s=get_job_poll_interval(),
+            heartbeat_interval_s=get_job_heartbeat_interval(),
+            stale_after_s=get_job_stale_after(),
+        )
+    return _worker
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command-line entry point: run queued simulations until interrupted."""
+    parser = argparse.ArgumentParser(description="Run queued simulations from the job queue")
+    parser.add_argument(
+        "--concurrency", type=int, default=None, help="Simulations run at once (default: WORKER_CONCURRENCY)"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    async def _main() -> None:
+        from trading_sim.agents.http_pool import close_http_pool
+        from trading_sim.agents.pool import get_agent_pool
+        from trading_sim.db.engine import close_db, init_db
+        from trading_sim.simulation.event_relay import get_event_relay
+        from trading_sim.simulation.write_behind import get_write_buffer
+
+        await init_db()
+        worker = get_job_worker()
+        if args.concurrency is not None:
+            worker.concurrency = args.concurrency
+        get_write_buffer().start()
+        get_event_relay().start()
+        worker.start()
+        logger.info("Worker %s running up to %d simulations", worker.worker_id, worker.concurrency)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        await stop.wait()
+
+        logger.info("Stopping worker %s", worker.worker_id)
+        await worker.stop()
+        get_agent_pool().clear()
+        await close_http_pool()
+        await get_write_buffer().stop()
+        await get_event_relay().stop()
+        await close_db()
+
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
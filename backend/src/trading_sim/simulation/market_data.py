@@ -1,10 +1,21 @@
 """Mock market data generation for simulations."""
 
-import math
-import random
-from datetime import date, timedelta
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import date
+from typing import Any, Literal
 
-from trading_sim.models.market import MarketSnapshot, PriceBar
+import numpy as np
+import numpy.typing as npt
+
+from trading_sim.settings import get_market_data_cache_size
+from trading_sim.simulation.frame import MarketFrame
+
+# Bump whenever the generator's output for a given request changes, so cached
+# frames from an older algorithm are never reused.
+GENERATOR_VERSION = 3
 
 # Realistic-ish base prices and volatilities for mock tickers
 TICKER_PROFILES: dict[str, tuple[float, float]] = {
@@ -22,55 +33,137 @@ TICKER_PROFILES: dict[str, tuple[float, float]] = {
 
 DEFAULT_TICKERS = ["AAPL", "GOOGL", "MSFT", "AMZN", "TSLA"]
 
+DataSource = Literal["mock", "store"]
 
-def _generate_price_series(
-    base_price: float,
-    volatility: float,
-    num_days: int,
-    seed: int,
-) -> list[tuple[float, float, float, float, int]]:
-    """Generate synthetic OHLCV data using geometric Brownian motion."""
-    rng = random.Random(seed)
-    drift = 0.0002  # slight upward bias
+CacheKey = tuple[tuple[str, ...], date, date, int]
 
-    bars: list[tuple[float, float, float, float, int]] = []
-    price = base_price
 
-    for _ in range(num_days):
-        # Daily return from GBM
-        daily_return = drift + volatility * rng.gauss(0, 1)
-        open_price = price
-        close_price = price * math.exp(daily_return)
+class MarketDataCache:
+    """Bounded LRU cache of generated MarketFrames with hit/miss counters.
 
-        # Intraday high/low
-        intraday_vol = abs(close_price - open_price) * rng.uniform(0.5, 2.0)
-        high = max(open_price, close_price) + intraday_vol * rng.uniform(0.1, 0.5)
-        low = min(open_price, close_price) - intraday_vol * rng.uniform(0.1, 0.5)
-        low = max(low, 0.01)  # price floor
-
-        volume = int(rng.gauss(10_000_000, 3_000_000))
-        volume = max(volume, 100_000)
+    Frames are read-only, so one instance can be shared by every simulation
+    running over the same tickers and window.
+    """
 
-        bars.append((
-            round(open_price, 2),
-            round(high, 2),
-            round(low, 2),
-            round(close_price, 2),
-            volume,
-        ))
-        price = close_price
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._frames: OrderedDict[CacheKey, MarketFrame] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key: CacheKey, factory: Callable[[], MarketFrame]) -> MarketFrame:
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self.hits += 1
+                self._frames.move_to_end(key)
+                return frame
+
+            self.misses += 1
+            frame = factory()
+            if self.maxsize > 0:
+                self._frames[key] = frame
+                while len(self._frames) > self.maxsize:
+                    self._frames.popitem(last=False)
+            return frame
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._frames),
+                "maxsize": self.maxsize,
+                "nbytes": sum(f.nbytes for f in self._frames.values()),
+            }
+
+
+_cache: MarketDataCache | None = None
+
+
+def get_market_data_cache() -> MarketDataCache:
+    global _cache
+    if _cache is None:
+        _cache = MarketDataCache(get_market_data_cache_size())
+    return _cache
+
+
+def _ticker_seed(ticker: str, start_date: date) -> int:
+    """Seed that is stable across processes (unlike the salted built-in ``hash``)."""
+    return zlib.crc32(f"{ticker}|{start_date.isoformat()}".encode())
+
+
+def _generate_price_arrays(
+    base_prices: npt.NDArray[np.float64],
+    volatilities: npt.NDArray[np.float64],
+    num_days: int,
+    seeds: list[int],
+) -> tuple[
+    npt.NDArray[np.float64],
+    npt.NDArray[np.float64],
+    npt.NDArray[np.float64],
+    npt.NDArray[np.float64],
+    npt.NDArray[np.int64],
+]:
+    """Generate synthetic OHLCV data for every ticker using geometric Brownian motion.
+
+    Each ticker's draws come from its own generator seeded by ``seeds``, so its
+    series does not depend on the other tickers requested; the arithmetic runs
+    over all tickers at once. Each returned array has shape
+    ``(num_days, num_tickers)``.
+    """
+    drift = 0.0002  # slight upward bias
 
-    return bars
+    # Per ticker: normals for returns and volume, uniforms for the intraday range
+    draws = np.empty((len(seeds), 5, num_days))
+    for j, seed in enumerate(seeds):
+        rng = np.random.default_rng(seed)
+        rng.standard_normal((2, num_days), out=draws[j, :2])
+        rng.random((3, num_days), out=draws[j, 2:])
+    draws = np.ascontiguousarray(draws.transpose(1, 2, 0))
+    normals, uniforms = draws[:2], draws[2:]
+
+    # Daily returns from GBM, compounded into a close price path
+    daily_returns = drift + volatilities * normals[0]
+    close = base_prices * np.exp(np.cumsum(daily_returns, axis=0))
+    open_ = np.empty_like(close)
+    open_[0] = base_prices
+    open_[1:] = close[:-1]
+
+    # Intraday high/low
+    intraday_vol = np.abs(close - open_) * (0.5 + 1.5 * uniforms[0])
+    high = np.maximum(open_, close) + intraday_vol * (0.1 + 0.4 * uniforms[1])
+    low = np.minimum(open_, close) - intraday_vol * (0.1 + 0.4 * uniforms[2])
+    low = np.maximum(low, 0.01)  # price floor
+
+    volume = (10_000_000 + 3_000_000 * normals[1]).astype(np.int64)
+    volume = np.maximum(volume, 100_000)
+
+    return (
+        np.round(open_, 2),
+        np.round(high, 2),
+        np.round(low, 2),
+        np.round(close, 2),
+        volume,
+    )
 
 
 def generate_mock_data(
     tickers: list[str] | None = None,
     start_date: date | None = None,
     end_date: date | None = None,
-) -> list[MarketSnapshot]:
+) -> MarketFrame:
     """Generate mock market data for a set of tickers over a date range.
 
-    Returns a list of MarketSnapshot, one per trading day.
+    Returns a MarketFrame with one row per trading day. The output depends only
+    on the arguments, and repeated requests are served from a shared cache.
     """
     if tickers is None:
         tickers = DEFAULT_TICKERS
@@ -79,45 +172,60 @@ def generate_mock_data(
     if end_date is None:
         end_date = date(2024, 12, 31)
 
+    key: CacheKey = (tuple(tickers), start_date, end_date, GENERATOR_VERSION)
+    return get_market_data_cache().get_or_create(
+        key, lambda: _build_mock_frame(list(tickers), start_date, end_date)
+    )
+
+
+def _build_mock_frame(tickers: list[str], start_date: date, end_date: date) -> MarketFrame:
+    """Build a MarketFrame of synthetic bars for every weekday in the range."""
     # Build trading days (skip weekends)
-    trading_days: list[date] = []
-    current = start_date
-    while current <= end_date:
-        if current.weekday() < 5:  # Mon-Fri
-            trading_days.append(current)
-        current += timedelta(days=1)
+    calendar = np.arange(
+        np.datetime64(start_date, "D"),
+        np.datetime64(end_date, "D") + 1,
+        dtype="datetime64[D]",
+    )
+    trading_days = calendar[np.is_busday(calendar)]
 
     num_days = len(trading_days)
     if num_days == 0:
-        return []
-
-    # Generate price series for each ticker
-    ticker_bars: dict[str, list[tuple[float, float, float, float, int]]] = {}
-    for i, ticker in enumerate(tickers):
-        base_price, vol = TICKER_PROFILES.get(ticker, (100.0, 0.02))
-        seed = hash(ticker) + hash(str(start_date)) + i
-        ticker_bars[ticker] = _generate_price_series(base_price, vol, num_days, seed)
-
-    # Assemble snapshots
-    snapshots: list[MarketSnapshot] = []
-    for day_idx, day in enumerate(trading_days):
-        prices: dict[str, PriceBar] = {}
-        for ticker in tickers:
-            o, h, l, c, v = ticker_bars[ticker][day_idx]
-            prices[ticker] = PriceBar(
-                ticker=ticker,
-                date=day,
-                open=o,
-                high=h,
-                low=l,
-                close=c,
-                volume=v,
-            )
-        snapshots.append(MarketSnapshot(
-            date=day,
-            prices=prices,
-            day_index=day_idx,
-            total_days=num_days,
-        ))
-
-    return snapshots
+        return MarketFrame.empty(tickers)
+
+    # Generate price series for all tickers in one batch
+    profiles = [TICKER_PROFILES.get(ticker, (100.0, 0.02)) for ticker in tickers]
+    base_prices = np.array([p[0] for p in profiles])
+    volatilities = np.array([p[1] for p in profiles])
+    seeds = [_ticker_seed(ticker, start_date) for ticker in tickers]
+    opens, highs, lows, closes, volumes = _generate_price_arrays(
+        base_prices, volatilities, num_days, seeds
+    )
+
+    return MarketFrame(
+        dates=trading_days,
+        tickers=tickers,
+        open=opens,
+        high=highs,
+        low=lows,
+        close=closes,
+        volume=volumes,
+    )
+
+
+def load_market_data(
+    tickers: list[str] | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    source: DataSource = "mock",
+    interval: str = "1d",
+) -> MarketFrame:
+    """Load market data from the mock generator or the on-disk bar store."""
+    if source == "store":
+        from trading_sim.simulation.bar_store import get_bar_store
+
+        return get_bar_store().load_frame(
+            tickers or DEFAULT_TICKERS, start_date, end_date, interval=interval
+        )
+    if interval != "1d":
+        raise ValueError("Mock market data is only available at the 1d interval")
+    return generate_mock_data(tickers, start_date, end_date)
@@ -1,60 +1,279 @@
-"""Performance metrics calculation."""
+"""Performance metrics calculation.
+
+``RunningMetrics`` keeps the statistics up to date as valuations arrive, so a
+running simulation can report its metrics at any time at O(1) cost per day.
+``calculate_metrics`` and ``rolling_metrics`` are the vectorized batch paths
+for finished histories.
+"""
+
+from __future__ import annotations
 
 import math
+from collections.abc import Iterable
+from typing import Any, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
 
+from trading_sim.models.portfolio import Portfolio
 from trading_sim.models.results import PerformanceMetrics
 from trading_sim.models.trades import TradeAction, TradeDecision
 
+# Annualization assumes this many trading days per year (risk-free rate = 0)
+TRADING_DAYS_PER_YEAR = 252
+
+# Default window of the rolling risk series, about one quarter of trading days
+ROLLING_WINDOW = 63
+
+# Rolling windows scanned at once for the rolling drawdown, bounding memory
+_DRAWDOWN_CHUNK_ROWS = 4096
+
+FloatArray = npt.NDArray[np.float64]
+
+
+def _is_win(trade: TradeDecision) -> bool:
+    return trade.action == TradeAction.SELL and trade.confidence > 0.5
+
+
+def _book_value(portfolio: Portfolio) -> float:
+    """Cash plus holdings at cost; only realized gains and losses change it."""
+    return portfolio.cash + sum(h.quantity * h.avg_cost for h in portfolio.holdings.values())
+
+
+class RunningMetrics:
+    """Performance statistics updated incrementally as portfolio values arrive.
+
+    Daily returns feed a Welford mean and variance, the running peak gives the
+    drawdown, and executed trades the win rate and realized P&L.
+    """
+
+    def __init__(self, initial_capital: float, realized_pnl: float = 0.0) -> None:
+        self.initial_capital = initial_capital
+        self.realized_pnl = realized_pnl
+        self.days = 0
+        self.last_value = 0.0
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+        # Welford state over daily returns
+        self.num_returns = 0
+        self.mean_return = 0.0
+        self._m2 = 0.0
+        self.total_trades = 0
+        self.wins = 0
+
+    def update(self, value: float) -> None:
+        """Add one day's portfolio value."""
+        if self.days and self.last_value > 0:
+            r = (value - self.last_value) / self.last_value
+            self.num_returns += 1
+            delta = r - self.mean_return
+            self.mean_return += delta / self.num_returns
+            self._m2 += delta * (r - self.mean_return)
+        if not self.days or value > self.peak:
+            self.peak = value
+        if self.peak > 0:
+            self.max_drawdown = max(self.max_drawdown, (self.peak - value) / self.peak)
+        self.last_value = value
+        self.days += 1
+
+    def extend(self, values: npt.ArrayLike) -> None:
+        """Add a stretch of daily values at once, merging its statistics in bulk."""
+        batch = np.asarray(values, dtype=np.float64)
+        if len(batch) == 0:
+            return
+        if self.days:
+            batch = np.concatenate(([self.last_value], batch))
+        prev, curr = batch[:-1], batch[1:]
+        valid = prev > 0
+        returns = (curr[valid] - prev[valid]) / prev[valid]
+        if len(returns):
+            # Chan et al.: combine the batch's mean and M2 with the running ones
+            n = len(returns)
+            mean = float(returns.mean())
+            m2 = float(((returns - mean) ** 2).sum())
+            total = self.num_returns + n
+            delta = mean - self.mean_return
+            self.mean_return += delta * n / total
+            self._m2 += m2 + delta * delta * self.num_returns * n / total
+            self.num_returns = total
+
+        fresh = batch[1:] if self.days else batch
+        peaks = np.maximum.accumulate(fresh)
+        if self.days:
+            peaks = np.maximum(peaks, self.peak)
+        positive = peaks > 0
+        if positive.any():
+            drawdown = float(((peaks[positive] - fresh[positive]) / peaks[positive]).max())
+            self.max_drawdown = max(self.max_drawdown, drawdown)
+        self.peak = float(peaks[-1])
+        self.last_value = float(fresh[-1])
+        self.days += len(fresh)
+
+    def record_trades(self, decisions: Iterable[TradeDecision], before: Portfolio, after: Portfolio) -> None:
+        """Count a decision step's orders and book the P&L realized between the
+        portfolios before and after executing them."""
+        for decision in decisions:
+            if decision.action != TradeAction.HOLD:
+                self.total_trades += 1
+                self.wins += _is_win(decision)
+        self.realized_pnl += _book_value(after) - _book_value(before)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / max(self.num_returns - 1, 1)
+
+    def snapshot(self) -> PerformanceMetrics:
+        """Metrics of the values and trades seen so far."""
+        if self.days < 2:
+            return PerformanceMetrics(total_trades=self.total_trades, realized_pnl=round(self.realized_pnl, 2))
+        std_return = math.sqrt(self.variance)
+        sharpe_ratio = 0.0
+        if self.num_returns and std_return > 0:
+            sharpe_ratio = round(self.mean_return / std_return * math.sqrt(TRADING_DAYS_PER_YEAR), 2)
+        win_rate = self.wins / self.total_trades * 100 if self.total_trades else 0.0
+        return PerformanceMetrics(
+            total_return_pct=round((self.last_value - self.initial_capital) / self.initial_capital * 100, 2),
+            sharpe_ratio=sharpe_ratio,
+            max_drawdown_pct=round(self.max_drawdown * 100, 2),
+            win_rate=round(win_rate, 1),
+            total_trades=self.total_trades,
+            realized_pnl=round(self.realized_pnl, 2),
+        )
+
 
 def calculate_metrics(
     portfolio_history: list[float],
     trades: list[TradeDecision],
     initial_capital: float,
 ) -> PerformanceMetrics:
-    """Calculate performance metrics from portfolio history and trade log."""
+    """Calculate performance metrics from portfolio history and trade log.
+
+    Realized P&L needs the executed fills and is only tracked by RunningMetrics.
+    """
     if len(portfolio_history) < 2:
         return PerformanceMetrics()
+    values = np.asarray(portfolio_history, dtype=np.float64)
 
-    # Total return
-    final_value = portfolio_history[-1]
-    total_return_pct = ((final_value - initial_capital) / initial_capital) * 100
+    total_return_pct = (values[-1] - initial_capital) / initial_capital * 100
 
-    # Daily returns
-    daily_returns: list[float] = []
-    for i in range(1, len(portfolio_history)):
-        prev = portfolio_history[i - 1]
-        if prev > 0:
-            daily_returns.append((portfolio_history[i] - prev) / prev)
+    prev = values[:-1]
+    valid = prev > 0
+    daily_returns = (values[1:][valid] - prev[valid]) / prev[valid]
 
-    # Sharpe ratio (annualized, assuming 252 trading days, risk-free rate = 0)
     sharpe_ratio = 0.0
-    if daily_returns:
-        mean_return = sum(daily_returns) / len(daily_returns)
-        variance = sum((r - mean_return) ** 2 for r in daily_returns) / max(len(daily_returns) - 1, 1)
-        std_return = math.sqrt(variance)
+    if len(daily_returns):
+        std_return = float(daily_returns.std(ddof=1)) if len(daily_returns) > 1 else 0.0
         if std_return > 0:
-            sharpe_ratio = round((mean_return / std_return) * math.sqrt(252), 2)
-
-    # Max drawdown
-    max_drawdown_pct = 0.0
-    peak = portfolio_history[0]
-    for value in portfolio_history:
-        if value > peak:
-            peak = value
-        drawdown = ((peak - value) / peak) * 100 if peak > 0 else 0.0
-        if drawdown > max_drawdown_pct:
-            max_drawdown_pct = drawdown
-
-    # Win rate (trades that were profitable)
+            sharpe_ratio = round(float(daily_returns.mean()) / std_return * math.sqrt(TRADING_DAYS_PER_YEAR), 2)
+
+    max_drawdown_pct = float(_drawdown(values).max()) * 100
+
     actual_trades = [t for t in trades if t.action != TradeAction.HOLD]
     total_trades = len(actual_trades)
-    wins = sum(1 for t in actual_trades if t.action == TradeAction.SELL and t.confidence > 0.5)
+    wins = sum(1 for t in actual_trades if _is_win(t))
     win_rate = (wins / total_trades * 100) if total_trades > 0 else 0.0
 
     return PerformanceMetrics(
-        total_return_pct=round(total_return_pct, 2),
+        total_return_pct=round(float(total_return_pct), 2),
         sharpe_ratio=sharpe_ratio,
         max_drawdown_pct=round(max_drawdown_pct, 2),
         win_rate=round(win_rate, 1),
         total_trades=total_trades,
     )
+
+
+def _drawdown(values: FloatArray) -> FloatArray:
+    """Fraction below the running peak at each step (0 where the peak is not positive)."""
+    peaks = np.maximum.accumulate(values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(peaks > 0, (peaks - values) / peaks, 0.0)
+
+
+def rolling_sum(x: npt.NDArray[Any], window: int) -> npt.NDArray[Any]:
+    """Sums of every ``window`` consecutive rows (along the first axis), from
+    cumulative sums; row ``j`` covers rows ``j .. j + window - 1``."""
+    totals = np.cumsum(x, axis=0)
+    totals = np.concatenate((np.zeros((1, *x.shape[1:]), dtype=totals.dtype), totals))
+    return totals[window:] - totals[:-window]
+
+
+class RollingMetrics(NamedTuple):
+    """Risk series aligned with the portfolio history; NaN where undefined.
+
+    The windowed series start once ``window`` daily returns are available.
+    """
+
+    window: int
+    volatility_pct: FloatArray
+    sharpe: FloatArray
+    sortino: FloatArray
+    calmar: FloatArray
+    underwater_pct: FloatArray
+
+    def to_json(self) -> dict[str, Any]:
+        """Plain lists with NaN and infinities as None."""
+        def clean(series: FloatArray) -> list[float | None]:
+            return [None if not math.isfinite(v) else v for v in np.round(series, 4).tolist()]
+
+        return {
+            "window": self.window,
+            "volatility_pct": clean(self.volatility_pct),
+            "sharpe": clean(self.sharpe),
+            "sortino": clean(self.sortino),
+            "calmar": clean(self.calmar),
+            "underwater_pct": clean(self.underwater_pct),
+        }
+
+
+def rolling_metrics(portfolio_history: npt.ArrayLike, window: int = ROLLING_WINDOW) -> RollingMetrics:
+    """Rolling annualized volatility, Sharpe, Sortino and Calmar ratios over the
+    last ``window`` daily returns, plus the underwater (drawdown) curve.
+
+    Returns from non-positive values count as 0. Calmar is the annualized
+    return over the window divided by the window's maximum drawdown.
+    """
+    if window < 2:
+        raise ValueError("window must be at least 2")
+    values = np.asarray(portfolio_history, dtype=np.float64)
+    n = len(values)
+    underwater_pct = -_drawdown(values) * 100 if n else np.empty(0)
+    volatility_pct, sharpe, sortino, calmar = (np.full(n, np.nan) for _ in range(4))
+    if n <= window:
+        return RollingMetrics(window, volatility_pct, sharpe, sortino, calmar, underwater_pct)
+
+    prev = values[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(prev > 0, np.diff(values) / prev, 0.0)
+    # Centering first keeps the sum-of-squares variance numerically stable
+    centered = returns - returns.mean()
+    sums = rolling_sum(centered, window)
+    mean = sums / window + returns.mean()
+    variance = np.maximum((rolling_sum(centered**2, window) - sums**2 / window) / (window - 1), 0.0)
+    std = np.sqrt(variance)
+    downside = np.sqrt(rolling_sum(np.minimum(returns, 0.0) ** 2, window) / window)
+
+    annual = math.sqrt(TRADING_DAYS_PER_YEAR)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volatility_pct[window:] = std * annual * 100
+        sharpe[window:] = np.where(std > 0, mean / std * annual, np.nan)
+        sortino[window:] = np.where(downside > 0, mean / downside * annual, np.nan)
+
+        start, end = values[:-window], values[window:]
+        growth = np.maximum(end / start, 0.0) ** (TRADING_DAYS_PER_YEAR / window)
+        annual_return = np.where(start > 0, growth - 1, np.nan)
+        window_drawdown = _window_max_drawdown(values, window)
+        calmar[window:] = np.where(window_drawdown > 0, annual_return / window_drawdown, np.nan)
+    return RollingMetrics(window, volatility_pct, sharpe, sortino, calmar, underwater_pct)
+
+
+def _window_max_drawdown(values: FloatArray, window: int) -> FloatArray:
+    """Maximum drawdown within each span of ``window`` + 1 consecutive values."""
+    spans = np.lib.stride_tricks.sliding_window_view(values, window + 1)
+    result = np.empty(len(spans))
+    for first in range(0, len(spans), _DRAWDOWN_CHUNK_ROWS):
+        chunk = spans[first:first + _DRAWDOWN_CHUNK_ROWS]
+        peaks = np.maximum.accumulate(chunk, axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdowns = np.where(peaks > 0, (peaks - chunk) / peaks, 0.0)
+        result[first:first + len(chunk)] = drawdowns.max(axis=1)
+    return result
@@ -5,53 +5,202 @@ import logging
 import uuid
 from datetime import date
 
-from trading_sim.agents.trading_agent import create_trading_agent, get_agent_decision
+from trading_sim.agents.pool import get_agent_pool
+from trading_sim.agents.trading_agent import get_agent_decision
 from trading_sim.config import AgentConfig
-from trading_sim.models.market import MarketSnapshot
-from trading_sim.models.portfolio import Holding, Portfolio
+from trading_sim.models.portfolio import Portfolio
 from trading_sim.models.results import AgentResult, SimulationResult, SimulationStatus
-from trading_sim.models.trades import TradeDecision
-from trading_sim.simulation.executor import execute_trade
-from trading_sim.simulation.market_data import generate_mock_data
-from trading_sim.simulation.metrics import calculate_metrics
-from trading_sim.simulation.storage import save_simulation
+from trading_sim.settings import get_checkpoint_interval
+from trading_sim.simulation.checkpoints import (
+    AgentCheckpoint,
+    Checkpointer,
+    SimulationParams,
+    delete_checkpoints,
+    list_running_ids,
+    load_checkpoints,
+    load_params,
+)
+from trading_sim.simulation.events import SimulationEvent, get_event_bus
+from trading_sim.simulation.executor import execute_trades
+from trading_sim.simulation.frame import MarketFrame
+from trading_sim.simulation.market_data import DataSource, load_market_data
+from trading_sim.simulation.metrics import RunningMetrics
+from trading_sim.simulation.storage import mark_failed, save_simulation
+from trading_sim.simulation.triggers import (
+    DECISION_INTERVAL,
+    DecisionPolicy,
+    DecisionSchedule,
+    FixedIntervalPolicy,
+)
+from trading_sim.simulation.valuation import value_range
+from trading_sim.simulation.write_behind import get_write_buffer
+from trading_sim.strategies.prompts import RECENT_HISTORY_DAYS, PromptFragmentCache
 
 logger = logging.getLogger(__name__)
 
-# How often agents make decisions (every N trading days)
-DECISION_INTERVAL = 5
+# Smallest number of days valued and scanned for triggers in one step; the
+# step doubles over quiet stretches and resets after each decision
+MIN_SCAN_DAYS = 32
+
+
+class _ProgressReporter:
+    """Reports the fraction of agent-days simulated to the write-behind buffer."""
+
+    def __init__(self, sim_id: str, agent_ids: list[str], num_days: int) -> None:
+        self.sim_id = sim_id
+        self._days = dict.fromkeys(agent_ids, 0)
+        self._total = max(1, len(agent_ids) * num_days)
+        self._buffer = get_write_buffer()
+
+    @property
+    def fraction(self) -> float:
+        return round(sum(self._days.values()) / self._total, 4)
+
+    def advance(self, agent_id: str, days_done: int) -> None:
+        self._days[agent_id] = days_done
+        self._buffer.update(self.sim_id, progress=self.fraction)
 
 
 async def _run_agent_simulation(
     config: AgentConfig,
-    snapshots: list[MarketSnapshot],
+    frame: MarketFrame,
+    prompt_cache: PromptFragmentCache,
+    sim_id: str,
+    schedule: DecisionSchedule,
+    checkpointer: Checkpointer | None = None,
+    checkpoint: AgentCheckpoint | None = None,
+    progress: _ProgressReporter | None = None,
 ) -> AgentResult:
-    """Run a single agent through the entire market data sequence."""
-    agent = create_trading_agent(config)
-    portfolio = Portfolio(cash=config.initial_capital, holdings={})
-
-    trades: list[TradeDecision] = []
-    portfolio_history: list[float] = []
-    date_labels: list[str] = []
-    history: list[MarketSnapshot] = []
-
-    for i, snapshot in enumerate(snapshots):
-        prices = {t: bar.close for t, bar in snapshot.prices.items()}
-        current_value = portfolio.value_at_prices(prices)
-        portfolio_history.append(round(current_value, 2))
-        date_labels.append(str(snapshot.date))
-
-        # Agents decide every DECISION_INTERVAL days
-        if i % DECISION_INTERVAL == 0 and i > 0:
-            decision = await get_agent_decision(
-                agent, config, snapshot, history, portfolio
-            )
-            trades.append(decision)
-            portfolio = execute_trade(portfolio, decision, snapshot)
+    """Run a single agent through the entire market data sequence.
+
+    Holdings only change on decision days, so each stretch of days is valued in
+    one vectorized step and checked against the decision policies; the agent is
+    only asked for a decision on days where a policy fires. Progress is handed
+    to ``checkpointer`` after decisions, and a ``checkpoint`` resumes from it.
+    Valuations and trades are published to the event bus as they happen, with
+    the metrics so far, and the days done to ``progress``.
+    """
+    agent = get_agent_pool().get(config)
+    bus = get_event_bus()
+    publish = bus.is_active(sim_id)
+    date_labels = frame.date_labels()
+    num_days = len(frame)
+
+    if checkpoint is not None:
+        portfolio = checkpoint.portfolio
+        trades = list(checkpoint.trades)
+        portfolio_history = list(checkpoint.portfolio_history)
+        start = checkpoint.next_day
+        last_decision = checkpoint.last_decision
+        peak_value = checkpoint.peak_value
+        running = RunningMetrics(config.initial_capital, checkpoint.realized_pnl)
+        running.extend(portfolio_history)
+        # Realized P&L is restored above; this only counts the trades
+        running.record_trades(trades, portfolio, portfolio)
+    else:
+        portfolio = Portfolio(cash=config.initial_capital, holdings={})
+        trades = []
+        portfolio_history = []
+        start = 0
+        last_decision = 0
+        peak_value = config.initial_capital
+        running = RunningMetrics(config.initial_capital)
+    span = MIN_SCAN_DAYS
+    if publish and checkpoint is not None:
+        # Replay restored progress so streaming clients see the whole timeline
+        bus.publish(SimulationEvent(
+            type="valuations", sim_id=sim_id, agent_id=config.id, day=0, values=portfolio_history
+        ))
+        bus.publish(SimulationEvent(
+            type="trades",
+            sim_id=sim_id,
+            agent_id=config.id,
+            day=last_decision,
+            trades=trades,
+            portfolio=portfolio,
+            metrics=running.snapshot(),
+        ))
+
+    def make_checkpoint() -> AgentCheckpoint:
+        return AgentCheckpoint(
+            agent_id=config.id,
+            next_day=start,
+            last_decision=last_decision,
+            peak_value=peak_value,
+            realized_pnl=running.realized_pnl,
+            portfolio=portfolio,
+            trades=trades,
+            portfolio_history=portfolio_history,
+        )
+
+    while start < num_days:
+        if progress is not None:
+            progress.advance(config.id, start)
+        end = min(num_days, start + span)
+        interval_day = schedule.next_interval_day(last_decision)
+        if interval_day is not None and interval_day >= start:
+            end = min(end, interval_day + 1)
+
+        values = value_range(portfolio, frame, start, end)
+        day = schedule.next_decision(last_decision, peak_value, start, values)
+        if day is not None:
+            values = values[: day - start + 1]
+        running.extend(values)
+        if publish:
+            bus.publish(SimulationEvent(
+                type="valuations",
+                sim_id=sim_id,
+                agent_id=config.id,
+                day=start,
+                values=values.tolist(),
+                metrics=running.snapshot(),
+            ))
+
+        if day is None:
+            portfolio_history.extend(values.tolist())
+            peak_value = max(peak_value, float(values.max()))
+            start = end
+            span *= 2
+            continue
+
+        # Days up to and including the decision day are valued before trading
+        portfolio_history.extend(values.tolist())
+        start = day + 1
+        span = MIN_SCAN_DAYS
 
-        history.append(snapshot)
+        snapshot = frame[day]
+        history = frame[max(0, day - RECENT_HISTORY_DAYS):day]
+        decisions = await get_agent_decision(
+            agent, config, snapshot, history, portfolio, prompt_cache, sim_id
+        )
+        trades.extend(decisions)
+        executed = execute_trades(portfolio, decisions, snapshot)
+        running.record_trades(decisions, portfolio, executed)
+        portfolio = executed
+        if publish:
+            bus.publish(SimulationEvent(
+                type="trades",
+                sim_id=sim_id,
+                agent_id=config.id,
+                day=day,
+                trades=decisions,
+                portfolio=portfolio,
+                metrics=running.snapshot(),
+            ))
+        last_decision = day
+        peak_value = portfolio_history[-1]
+        if checkpointer is not None and checkpointer.due(config.id):
+            await checkpointer.save(make_checkpoint())
 
-    metrics = calculate_metrics(portfolio_history, trades, config.initial_capital)
+    # A finished agent is not rerun if the simulation is interrupted later
+    if checkpointer is not None and (checkpoint is None or checkpoint.next_day < num_days):
+        await checkpointer.save(make_checkpoint())
+
+    if progress is not None:
+        progress.advance(config.id, num_days)
+    metrics = running.snapshot()
+    if publish:
+        bus.publish(SimulationEvent(type="agent_completed", sim_id=sim_id, agent_id=config.id, metrics=metrics))
 
     return AgentResult(
         agent_id=config.id,
@@ -70,8 +219,21 @@ async def run_simulation(
     start_date: date | None = None,
     end_date: date | None = None,
     sim_id: str | None = None,
+    data_source: DataSource = "mock",
+    interval: str = "1d",
+    decision_interval: int = DECISION_INTERVAL,
+    persist: bool = True,
+    decision_policies: list[DecisionPolicy] | None = None,
+    checkpoints: dict[str, AgentCheckpoint] | None = None,
 ) -> SimulationResult:
-    """Run a full simulation with multiple agents on the same market data."""
+    """Run a full simulation with multiple agents on the same market data.
+
+    Agents decide on days where any of ``decision_policies`` fires; by default
+    that is every ``decision_interval`` trading days. With ``persist=False``
+    nothing is written to the database and the caller is responsible for
+    storing the returned result. Persisted runs checkpoint each agent's
+    progress; pass ``checkpoints`` to continue from them.
+    """
     if sim_id is None:
         sim_id = str(uuid.uuid4())[:8]
 
@@ -86,25 +248,126 @@ async def run_simulation(
         tickers=tickers or [],
         agent_ids=[c.id for c in agent_configs],
     )
-    await save_simulation(result)
+    params = SimulationParams(
+        agent_configs=agent_configs,
+        tickers=tickers,
+        start_date=start_date,
+        end_date=end_date,
+        data_source=data_source,
+        interval=interval,
+        decision_interval=decision_interval,
+        decision_policies=decision_policies,
+    )
+    checkpointer = Checkpointer(sim_id, get_checkpoint_interval()) if persist else None
+    progress: _ProgressReporter | None = None
+    bus = get_event_bus()
+    if persist:
+        bus.open(sim_id)
+        await save_simulation(result, params)
 
     try:
-        snapshots = generate_mock_data(tickers, effective_start, effective_end)
-        result.tickers = list(snapshots[0].prices.keys()) if snapshots else []
+        frame = load_market_data(
+            tickers, effective_start, effective_end, source=data_source, interval=interval
+        )
+        result.tickers = list(frame.tickers) if len(frame) else []
+        bus.publish(SimulationEvent(
+            type="started",
+            sim_id=sim_id,
+            status=result.status,
+            tickers=result.tickers,
+            date_labels=frame.date_labels(),
+            agent_names={c.id: c.name for c in agent_configs},
+        ))
 
-        # Run all agents concurrently
-        tasks = [_run_agent_simulation(config, snapshots) for config in agent_configs]
+        # Run all agents concurrently; they share one set of rendered market sections
+        prompt_cache = PromptFragmentCache()
+        schedule = DecisionSchedule(
+            decision_policies or [FixedIntervalPolicy(every=decision_interval)], frame
+        )
+        if persist:
+            progress = _ProgressReporter(sim_id, result.agent_ids, len(frame))
+        checkpoints = {
+            agent_id: cp
+            for agent_id, cp in (checkpoints or {}).items()
+            if cp.next_day <= len(frame) and len(cp.portfolio_history) == cp.next_day
+        }
+        tasks = [
+            _run_agent_simulation(
+                config, frame, prompt_cache, sim_id, schedule, checkpointer, checkpoints.get(config.id), progress
+            )
+            for config in agent_configs
+        ]
         agent_results = await asyncio.gather(*tasks)
 
         for agent_result in agent_results:
             result.agent_results[agent_result.agent_id] = agent_result
 
         result.status = SimulationStatus.COMPLETED
+        result.progress = 1.0
 
+    except asyncio.CancelledError:
+        # Stays RUNNING in the database: the job worker either marks it
+        # cancelled or hands it to another worker to resume
+        if persist:
+            get_write_buffer().discard(sim_id)
+            bus.close(sim_id)
+        raise
     except Exception as e:
         logger.exception("Simulation %s failed", sim_id)
         result.status = SimulationStatus.FAILED
         result.error = str(e)
+        if progress is not None:
+            result.progress = progress.fraction
 
-    await save_simulation(result)
+    if persist:
+        # The final save supersedes any buffered progress
+        get_write_buffer().discard(sim_id)
+        try:
+            await save_simulation(result)
+            await delete_checkpoints(sim_id)
+        finally:
+            bus.publish(SimulationEvent(type="status", sim_id=sim_id, status=result.status, error=result.error))
+            bus.close(sim_id)
     return result
+
+
+async def run_stored_simulation(sim_id: str) -> SimulationResult | None:
+    """Run a simulation from its stored parameters, continuing from its agents'
+    last checkpoints if it was interrupted.
+
+    Returns None if the simulation was not stored with its run parameters.
+    """
+    params = await load_params(sim_id)
+    if params is None:
+        return None
+    checkpoints = await load_checkpoints(sim_id)
+    if checkpoints:
+        logger.info("Resuming simulation %s (%d agent checkpoints)", sim_id, len(checkpoints))
+    return await run_simulation(
+        agent_configs=params.agent_configs,
+        tickers=params.tickers,
+        start_date=params.start_date,
+        end_date=params.end_date,
+        sim_id=sim_id,
+        data_source=params.data_source,
+        interval=params.interval,
+        decision_interval=params.decision_interval,
+        decision_policies=params.decision_policies,
+        checkpoints=checkpoints,
+    )
+
+
+async def resume_interrupted_simulations() -> None:
+    """Resume every simulation left in RUNNING, e.g. by a crash or restart.
+
+    Simulations stored without run parameters cannot be resumed and are
+    marked as failed. Queued simulations are left to the job workers.
+    """
+    async def _resume(sim_id: str) -> None:
+        try:
+            if await run_stored_simulation(sim_id) is None:
+                await mark_failed(sim_id, "Interrupted and cannot be resumed")
+        except Exception:
+            logger.exception("Resuming simulation %s failed", sim_id)
+
+    await asyncio.gather(*(_resume(sim_id) for sim_id in await list_running_ids()))
@@ -2,71 +2,340 @@
 
 from __future__ import annotations
 
-from sqlalchemy import select
+import base64
+import binascii
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import cast, delete, func, insert, select, tuple_, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from trading_sim.db.engine import get_session_factory
-from trading_sim.db.tables import SimulationRow
-from trading_sim.models.results import SimulationResult, SimulationSummary
+from trading_sim.db.tables import SimulationRow, TradeRow
+from trading_sim.models.results import HistoryPoint, SimulationResult, SimulationStatus, SimulationSummary
+from trading_sim.models.trades import TradeAction, TradeDecision
+from trading_sim.settings import get_history_dtype
+from trading_sim.simulation.checkpoints import SimulationParams
+from trading_sim.simulation.history_codec import decode_agent_result, decode_labels, decode_values, encode_agent_result
+
+# Columns an upsert may overwrite; created_at, start_date and end_date are
+# fixed when the row is first inserted
+_UPSERT_COLUMNS = ("status", "tickers", "agent_ids", "error", "progress", "agent_results", "params")
+
+
+def _row_values(result: SimulationResult, params: SimulationParams | None = None) -> dict[str, Any]:
+    """Column values for a result.
+
+    agent_results (without trades, which live in simulation_trades, and with
+    histories packed by history_codec) is only serialized once there are agent
+    results, and params only when given, so status-only saves leave both
+    columns alone.
+    """
+    values: dict[str, Any] = {
+        "id": result.id,
+        "status": result.status.value,
+        "created_at": result.created_at,
+        "start_date": result.start_date,
+        "end_date": result.end_date,
+        "tickers": list(result.tickers),
+        "agent_ids": list(result.agent_ids),
+        "error": result.error,
+        "progress": result.progress,
+    }
+    if result.agent_results:
+        dtype = get_history_dtype()
+        values["agent_results"] = {
+            agent_id: encode_agent_result(ar, dtype) for agent_id, ar in result.agent_results.items()
+        }
+    if params is not None:
+        values["params"] = params.model_dump(mode="json")
+    return values
+
+
+async def _upsert(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    """INSERT ... ON CONFLICT (id) DO UPDATE of the given column values.
+
+    Rows are grouped by their column set, so each group is one statement that
+    only overwrites the columns its rows carry.
+    """
+    groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(row), []).append(row)
+    for columns, group in groups.items():
+        stmt = pg_insert(SimulationRow).values(group)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SimulationRow.id],
+            set_={c: stmt.excluded[c] for c in _UPSERT_COLUMNS if c in columns},
+        )
+        await session.execute(stmt)
+
+
+def _trade_rows(result: SimulationResult) -> list[dict[str, Any]]:
+    """Trades of all agents in trading-day order, so row ids follow the timeline."""
+    trades = [t for ar in result.agent_results.values() for t in ar.trades]
+    trades.sort(key=lambda t: (t.market_date or date.min, t.timestamp))
+    return [
+        {
+            "simulation_id": result.id,
+            "agent_id": t.agent_id,
+            "market_date": t.market_date,
+            "timestamp": t.timestamp,
+            "ticker": t.ticker,
+            "action": t.action.value,
+            "quantity": t.quantity,
+            "confidence": t.confidence,
+            "reasoning": t.reasoning,
+            "price_at_decision": t.price_at_decision,
+        }
+        for t in trades
+    ]
+
+
+async def _replace_details(session: AsyncSession, results: list[SimulationResult]) -> None:
+    """Rewrite the trade rows of simulations that have agent results."""
+    finished = [r for r in results if r.agent_results]
+    if not finished:
+        return
+    ids = [r.id for r in finished]
+    await session.execute(delete(TradeRow).where(TradeRow.simulation_id.in_(ids)))
+    trades = [row for r in finished for row in _trade_rows(r)]
+    if trades:
+        await session.execute(insert(TradeRow), trades)
+
+
+async def stage_simulation(
+    session: AsyncSession, result: SimulationResult, params: SimulationParams | None = None
+) -> None:
+    """Upsert a simulation result within the caller's transaction."""
+    await stage_simulations(session, [(result, params)])
+
 
+async def stage_simulations(
+    session: AsyncSession, items: Sequence[tuple[SimulationResult, SimulationParams | None]]
+) -> None:
+    """Upsert several simulation results, each with optional run parameters,
+    within the caller's transaction."""
+    await _upsert(session, [_row_values(result, params) for result, params in items])
+    await _replace_details(session, [result for result, _ in items])
 
-async def save_simulation(result: SimulationResult) -> None:
-    """Upsert a simulation result into the database."""
+
+async def save_simulation(result: SimulationResult, params: SimulationParams | None = None) -> None:
+    """Upsert a simulation result into the database in one statement (plus its
+    trade and history rows once it has agent results)."""
     session_factory = get_session_factory()
     async with session_factory() as session:
-        row = await session.get(SimulationRow, result.id)
-        data = result.model_dump(mode="json")
+        await stage_simulation(session, result, params)
+        await session.commit()
 
-        if row is None:
-            row = SimulationRow(
-                id=result.id,
-                status=data["status"],
-                created_at=result.created_at,
-                start_date=result.start_date,
-                end_date=result.end_date,
-                tickers=data["tickers"],
-                agent_ids=data["agent_ids"],
-                agent_results=data["agent_results"],
-                error=data.get("error"),
-            )
-            session.add(row)
-        else:
-            row.status = data["status"]
-            row.tickers = data["tickers"]
-            row.agent_ids = data["agent_ids"]
-            row.agent_results = data["agent_results"]
-            row.error = data.get("error")
 
+async def mark_failed(sim_id: str, error: str) -> None:
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        await session.execute(
+            update(SimulationRow)
+            .where(SimulationRow.id == sim_id)
+            .values(status=SimulationStatus.FAILED.value, error=error)
+        )
         await session.commit()
 
 
-async def get_simulation(sim_id: str) -> SimulationResult | None:
-    """Retrieve a simulation by ID."""
+async def save_simulations(results: list[SimulationResult]) -> None:
+    """Upsert a batch of simulation results in a single transaction."""
+    if not results:
+        return
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        await _upsert(session, [_row_values(r) for r in results])
+        await _replace_details(session, results)
+        await session.commit()
+
+
+async def get_simulation(sim_id: str, with_trades: bool = True) -> SimulationResult | None:
+    """Retrieve a simulation by ID, optionally without its agents' trades."""
     session_factory = get_session_factory()
     async with session_factory() as session:
         row = await session.get(SimulationRow, sim_id)
         if row is None:
             return None
-        return _row_to_result(row)
+        result = _row_to_result(row)
+        if not with_trades:
+            return result
+
+        stmt = select(TradeRow).where(TradeRow.simulation_id == sim_id).order_by(TradeRow.id)
+        for trade_row in (await session.execute(stmt)).scalars():
+            agent_result = result.agent_results.get(trade_row.agent_id)
+            if agent_result is not None:
+                agent_result.trades.append(_row_to_trade(trade_row))
+        return result
+
+
+def _row_to_trade(row: TradeRow) -> TradeDecision:
+    return TradeDecision(
+        agent_id=row.agent_id,
+        timestamp=row.timestamp,
+        ticker=row.ticker,
+        action=row.action,
+        quantity=row.quantity,
+        confidence=row.confidence,
+        reasoning=row.reasoning,
+        price_at_decision=row.price_at_decision,
+        market_date=row.market_date,
+    )
+
+
+async def list_trades(
+    sim_id: str,
+    agent_id: str | None = None,
+    ticker: str | None = None,
+    action: TradeAction | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    cursor: int | None = None,
+    limit: int = 100,
+) -> tuple[list[TradeDecision], int | None]:
+    """One page of a simulation's trades in trading-day order.
+
+    Returns the page and the cursor for the next one (None on the last page).
+    """
+    stmt = select(TradeRow).where(TradeRow.simulation_id == sim_id)
+    if agent_id is not None:
+        stmt = stmt.where(TradeRow.agent_id == agent_id)
+    if ticker is not None:
+        stmt = stmt.where(TradeRow.ticker == ticker)
+    if action is not None:
+        stmt = stmt.where(TradeRow.action == action.value)
+    if start_date is not None:
+        stmt = stmt.where(TradeRow.market_date >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(TradeRow.market_date <= end_date)
+    if cursor is not None:
+        stmt = stmt.where(TradeRow.id > cursor)
+    stmt = stmt.order_by(TradeRow.id).limit(limit + 1)
+
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        rows = list((await session.execute(stmt)).scalars())
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return [_row_to_trade(r) for r in rows[:limit]], next_cursor
+
+
+async def list_history(
+    sim_id: str,
+    agent_id: str | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> list[HistoryPoint]:
+    """Per-step portfolio values of a simulation, ordered by agent and step.
+
+    The values are decoded from agent_results; with ``agent_id`` only that
+    agent's entry is selected and decoded.
+    """
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        if agent_id is None:
+            stmt = select(SimulationRow.agent_results).where(SimulationRow.id == sim_id)
+            agent_results = (await session.execute(stmt)).scalar_one_or_none() or {}
+        else:
+            stmt = select(SimulationRow.agent_results[agent_id]).where(SimulationRow.id == sim_id)
+            entry = (await session.execute(stmt)).scalar_one_or_none()
+            agent_results = {agent_id: entry} if entry is not None else {}
+
+    points: list[HistoryPoint] = []
+    for aid in sorted(agent_results):
+        data = agent_results[aid]
+        labels = decode_labels(data.get("date_labels", []))
+        values = decode_values(data.get("portfolio_history", []))
+        for day, (label, value) in enumerate(zip(labels, values)):
+            at = datetime.fromisoformat(label)
+            if (start_date is not None and at.date() < start_date) or (end_date is not None and at.date() > end_date):
+                continue
+            points.append(HistoryPoint(agent_id=aid, day=day, at=at, value=value))
+    return points
+
+
+async def get_simulation_status(sim_id: str) -> tuple[SimulationStatus, str | None] | None:
+    """Status and error of a simulation, without loading its results."""
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        stmt = select(SimulationRow.status, SimulationRow.error).where(SimulationRow.id == sim_id)
+        row = (await session.execute(stmt)).first()
+        return (SimulationStatus(row.status), row.error) if row is not None else None
+
+
+_SUMMARY_COLUMNS = (
+    SimulationRow.id,
+    SimulationRow.status,
+    SimulationRow.created_at,
+    SimulationRow.start_date,
+    SimulationRow.end_date,
+    SimulationRow.tickers,
+    SimulationRow.agent_ids,
+    SimulationRow.progress,
+)
+
+
+def encode_cursor(created_at: datetime, sim_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{sim_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors."""
+    try:
+        created_at, _, sim_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        return datetime.fromisoformat(created_at), sim_id
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+async def list_simulations(
+    status: SimulationStatus | None = None,
+    agent_id: str | None = None,
+    cursor: str | None = None,
+    limit: int = 50,
+) -> tuple[list[SimulationSummary], str | None]:
+    """One page of simulations, newest first, selecting only the summary columns.
+
+    Returns the page and the cursor for the next one (None on the last page).
+    """
+    stmt = select(*_SUMMARY_COLUMNS)
+    if status is not None:
+        stmt = stmt.where(SimulationRow.status == status.value)
+    if agent_id is not None:
+        stmt = stmt.where(cast(SimulationRow.agent_ids, JSONB).contains([agent_id]))
+    if cursor is not None:
+        created_at, sim_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(SimulationRow.created_at, SimulationRow.id) < (created_at, sim_id))
+    stmt = stmt.order_by(SimulationRow.created_at.desc(), SimulationRow.id.desc()).limit(limit + 1)
+
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        rows = (await session.execute(stmt)).all()
+    summaries = [
+        SimulationSummary(
+            id=row.id,
+            status=row.status,
+            created_at=row.created_at,
+            start_date=row.start_date,
+            end_date=row.end_date,
+            tickers=row.tickers,
+            agent_ids=row.agent_ids,
+            progress=row.progress,
+        )
+        for row in rows[:limit]
+    ]
+    next_cursor = encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+    return summaries, next_cursor
 
 
-async def list_simulations() -> list[SimulationSummary]:
-    """List all simulations ordered by creation time descending."""
+async def count_simulations() -> dict[str, int]:
+    """Number of simulations per status."""
     session_factory = get_session_factory()
     async with session_factory() as session:
-        stmt = select(SimulationRow).order_by(SimulationRow.created_at.desc())
-        rows = (await session.execute(stmt)).scalars().all()
-        return [
-            SimulationSummary(
-                id=row.id,
-                status=row.status,
-                created_at=row.created_at,
-                start_date=row.start_date,
-                end_date=row.end_date,
-                tickers=row.tickers,
-                agent_ids=row.agent_ids,
-            )
-            for row in rows
-        ]
+        stmt = select(SimulationRow.status, func.count()).group_by(SimulationRow.status)
+        return {status: count for status, count in (await session.execute(stmt)).all()}
 
 
 def _row_to_result(row: SimulationRow) -> SimulationResult:
@@ -78,6 +347,7 @@ def _row_to_result(row: SimulationRow) -> SimulationResult:
         end_date=row.end_date,
         tickers=row.tickers,
         agent_ids=row.agent_ids,
-        agent_results=row.agent_results,
+        agent_results={agent_id: decode_agent_result(data) for agent_id, data in row.agent_results.items()},
         error=row.error,
+        progress=row.progress,
     )
@@ -0,0 +1,257 @@
+"""Batch parameter sweeps, queued as jobs or executed across a process pool."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Any, Literal
+
+import yaml
+from pydantic import BaseModel, Field, PositiveInt, model_validator
+
+from trading_sim.config import AgentConfig, load_config
+from trading_sim.models.results import SimulationResult, SimulationStatus
+from trading_sim.simulation.checkpoints import SimulationParams
+from trading_sim.simulation.jobs import enqueue_simulations
+from trading_sim.simulation.runner import run_simulation
+from trading_sim.simulation.storage import save_simulations
+from trading_sim.simulation.triggers import DECISION_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+class SweepWindow(BaseModel):
+    start_date: date
+    end_date: date
+
+    @model_validator(mode="after")
+    def _check_order(self) -> SweepWindow:
+        if self.start_date > self.end_date:
+            raise ValueError("start_date must not be after end_date")
+        return self
+
+
+class SweepGrid(BaseModel):
+    """Parameter grid; one simulation is run for every combination."""
+
+    agent_rosters: list[list[str]] = Field(min_length=1, description="Agent ID lists to compare")
+    ticker_sets: list[list[str] | None] = Field(default_factory=lambda: [None])
+    windows: list[SweepWindow] = Field(
+        default_factory=lambda: [SweepWindow(start_date=date(2024, 1, 2), end_date=date(2024, 12, 31))]
+    )
+    decision_intervals: list[PositiveInt] = Field(default_factory=lambda: [DECISION_INTERVAL])
+    data_source: Literal["mock", "store"] = "mock"
+    interval: Literal["1d", "1m"] = "1d"
+
+
+class SweepRun(BaseModel):
+    """A single point of an expanded grid."""
+
+    sim_id: str
+    agent_ids: list[str]
+    tickers: list[str] | None
+    start_date: date
+    end_date: date
+    decision_interval: int = Field(gt=0)
+    data_source: Literal["mock", "store"] = "mock"
+    interval: Literal["1d", "1m"] = "1d"
+
+
+def expand_grid(grid: SweepGrid) -> list[SweepRun]:
+    """Expand a grid into one SweepRun per parameter combination."""
+    return [
+        SweepRun(
+            sim_id=str(uuid.uuid4())[:8],
+            agent_ids=roster,
+            tickers=tickers,
+            start_date=window.start_date,
+            end_date=window.end_date,
+            decision_interval=decision_interval,
+            data_source=grid.data_source,
+            interval=grid.interval,
+        )
+        for roster, tickers, window, decision_interval in itertools.product(
+            grid.agent_rosters, grid.ticker_sets, grid.windows, grid.decision_intervals
+        )
+    ]
+
+
+def default_workers() -> int:
+    """Pool size matching the cores this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# One event loop per worker process, reused across runs so pooled agents and
+# their keep-alive HTTP connections stay valid between simulations
+_worker_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _run_in_worker(run_json: str, configs_json: list[str]) -> str:
+    """Process-pool entry point: run one simulation without touching the database."""
+    global _worker_loop
+    if _worker_loop is None:
+        _worker_loop = asyncio.new_event_loop()
+
+    run = SweepRun.model_validate_json(run_json)
+    configs = [AgentConfig.model_validate_json(c) for c in configs_json]
+    result = _worker_loop.run_until_complete(run_simulation(
+        agent_configs=configs,
+        tickers=run.tickers,
+        start_date=run.start_date,
+        end_date=run.end_date,
+        sim_id=run.sim_id,
+        data_source=run.data_source,
+        interval=run.interval,
+        decision_interval=run.decision_interval,
+        persist=False,
+    ))
+    return result.model_dump_json()
+
+
+def _placeholder(run: SweepRun, status: SimulationStatus) -> SimulationResult:
+    return SimulationResult(
+        id=run.sim_id,
+        status=status,
+        start_date=run.start_date,
+        end_date=run.end_date,
+        tickers=run.tickers or [],
+        agent_ids=run.agent_ids,
+    )
+
+
+def _params(run: SweepRun, agent_map: dict[str, AgentConfig]) -> SimulationParams:
+    return SimulationParams(
+        agent_configs=[agent_map[aid] for aid in run.agent_ids],
+        tickers=run.tickers,
+        start_date=run.start_date,
+        end_date=run.end_date,
+        data_source=run.data_source,
+        interval=run.interval,
+        decision_interval=run.decision_interval,
+    )
+
+
+def _agent_map(runs: list[SweepRun], agent_configs: list[AgentConfig]) -> dict[str, AgentConfig]:
+    agent_map = {c.id: c for c in agent_configs}
+    for run in runs:
+        unknown = [aid for aid in run.agent_ids if aid not in agent_map]
+        if unknown:
+            raise ValueError(f"Unknown agent IDs in sweep: {unknown}")
+    return agent_map
+
+
+async def enqueue_sweep(
+    runs: list[SweepRun],
+    agent_configs: list[AgentConfig],
+    priority: int = 0,
+    max_depth: int | None = None,
+) -> None:
+    """Queue every simulation of a sweep as a job, all or none.
+
+    The runs share the job workers' concurrency limit, can be cancelled and
+    resume after a restart like any other queued simulation. Raises
+    QueueFullError if they would take the queue past ``max_depth``.
+    """
+    agent_map = _agent_map(runs, agent_configs)
+    await enqueue_simulations(
+        [(_placeholder(run, SimulationStatus.PENDING), _params(run, agent_map)) for run in runs],
+        priority,
+        max_depth,
+    )
+
+
+async def run_sweep(
+    runs: list[SweepRun],
+    agent_configs: list[AgentConfig],
+    max_workers: int | None = None,
+    batch_size: int | None = None,
+) -> list[SimulationResult]:
+    """Run every simulation of a sweep on a process pool in this process.
+
+    Pending placeholders for all runs are written up front; they are outside
+    the job queue, so workers and the startup resume leave them alone.
+    Finished results are then written ``batch_size`` at a time (default: the
+    pool size) with one bulk write per batch.
+    """
+    agent_map = _agent_map(runs, agent_configs)
+    workers = max_workers or default_workers()
+    batch_size = batch_size or workers
+    await save_simulations([_placeholder(run, SimulationStatus.PENDING) for run in runs])
+
+    loop = asyncio.get_running_loop()
+    results: list[SimulationResult] = []
+    pending_batch: list[SimulationResult] = []
+
+    # spawn keeps the workers free of the parent's event loop and DB connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+
+        async def _execute(run: SweepRun) -> SimulationResult:
+            configs_json = [agent_map[aid].model_dump_json() for aid in run.agent_ids]
+            try:
+                payload = await loop.run_in_executor(
+                    pool, _run_in_worker, run.model_dump_json(), configs_json
+                )
+                return SimulationResult.model_validate_json(payload)
+            except Exception as e:
+                logger.exception("Sweep run %s failed", run.sim_id)
+                failed = _placeholder(run, SimulationStatus.FAILED)
+                failed.error = str(e)
+                return failed
+
+        for next_done in asyncio.as_completed([_execute(run) for run in runs]):
+            result = await next_done
+            results.append(result)
+            pending_batch.append(result)
+            if len(pending_batch) >= batch_size:
+                await save_simulations(pending_batch)
+                pending_batch = []
+
+    await save_simulations(pending_batch)
+    return results
+
+
+def load_grid(path: Path) -> SweepGrid:
+    with open(path) as f:
+        raw: dict[str, Any] = yaml.safe_load(f)
+    return SweepGrid.model_validate(raw)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command-line entry point: run a sweep described by a YAML grid file."""
+    parser = argparse.ArgumentParser(description="Run a batch of simulations over a parameter grid")
+    parser.add_argument("grid", type=Path, help="YAML file describing the SweepGrid")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: available cores)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Results per bulk write (default: workers)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    runs = expand_grid(load_grid(args.grid))
+    logger.info("Running %d simulations on %d workers", len(runs), args.workers or default_workers())
+
+    async def _main() -> list[SimulationResult]:
+        from trading_sim.db.engine import close_db, init_db
+
+        await init_db()
+        try:
+            return await run_sweep(runs, load_config().agents, args.workers, args.batch_size)
+        finally:
+            await close_db()
+
+    for result in asyncio.run(_main()):
+        returns = {aid: r.metrics.total_return_pct for aid, r in result.agent_results.items()}
+        print(f"{result.id}  {result.status.value:<9}  {returns}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Decision policies that decide on which days an agent calls its LLM.
+
+A simulation carries a list of policies; an agent makes a decision on the first
+day on which any of them fires. Policies are evaluated over whole ranges of
+days at once against the close-price matrix and the agent's vectorized
+portfolio values, so quiet stretches cost no LLM calls and no per-day Python.
+"""
+
+from __future__ import annotations
+
+from typing import Annotated, Literal
+
+import numpy as np
+import numpy.typing as npt
+from pydantic import BaseModel, Field
+
+from trading_sim.simulation.frame import MarketFrame
+from trading_sim.simulation.metrics import rolling_sum
+
+# Default number of trading days between decisions
+DECISION_INTERVAL = 5
+
+
+class FixedIntervalPolicy(BaseModel):
+    """Decide when ``every`` trading days have passed since the last decision."""
+
+    kind: Literal["interval"] = "interval"
+    every: int = Field(default=DECISION_INTERVAL, gt=0)
+
+
+class PriceMovePolicy(BaseModel):
+    """Decide when any ticker's close moved by ``threshold_pct`` since the last decision."""
+
+    kind: Literal["price_move"] = "price_move"
+    threshold_pct: float = Field(gt=0)
+    tickers: list[str] | None = Field(default=None, description="Tickers to watch (default: all)")
+
+
+class VolatilityBreakoutPolicy(BaseModel):
+    """Decide when a ticker's daily return exceeds ``z_score`` standard deviations
+    of its returns over the preceding ``window`` days."""
+
+    kind: Literal["volatility_breakout"] = "volatility_breakout"
+    window: int = Field(default=20, ge=2)
+    z_score: float = Field(default=2.0, gt=0)
+
+
+class DrawdownPolicy(BaseModel):
+    """Decide when the agent's own portfolio falls ``threshold_pct`` below its
+    peak since the last decision."""
+
+    kind: Literal["drawdown"] = "drawdown"
+    threshold_pct: float = Field(gt=0, lt=100)
+
+
+DecisionPolicy = Annotated[
+    FixedIntervalPolicy | PriceMovePolicy | VolatilityBreakoutPolicy | DrawdownPolicy,
+    Field(discriminator="kind"),
+]
+
+
+def _first(mask: npt.NDArray[np.bool_], offset: int) -> int | None:
+    hits = np.flatnonzero(mask)
+    return int(hits[0]) + offset if len(hits) else None
+
+
+def _volatility_breakouts(close: npt.NDArray[np.float64], window: int, z_score: float) -> npt.NDArray[np.bool_]:
+    """Per-day flag: some ticker's return broke out of its trailing volatility band."""
+    num_days = close.shape[0]
+    mask = np.zeros(num_days, dtype=bool)
+    if num_days <= window + 1:
+        return mask
+
+    # returns[k] is the return into day k + 1
+    returns = close[1:] / close[:-1] - 1
+    # sigma[j] is the std of returns into days j+1..j+window, the band for day j+window+1.
+    # Rolling sums keep memory at days x tickers whatever the window; centering
+    # the returns first keeps the variance numerically stable.
+    centered = returns - returns.mean(axis=0)
+    mean = rolling_sum(centered, window)[:-1] / window
+    variance = np.maximum(rolling_sum(centered**2, window)[:-1] / window - mean**2, 0.0)
+    # A window of equal returns has no band; counting changes keeps that exact
+    # where the sums would leave rounding noise
+    changes = rolling_sum(np.diff(returns, axis=0) != 0, window - 1)[:-1]
+    sigma = np.where(changes > 0, np.sqrt(variance), 0.0)
+    breakout = (np.abs(returns[window:]) > z_score * sigma) & (sigma > 0)
+    mask[window + 1:] = breakout.any(axis=1)
+    return mask
+
+
+class DecisionSchedule:
+    """Evaluates a simulation's decision policies against its market data.
+
+    Market-only signals are precomputed once per simulation and shared by all
+    agents; portfolio-dependent signals use the values passed in per agent.
+    """
+
+    def __init__(self, policies: list[DecisionPolicy], frame: MarketFrame, min_gap: int = 1) -> None:
+        if not policies:
+            raise ValueError("At least one decision policy is required")
+        self.policies = policies
+        self.frame = frame
+        self.min_gap = min_gap
+
+        self._intervals = [p.every for p in policies if isinstance(p, FixedIntervalPolicy)]
+        self._price_moves = [
+            (p.threshold_pct / 100, [frame.ticker_index(t) for t in p.tickers if t in frame.tickers] if p.tickers else None)
+            for p in policies
+            if isinstance(p, PriceMovePolicy)
+        ]
+        self._drawdowns = [p.threshold_pct / 100 for p in policies if isinstance(p, DrawdownPolicy)]
+
+        breakout = np.zeros(len(frame), dtype=bool)
+        for p in policies:
+            if isinstance(p, VolatilityBreakoutPolicy):
+                breakout |= _volatility_breakouts(frame.close, p.window, p.z_score)
+        self._breakouts = breakout
+
+    @classmethod
+    def every(cls, frame: MarketFrame, interval: int = DECISION_INTERVAL) -> DecisionSchedule:
+        return cls([FixedIntervalPolicy(every=interval)], frame)
+
+    def next_interval_day(self, last_decision: int) -> int | None:
+        """The day the interval policies fire next if nothing else does."""
+        return last_decision + min(self._intervals) if self._intervals else None
+
+    def next_decision(
+        self,
+        last_decision: int,
+        peak_value: float,
+        start: int,
+        values: npt.NDArray[np.float64],
+    ) -> int | None:
+        """First day in ``[start, start + len(values))`` on which any policy fires.
+
+        ``values`` are the agent's portfolio values over that range under its
+        current holdings, and ``peak_value`` is its peak since the last decision
+        before ``start``. Day 0 never triggers a decision.
+        """
+        end = start + len(values)
+        lo = max(start, last_decision + self.min_gap, 1)
+        if lo >= end:
+            return None
+        window = slice(lo - start, end - start)
+        candidates: list[int] = []
+
+        interval_day = self.next_interval_day(last_decision)
+        if interval_day is not None and lo <= interval_day < end:
+            candidates.append(interval_day)
+
+        if self._price_moves:
+            close = self.frame.close
+            reference = close[last_decision]
+            moves = np.abs(close[lo:end] / reference - 1)
+            for threshold, cols in self._price_moves:
+                watched = moves if cols is None else moves[:, cols]
+                day = _first((watched >= threshold).any(axis=1), lo)
+                if day is not None:
+                    candidates.append(day)
+
+        day = _first(self._breakouts[lo:end], lo)
+        if day is not None:
+            candidates.append(day)
+
+        if self._drawdowns:
+            peaks = np.maximum.accumulate(np.concatenate(([peak_value], values)))[1:]
+            drawdown = np.where(peaks > 0, 1 - values / peaks, 0.0)[window]
+            for threshold in self._drawdowns:
+                day = _first(drawdown >= threshold, lo)
+                if day is not None:
+                    candidates.append(day)
+
+        return min(candidates) if candidates else None
@@ -0,0 +1,45 @@
+"""Vectorized portfolio valuation over ranges of trading days."""
+
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+from trading_sim.models.portfolio import Portfolio
+from trading_sim.simulation.frame import MarketFrame
+
+
+def holdings_vector(
+    portfolio: Portfolio,
+    frame: MarketFrame,
+) -> tuple[npt.NDArray[np.float64], float]:
+    """Split a portfolio into per-ticker quantities aligned with the frame's columns
+    and a constant part.
+
+    The constant part is cash plus any holdings the frame has no prices for, which
+    are valued at average cost (matching ``Portfolio.value_at_prices``).
+    """
+    quantities = np.zeros(len(frame.tickers))
+    constant = portfolio.cash
+    for ticker, holding in portfolio.holdings.items():
+        if ticker in frame.tickers:
+            quantities[frame.ticker_index(ticker)] = holding.quantity
+        else:
+            constant += holding.quantity * holding.avg_cost
+    return quantities, constant
+
+
+def value_range(
+    portfolio: Portfolio,
+    frame: MarketFrame,
+    start: int,
+    end: int,
+) -> npt.NDArray[np.float64]:
+    """Portfolio value at the close of each day in ``[start, end)``, rounded to cents.
+
+    Holdings are fixed over the range, so the whole range is one matrix-vector
+    product of the close prices with the holdings, plus cash.
+    """
+    quantities, constant = holdings_vector(portfolio, frame)
+    values = frame.close[start:end] @ quantities + constant
+    return np.round(values, 2)
@@ -0,0 +1,138 @@
+"""Write-behind buffer for frequent, small simulation row updates.
+
+Running simulations report status and progress far more often than anyone
+reads them. Updates are merged per simulation in memory and written every
+``interval_s`` seconds with one batched UPDATE, so a burst of updates from
+hundreds of concurrent simulations costs a single round trip. Buffered
+updates are best-effort: anything that must survive a crash (results,
+run parameters) goes through ``storage.save_simulation`` instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from typing import Any
+
+from sqlalchemy import bindparam, update
+
+from trading_sim.db.engine import get_session_factory
+from trading_sim.db.tables import SimulationRow
+from trading_sim.models.results import SimulationStatus
+from trading_sim.settings import get_write_behind_interval
+
+logger = logging.getLogger(__name__)
+
+# Columns that may be written behind
+BUFFERED_COLUMNS = frozenset({"status", "progress", "error"})
+
+# Buffered updates never touch simulations that already finished
+_ACTIVE_STATUSES = (SimulationStatus.PENDING.value, SimulationStatus.RUNNING.value)
+
+
+class WriteBehindBuffer:
+    """Latest pending column values per simulation, flushed periodically."""
+
+    def __init__(self, interval_s: float) -> None:
+        self.interval_s = interval_s
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._task: asyncio.Task[None] | None = None
+        self.updates = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.errors = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def update(self, sim_id: str, **values: Any) -> None:
+        """Merge column values into the simulation's pending update.
+
+        A no-op while the buffer is not running (disabled, or outside the app).
+        """
+        if self._task is None:
+            return
+        unknown = values.keys() - BUFFERED_COLUMNS
+        if unknown:
+            raise ValueError(f"Columns cannot be written behind: {sorted(unknown)}")
+        self._pending.setdefault(sim_id, {}).update(values)
+        self.updates += 1
+
+    def discard(self, sim_id: str) -> None:
+        """Drop a simulation's pending update, e.g. once its final state is saved."""
+        self._pending.pop(sim_id, None)
+
+    async def flush(self) -> None:
+        """Write all pending updates, one executemany UPDATE per column set."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for sim_id, values in pending.items():
+            columns = tuple(sorted(values))
+            groups.setdefault(columns, []).append({"sim_id": sim_id, **values})
+
+        table = SimulationRow.__table__
+        session_factory = get_session_factory()
+        try:
+            async with session_factory() as session:
+                for columns, rows in groups.items():
+                    stmt = (
+                        update(table)
+                        .where(table.c.id == bindparam("sim_id"), table.c.status.in_(_ACTIVE_STATUSES))
+                        .values({c: bindparam(c) for c in columns})
+                    )
+                    await session.execute(stmt, rows)
+                await session.commit()
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Write-behind flush of %d simulations failed: %s", len(pending), e)
+            # Keep the values for the next flush unless newer ones arrived meanwhile
+            for sim_id, values in pending.items():
+                self._pending[sim_id] = {**values, **self._pending.get(sim_id, {})}
+            return
+        self.flushes += 1
+        self.rows_written += len(pending)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_s)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the periodic flush task; does nothing if the interval is 0."""
+        if self._task is None and self.interval_s > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task and write what is still pending."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        await self.flush()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_s": self.interval_s,
+            "pending": len(self._pending),
+            "updates": self.updates,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "errors": self.errors,
+        }
+
+
+_buffer: WriteBehindBuffer | None = None
+
+
+def get_write_buffer() -> WriteBehindBuffer:
+    global _buffer
+    if _buffer is None:
+        _buffer = WriteBehindBuffer(get_write_behind_interval())
+    return _buffer
@@ -1,16 +1,50 @@
 """Build market context prompts for agent decision-making."""
 
+from collections import OrderedDict
+
 from trading_sim.models.market import MarketSnapshot
 from trading_sim.models.portfolio import Portfolio
 
+# Number of prior trading days included in the price history section
+RECENT_HISTORY_DAYS = 5
 
-def build_market_prompt(
-    snapshot: MarketSnapshot,
-    history: list[MarketSnapshot],
-    portfolio: Portfolio,
-    prices: dict[str, float],
-) -> str:
-    """Build a prompt describing current market state and portfolio for an agent."""
+
+class PromptFragmentCache:
+    """Pre-rendered market sections of the prompt for one simulation, keyed by day.
+
+    The market text is identical for every agent on a given day, so it is
+    formatted once and only the portfolio section is rendered per agent.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._sections: OrderedDict[int, tuple[str, str]] = OrderedDict()
+
+    def sections(self, snapshot: MarketSnapshot, history: list[MarketSnapshot]) -> tuple[str, str]:
+        """Return the (header, footer) text surrounding the portfolio section."""
+        key = snapshot.day_index
+        cached = self._sections.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._sections.move_to_end(key)
+            return cached
+
+        self.misses += 1
+        rendered = render_market_sections(snapshot, history)
+        self._sections[key] = rendered
+        if len(self._sections) > self.maxsize:
+            self._sections.popitem(last=False)
+        return rendered
+
+
+def render_market_sections(snapshot: MarketSnapshot, history: list[MarketSnapshot]) -> tuple[str, str]:
+    """Render the agent-independent parts of the prompt.
+
+    Returns the header (day, current market data, recent history) and the
+    footer (available tickers and instructions).
+    """
     lines: list[str] = []
 
     lines.append(f"=== Trading Day: {snapshot.date} (Day {snapshot.day_index + 1}/{snapshot.total_days}) ===\n")
@@ -23,8 +57,8 @@ def build_market_prompt(
             f"Low=${bar.low:.2f} Close=${bar.close:.2f} Vol={bar.volume:,}"
         )
 
-    # Recent price history (last 5 days if available)
-    recent = history[-5:] if len(history) > 5 else history
+    # Recent price history (last RECENT_HISTORY_DAYS days if available)
+    recent = history[-RECENT_HISTORY_DAYS:]
     if recent:
         lines.append("\nRECENT PRICE HISTORY (close prices):")
         tickers = sorted(snapshot.prices.keys())
@@ -38,7 +72,20 @@ def build_market_prompt(
             )
             lines.append(row)
 
-    # Portfolio state
+    footer: list[str] = []
+    footer.append("\nAVAILABLE TICKERS: " + ", ".join(sorted(snapshot.prices.keys())))
+    footer.append(
+        "\nMake your trading decision. You may BUY, SELL, or HOLD. "
+        "If buying or selling, specify the ticker, quantity, and your reasoning."
+    )
+
+    return "\n".join(lines), "\n".join(footer)
+
+
+def render_portfolio_section(portfolio: Portfolio, prices: dict[str, float]) -> str:
+    """Render the agent-specific portfolio section of the prompt."""
+    lines: list[str] = []
+
     total_value = portfolio.value_at_prices(prices)
     lines.append(f"\nYOUR PORTFOLIO (Total Value: ${total_value:,.2f}):")
     lines.append(f"  Cash: ${portfolio.cash:,.2f}")
@@ -54,10 +101,20 @@ def build_market_prompt(
     else:
         lines.append("  No holdings")
 
-    lines.append("\nAVAILABLE TICKERS: " + ", ".join(sorted(snapshot.prices.keys())))
-    lines.append(
-        "\nMake your trading decision. You may BUY, SELL, or HOLD. "
-        "If buying or selling, specify the ticker, quantity, and your reasoning."
-    )
-
     return "\n".join(lines)
+
+
+def build_market_prompt(
+    snapshot: MarketSnapshot,
+    history: list[MarketSnapshot],
+    portfolio: Portfolio,
+    prices: dict[str, float],
+    cache: PromptFragmentCache | None = None,
+) -> str:
+    """Build a prompt describing current market state and portfolio for an agent."""
+    if cache is not None:
+        header, footer = cache.sections(snapshot, history)
+    else:
+        header, footer = render_market_sections(snapshot, history)
+
+    return "\n".join((header, render_portfolio_section(portfolio, prices), footer))
@@ -35,6 +35,12 @@ export interface TradeDecision {
   confidence: number;
   reasoning: string;
   price_at_decision: number;
+  market_date: string | null;
+}
+
+export interface TradePage {
+  items: TradeDecision[];
+  next_cursor: number | null;
 }
 
 export interface PerformanceMetrics {
@@ -43,6 +49,7 @@ export interface PerformanceMetrics {
   max_drawdown_pct: number;
   win_rate: number;
   total_trades: number;
+  realized_pnl: number;
 }
 
 export interface AgentResult {
@@ -60,7 +67,7 @@ export interface AgentResult {
 
 export interface SimulationResult {
   id: string;
-  status: "pending" | "running" | "completed" | "failed";
+  status: "pending" | "running" | "completed" | "failed" | "cancelled";
   created_at: string;
   start_date: string;
   end_date: string;
@@ -68,6 +75,7 @@ export interface SimulationResult {
   agent_ids: string[];
   agent_results: Record<string, AgentResult>;
   error: string | null;
+  progress: number;
 }
 
 export interface SimulationSummary {
@@ -78,6 +86,24 @@ export interface SimulationSummary {
   end_date: string;
   tickers: string[];
   agent_ids: string[];
+  progress: number;
+}
+
+export interface SimulationEvent {
+  type: "started" | "valuations" | "trades" | "agent_completed" | "status";
+  sim_id: string;
+  id: number;
+  status?: SimulationResult["status"];
+  error?: string;
+  agent_id?: string;
+  day?: number;
+  values?: number[];
+  trades?: TradeDecision[];
+  portfolio?: AgentResult["portfolio"];
+  metrics?: PerformanceMetrics;
+  tickers?: string[];
+  date_labels?: string[];
+  agent_names?: Record<string, string>;
 }
 
 // --- API functions ---
@@ -100,19 +126,54 @@ export function updateAgent(
   });
 }
 
-export function fetchSimulations(): Promise<SimulationSummary[]> {
-  return request("/simulations");
+export interface SimulationPage {
+  items: SimulationSummary[];
+  next_cursor: string | null;
+}
+
+export function fetchSimulations(
+  filters: { status?: string; agent_id?: string; cursor?: string; limit?: number } = {}
+): Promise<SimulationPage> {
+  const params = new URLSearchParams();
+  for (const [key, value] of Object.entries(filters)) {
+    if (value !== undefined) params.set(key, String(value));
+  }
+  const qs = params.toString();
+  return request(`/simulations${qs ? `?${qs}` : ""}`);
+}
+
+export function fetchSimulationCounts(): Promise<Record<string, number>> {
+  return request("/simulations/counts");
 }
 
 export function fetchSimulation(id: string): Promise<SimulationResult> {
   return request(`/simulations/${id}`);
 }
 
+const SIMULATION_EVENT_TYPES: SimulationEvent["type"][] = [
+  "started",
+  "valuations",
+  "trades",
+  "agent_completed",
+  "status",
+];
+
+/** Follow a simulation's progress events; returns a function that closes the stream. */
+export function streamSimulation(id: string, onEvent: (event: SimulationEvent) => void): () => void {
+  const source = new EventSource(`${API_BASE}/simulations/${id}/stream`);
+  const handler = (e: MessageEvent<string>) => onEvent(JSON.parse(e.data) as SimulationEvent);
+  for (const type of SIMULATION_EVENT_TYPES) {
+    source.addEventListener(type, handler);
+  }
+  return () => source.close();
+}
+
 export function createSimulation(params: {
   agent_ids: string[];
   tickers?: string[];
   start_date?: string;
   end_date?: string;
+  priority?: number;
 }): Promise<SimulationResult> {
   return request("/simulations", {
     method: "POST",
@@ -120,10 +181,32 @@ export function createSimulation(params: {
   });
 }
 
+/** Whether a simulation has reached a final status and will not change anymore. */
+export function isFinished(status: string): boolean {
+  return status === "completed" || status === "failed" || status === "cancelled";
+}
+
+export function cancelSimulation(id: string): Promise<{ id: string; status: "cancelled" | "cancelling" }> {
+  return request(`/simulations/${id}/cancel`, { method: "POST" });
+}
+
 export function fetchTrades(
   simId: string,
-  agentId?: string
-): Promise<TradeDecision[]> {
-  const q = agentId ? `?agent_id=${agentId}` : "";
+  filters: {
+    agent_id?: string;
+    ticker?: string;
+    action?: TradeDecision["action"];
+    start_date?: string;
+    end_date?: string;
+    cursor?: number;
+    limit?: number;
+  } = {}
+): Promise<TradePage> {
+  const params = new URLSearchParams();
+  for (const [key, value] of Object.entries(filters)) {
+    if (value !== undefined) params.set(key, String(value));
+  }
+  const qs = params.toString();
+  const q = qs ? `?${qs}` : "";
   return request(`/simulations/${simId}/trades${q}`);
 }
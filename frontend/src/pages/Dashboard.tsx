@@ -3,15 +3,22 @@ import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/com
 import { Badge } from "@/components/ui/badge";
 import { Button } from "@/components/ui/button";
 import { useApi } from "@/hooks/useApi";
-import { fetchSimulations, fetchAgents, type SimulationSummary, type AgentConfig } from "@/lib/api";
+import {
+  fetchSimulations,
+  fetchSimulationCounts,
+  fetchAgents,
+  type SimulationSummary,
+  type AgentConfig,
+} from "@/lib/api";
 import { BarChart3, Bot, Play, TrendingUp } from "lucide-react";
 
 export default function Dashboard() {
-  const { data: simulations, loading: simsLoading } = useApi(fetchSimulations);
+  const { data: recent } = useApi(() => fetchSimulations({ limit: 5 }));
+  const { data: counts, loading: simsLoading } = useApi(fetchSimulationCounts);
   const { data: agents, loading: agentsLoading } = useApi(fetchAgents);
 
-  const completedSims = simulations?.filter((s) => s.status === "completed") ?? [];
-  const recentSims = simulations?.slice(0, 5) ?? [];
+  const totalSims = Object.values(counts ?? {}).reduce((a, b) => a + b, 0);
+  const recentSims = recent?.items ?? [];
 
   return (
     <div className="space-y-6">
@@ -30,13 +37,13 @@ export default function Dashboard() {
         />
         <StatsCard
           title="Simulations"
-          value={simsLoading ? "..." : String(simulations?.length ?? 0)}
+          value={simsLoading ? "..." : String(totalSims)}
           description="Total simulation runs"
           icon={<Play className="h-4 w-4 text-gray-500" />}
         />
         <StatsCard
           title="Completed"
-          value={simsLoading ? "..." : String(completedSims.length)}
+          value={simsLoading ? "..." : String(counts?.completed ?? 0)}
           description="Successfully completed"
           icon={<TrendingUp className="h-4 w-4 text-gray-500" />}
         />
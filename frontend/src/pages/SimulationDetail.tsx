@@ -4,7 +4,16 @@ import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/com
 import { Badge } from "@/components/ui/badge";
 import { Button } from "@/components/ui/button";
 import { useApi } from "@/hooks/useApi";
-import { fetchSimulation, type SimulationResult, type AgentResult, type TradeDecision } from "@/lib/api";
+import {
+  cancelSimulation,
+  fetchSimulation,
+  isFinished,
+  streamSimulation,
+  type SimulationEvent,
+  type SimulationResult,
+  type AgentResult,
+  type TradeDecision,
+} from "@/lib/api";
 import {
   LineChart,
   Line,
@@ -28,22 +37,49 @@ export default function SimulationDetail() {
     [id]
   );
 
-  // Auto-refresh while running
+  // Follow progress events while running; the full result is fetched once at the end
   const [autoRefresh, setAutoRefresh] = useState(true);
+  const [live, setLive] = useState<Record<string, AgentResult>>({});
+  const [liveStatus, setLiveStatus] = useState<SimulationResult["status"] | null>(null);
+  const simStatus = sim?.status;
   useEffect(() => {
-    if (!autoRefresh || !sim || sim.status === "completed" || sim.status === "failed") return;
-    const interval = setInterval(refetch, 3000);
-    return () => clearInterval(interval);
-  }, [autoRefresh, sim, refetch]);
+    if (!autoRefresh || !simStatus || isFinished(simStatus)) return;
+    const close = streamSimulation(id!, (event) => {
+      if (event.type === "status") {
+        setLiveStatus(event.status ?? null);
+        if (event.status && isFinished(event.status)) {
+          close();
+          refetch();
+        }
+        return;
+      }
+      if (event.type === "started") setLiveStatus("running");
+      setLive((prev) => applyEvent(prev, event));
+    });
+    return close;
+  }, [autoRefresh, simStatus, id, refetch]);
 
   const [selectedAgent, setSelectedAgent] = useState<string | null>(null);
+  const [cancelling, setCancelling] = useState(false);
+  const cancel = async () => {
+    setCancelling(true);
+    try {
+      await cancelSimulation(id!);
+      refetch();
+    } finally {
+      setCancelling(false);
+    }
+  };
 
   if (loading && !sim) return <p className="text-gray-500">Loading simulation...</p>;
   if (error) return <p className="text-red-500">Error: {error}</p>;
   if (!sim) return <p className="text-gray-500">Simulation not found</p>;
 
-  const agentResults = Object.values(sim.agent_results);
-  const isRunning = sim.status === "running" || sim.status === "pending";
+  const status = isFinished(sim.status) ? sim.status : (liveStatus ?? sim.status);
+  const agentResults = Object.values(
+    Object.keys(sim.agent_results).length > 0 ? sim.agent_results : live
+  );
+  const isRunning = status === "running" || status === "pending";
 
   return (
     <div className="space-y-6">
@@ -58,11 +94,16 @@ export default function SimulationDetail() {
           </p>
         </div>
         <div className="flex items-center gap-2">
-          <StatusBadge status={sim.status} />
+          <StatusBadge status={status} />
           {isRunning && (
             <Button size="sm" variant="outline" onClick={refetch}>
               <RefreshCw className="mr-1 h-4 w-4 animate-spin" />
-              Refreshing...
+              Live
+            </Button>
+          )}
+          {isRunning && (
+            <Button size="sm" variant="outline" onClick={cancel} disabled={cancelling}>
+              {cancelling ? "Cancelling..." : "Cancel"}
             </Button>
           )}
         </div>
@@ -152,6 +193,53 @@ export default function SimulationDetail() {
   );
 }
 
+const EMPTY_METRICS: AgentResult["metrics"] = {
+  total_return_pct: 0,
+  sharpe_ratio: 0,
+  max_drawdown_pct: 0,
+  win_rate: 0,
+  total_trades: 0,
+  realized_pnl: 0,
+};
+
+function applyEvent(
+  results: Record<string, AgentResult>,
+  event: SimulationEvent
+): Record<string, AgentResult> {
+  if (event.type === "started") {
+    const next: Record<string, AgentResult> = {};
+    for (const [agentId, name] of Object.entries(event.agent_names ?? {})) {
+      next[agentId] = {
+        agent_id: agentId,
+        agent_name: name,
+        portfolio: { cash: 0, holdings: {} },
+        trades: [],
+        portfolio_history: [],
+        date_labels: event.date_labels ?? [],
+        metrics: EMPTY_METRICS,
+      };
+    }
+    return next;
+  }
+
+  const current = event.agent_id ? results[event.agent_id] : undefined;
+  if (!current) return results;
+
+  // Valuations and trades carry the metrics so far; agent_completed the final ones
+  let updated: AgentResult = event.metrics ? { ...current, metrics: event.metrics } : current;
+  if (event.type === "valuations" && event.values) {
+    const history = current.portfolio_history.slice(0, event.day ?? 0);
+    updated = { ...updated, portfolio_history: history.concat(event.values) };
+  } else if (event.type === "trades") {
+    updated = {
+      ...updated,
+      trades: current.trades.concat(event.trades ?? []),
+      portfolio: event.portfolio ?? current.portfolio,
+    };
+  }
+  return { ...results, [current.agent_id]: updated };
+}
+
 function PortfolioChart({ agentResults }: { agentResults: AgentResult[] }) {
   if (agentResults.length === 0) return null;
 
@@ -217,6 +305,7 @@ function MetricsComparison({ agentResults }: { agentResults: AgentResult[] }) {
             <th className="pb-2 pr-4 font-medium">Sharpe Ratio</th>
             <th className="pb-2 pr-4 font-medium">Max Drawdown</th>
             <th className="pb-2 pr-4 font-medium">Win Rate</th>
+            <th className="pb-2 pr-4 font-medium">Realized P&amp;L</th>
             <th className="pb-2 font-medium">Total Trades</th>
           </tr>
         </thead>
@@ -247,6 +336,12 @@ function MetricsComparison({ agentResults }: { agentResults: AgentResult[] }) {
                 -{ar.metrics.max_drawdown_pct.toFixed(2)}%
               </td>
               <td className="py-3 pr-4">{ar.metrics.win_rate.toFixed(1)}%</td>
+              <td
+                className={`py-3 pr-4 ${ar.metrics.realized_pnl >= 0 ? "text-green-600" : "text-red-600"}`}
+              >
+                {ar.metrics.realized_pnl >= 0 ? "+" : "-"}$
+                {Math.abs(ar.metrics.realized_pnl).toLocaleString(undefined, { maximumFractionDigits: 2 })}
+              </td>
               <td className="py-3">{ar.metrics.total_trades}</td>
             </tr>
           ))}
@@ -325,7 +420,7 @@ function TradeLog({
             </div>
             <div className="flex items-center gap-2 text-xs text-gray-500">
               <Badge variant="outline">{trade.agent_name}</Badge>
-              <span>{new Date(trade.timestamp).toLocaleDateString()}</span>
+              <span>{new Date(trade.market_date ?? trade.timestamp).toLocaleDateString()}</span>
               <span>Conf: {(trade.confidence * 100).toFixed(0)}%</span>
             </div>
           </div>
@@ -1,11 +1,31 @@
+import { useState } from "react";
 import { Link } from "react-router-dom";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
+import { Button } from "@/components/ui/button";
 import { useApi } from "@/hooks/useApi";
 import { fetchSimulations, type SimulationSummary } from "@/lib/api";
 
 export default function SimulationsPage() {
-  const { data: simulations, loading, error } = useApi(fetchSimulations);
+  const { data: firstPage, loading, error } = useApi(() => fetchSimulations());
+  // Pages after the first, and the cursor past the last one loaded (undefined: none loaded yet)
+  const [more, setMore] = useState<SimulationSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null | undefined>(undefined);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const simulations = (firstPage?.items ?? []).concat(more);
+  const cursor = nextCursor === undefined ? (firstPage?.next_cursor ?? null) : nextCursor;
+
+  const loadMore = () => {
+    if (!cursor) return;
+    setLoadingMore(true);
+    fetchSimulations({ cursor })
+      .then((page) => {
+        setMore((prev) => prev.concat(page.items));
+        setNextCursor(page.next_cursor);
+      })
+      .finally(() => setLoadingMore(false));
+  };
 
   if (loading) return <p className="text-gray-500">Loading simulations...</p>;
   if (error) return <p className="text-red-500">Error: {error}</p>;
@@ -17,7 +37,7 @@ export default function SimulationsPage() {
         <p className="text-gray-500">View past simulation runs and results</p>
       </div>
 
-      {simulations?.length === 0 ? (
+      {simulations.length === 0 ? (
         <Card>
           <CardContent className="py-8 text-center">
             <p className="text-gray-500">No simulations yet.</p>
@@ -28,7 +48,7 @@ export default function SimulationsPage() {
         </Card>
       ) : (
         <div className="space-y-3">
-          {simulations?.map((sim: SimulationSummary) => (
+          {simulations.map((sim: SimulationSummary) => (
             <Link key={sim.id} to={`/simulations/${sim.id}`}>
               <Card className="transition-colors hover:bg-gray-50">
                 <CardHeader className="pb-3">
@@ -41,7 +61,7 @@ export default function SimulationsPage() {
                         {sim.tickers.length !== 1 ? "s" : ""}
                       </CardDescription>
                     </div>
-                    <StatusBadge status={sim.status} />
+                    <StatusBadge status={sim.status} progress={sim.progress} />
                   </div>
                 </CardHeader>
                 <CardContent className="pt-0">
@@ -56,13 +76,20 @@ export default function SimulationsPage() {
               </Card>
             </Link>
           ))}
+          {cursor && (
+            <div className="flex justify-center">
+              <Button variant="outline" size="sm" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? "Loading..." : "Load more"}
+              </Button>
+            </div>
+          )}
         </div>
       )}
     </div>
   );
 }
 
-function StatusBadge({ status }: { status: string }) {
+function StatusBadge({ status, progress }: { status: string; progress: number }) {
   const variant =
     status === "completed"
       ? "success"
@@ -71,5 +98,10 @@ function StatusBadge({ status }: { status: string }) {
         : status === "failed"
           ? "destructive"
           : "secondary";
-  return <Badge variant={variant}>{status}</Badge>;
+  return (
+    <Badge variant={variant}>
+      {status}
+      {status === "running" && ` ${Math.round(progress * 100)}%`}
+    </Badge>
+  );
 }